@@ -1,38 +1,34 @@
 from dotenv import load_dotenv
 from livekit import agents, rtc
-<<<<<<< HEAD
-from livekit.agents import AgentSession, Agent, RoomInputOptions, ChatContext
-=======
 from livekit.agents import AgentSession, Agent, RoomInputOptions, ChatContext, NOT_GIVEN
->>>>>>> master
 from livekit.plugins import google, noise_cancellation
 import os
 import sys
 import subprocess
-import asyncio
-from mem0 import AsyncMemoryClient
+try:
+    from mem0 import AsyncMemoryClient
+except ImportError:  # the local memory store is used instead
+    AsyncMemoryClient = None
 import logging
-import json
-import httpx
-<<<<<<< HEAD
-=======
 from typing import Optional
->>>>>>> master
 
 from get_weather import get_current_weather
 from get_current_time_date import get_current_date_time
-from get_web_search import web_search
+from get_web_search import web_search, get_search_backend, close_search_backend
 from prompts import SESSION_INSTRUCTION, AGENT_INSTRUCTION
 from system_control import system_control
 from get_spotify import spotify_control
-from get_news import fetch_news
+from get_news import fetch_news, start_news_prefetch
 from youtube_music_control import youtube_music_control
-<<<<<<< HEAD
-from open_application import open_application, assistant_open_command, close_application
-from set_avatar_expression import set_avatar_expression
-=======
+from http_client import aclose_http_client
+from app_discovery import get_app_index
+from memory_journal import MemoryJournal, last_topic
+from memory_context import build_memory_context, memory_texts
+from local_memory import LocalMemoryClient, use_local_memory
 from open_application import open_application, assistant_open_command, close_application, list_running_applications, assistant_list_command
->>>>>>> master
+from set_avatar_expression import set_avatar_expression, set_avatar_expression_sequence, get_avatar_channel
+from avatar_lipsync import LipSyncAudioOutput
+from expression_pipeline import ExpressionPipeline
 
 load_dotenv()
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY") or NOT_GIVEN
@@ -62,16 +58,12 @@ class Assistant(Agent):
                 fetch_news,
                 youtube_music_control,
                 open_application,
-<<<<<<< HEAD
                 close_application,
                 assistant_open_command,
-                set_avatar_expression,
-=======
-                assistant_open_command,
-                close_application,
                 list_running_applications,
                 assistant_list_command,
->>>>>>> master
+                set_avatar_expression,
+                set_avatar_expression_sequence,
             ],
             chat_ctx=chat_ctx,
         )
@@ -79,13 +71,10 @@ class Assistant(Agent):
 async def entrypoint(ctx: agents.JobContext):
     # Define shutdown hook function
     async def shutdown_hook(
-<<<<<<< HEAD
-        chat_ctx: ChatContext, mem0: AsyncMemoryClient, memory_str: str, avatar_proc: subprocess.Popen | None, expr_task: asyncio.Task | None
-=======
-        chat_ctx: "ChatContext", 
-        mem0: "Optional[AsyncMemoryClient]", 
-        memory_str: str
->>>>>>> master
+        chat_ctx: ChatContext,
+        journal: Optional[MemoryJournal],
+        avatar_proc: Optional[subprocess.Popen],
+        expr_pipeline: Optional[ExpressionPipeline],
     ):
         logging.info("Shutting down the agent session...")
         # Stop desktop avatar process if started
@@ -94,244 +83,53 @@ async def entrypoint(ctx: agents.JobContext):
                 avatar_proc.terminate()
         except Exception as e:
             logging.warning(f"Failed to terminate desktop avatar: {e}")
-        # Cancel expression watcher
+        # Stop expression pipeline
         try:
-            if expr_task and not expr_task.done():
-                expr_task.cancel()
+            if expr_pipeline:
+                await expr_pipeline.aclose()
         except Exception:
             pass
 
-        conversation_memories = []
-        preference_memories = []
-
-        for item in chat_ctx.items:
-            # Extract message content
-            content_str = ""
-            # Safely get content using getattr with default empty string
-            content = getattr(item, "content", "")
-            if content:
-                if isinstance(content, list):
-                    content_str = "".join(map(str, content))
-                else:
-                    content_str = str(content)
-            else:
-                content_str = str(item)
-
-            if not content_str.strip():
-                continue
-
-            # Skip already stored
-            if memory_str and memory_str in content_str:
-                continue
-
-            # Safely get role using getattr with default None
-            role = getattr(item, "role", None)
-            if role and role in ["user", "assistant"]:
-                # Normal conversation log
-                conversation_memories.append(f"{role}: {content_str.strip()}")
-
-                # Extract preferences from user messages
-                if role == "user" and any(
-                    kw in content_str.lower()
-                    for kw in ["like", "love", "prefer", "enjoy", "hate", "dislike"]
-                ):
-                    preference_memories.append(content_str.strip())
-
-        # Print conversation to console
-<<<<<<< HEAD
-        if conversation_memories:
-            print("\n=== Conversation log ===")
-            for msg in conversation_memories:
-                print(msg)
-            print("========================\n")
-
-        # Save organized memories in correct Mem0 format
-=======
->>>>>>> master
-        if conversation_memories:
-            print("\n=== Conversation log ===")
-            for msg in conversation_memories:
-                print(msg)
-            print("========================\n")
-
-<<<<<<< HEAD
-            if preference_memories:
-                try:
-                    await mem0.add(
-                        preference_memories, user_id="RamX", category="preferences"
-                    )
-                    logging.info("Preferences saved in mem0.")
-                except (httpx.HTTPError, Exception) as e:
-                    logging.warning(f"Mem0 add preferences failed: {e}")
-=======
-        # Save organized memories in correct Mem0 format
-        if conversation_memories and mem0 is not None:
+        if journal is not None:
+            # Turns were journaled as they happened; pick up any the events missed, then flush the tail
             try:
-                await mem0.add(
-                    conversation_memories, user_id="RamX", category="conversation"
-                )
-                logging.info("Conversation saved in mem0.")
->>>>>>> master
-
-                if preference_memories:
-                    try:
-                        await mem0.add(
-                            preference_memories, user_id="RamX", category="preferences"
-                        )
-                        logging.info("Preferences saved in mem0.")
-                    except (httpx.HTTPError, Exception) as e:
-                        logging.warning(f"Mem0 add preferences failed: {e}")
+                journal.record_new(chat_ctx.items)
+                conversation_memories = journal.session_log()
+                # Print conversation to console
+                if conversation_memories:
+                    print("\n=== Conversation log ===")
+                    for msg in conversation_memories:
+                        print(msg)
+                    print("========================\n")
             except Exception as e:
-                logging.warning(f"Mem0 add conversation failed: {e}")
+                logging.warning(f"Memory journal read failed: {e}")
+            await journal.aclose()
+
+        # Close pooled connections of the network tools
+        await aclose_http_client()
+        close_search_backend()
 
     # Initialize session and variables
     session = AgentSession()
-<<<<<<< HEAD
-    # Initialize Mem0 client with API key if available
-    try:
-        mem0_api_key = os.getenv("MEM0_API_KEY")
-        mem0 = AsyncMemoryClient(api_key=mem0_api_key) if mem0_api_key else AsyncMemoryClient()
-    except Exception as e:
-        logging.warning(f"Mem0 client init failed, continuing without it: {e}")
-        mem0 = None
-=======
+    # Load the search client in the background so the first web_search does not pay for it
+    get_search_backend().warm()
+    # Same for the installed-app index used by open_application
+    get_app_index().warm()
     mem0 = None
-    mem0_api_key = None
->>>>>>> master
     user_name = "RamX"
     initial_ctx = ChatContext()
     memory_str = ""
-    agent_chat_ctx = None
-
-<<<<<<< HEAD
-    # Restore only preferences for cleaner context
-    results = []
-    if mem0 is not None:
-        try:
-            results = await mem0.get_all(user_id=user_name, category="preferences")
-        except Exception as e:
-            logging.warning(f"Mem0 get_all failed, skipping preferences load: {e}")
-    if results:
-        memories = [result["memory"] for result in results]
-        memory_str = json.dumps(memories, indent=2)
-        logging.info(f"Loaded preferences: {memory_str}")
-        initial_ctx.add_message(
-            role="assistant",
-            content=f"Here are known facts about the user {user_name}: {memory_str}",
-        )
 
-    # Start the agent session
-    await session.start(
-        room=ctx.room,
-        agent=Assistant(chat_ctx=initial_ctx),
-        room_input_options=RoomInputOptions(
-            noise_cancellation=noise_cancellation.BVC(),
-        ),
-    )
-
-    await ctx.connect()
-    # Start desktop avatar UI
-    avatar_proc = None
     try:
-        avatar_path = os.path.join(os.path.dirname(__file__), "avatar", "desktop_avatar.py")
-        avatar_proc = subprocess.Popen([sys.executable, "-u", avatar_path])
-        logging.info("Desktop avatar started")
-    except Exception as e:
-        logging.warning(f"Failed to start desktop avatar: {e}")
-
-    await session.generate_reply(instructions=SESSION_INSTRUCTION)
-
-    # Start background watcher to trigger avatar expressions from assistant messages
-    async def _expression_watcher(chat_ctx: ChatContext):
-        last_idx = 0
-        while True:
-            try:
-                items = list(chat_ctx.items)
-                if last_idx < len(items):
-                    new_items = items[last_idx:]
-                    last_idx = len(items)
-                    for it in new_items:
-                        try:
-                            role = getattr(it, "role", None)
-                            # Only watch assistant messages for expressions
-                            if role != "assistant":
-                                continue
-                            content = getattr(it, "content", "")
-                            if isinstance(content, list):
-                                text = "".join(map(str, content))
-                            else:
-                                text = str(content)
-                            
-                            if not text or not text.strip():
-                                continue
-                                
-                            low = text.lower()
-                            logging.info(f"[Expression Watcher] Checking: {text[:100]}...")
-                            
-                            # Map keywords to expressions
-                            expr = None
-                            dur = 1.2
-                            if any(k in low for k in ["winking face", "wink", "😉"]):
-                                expr = "wink"
-                                dur = 1.2
-                            elif any(k in low for k in ["open mouth smile", "big smile", "😀", "😃", "grin"]):
-                                expr = "smile_open"
-                                dur = 1.5
-                            elif any(k in low for k in ["cool", "sunglasses", "😎", "shades"]):
-                                expr = "cool"
-                                dur = 1.5
-                            elif any(k in low for k in ["happy", "joy", "joyful", "😊", "😄", "excited", "tears of joy", "awesome"]):
-                                expr = "happy"
-                                dur = 1.5
-                            elif any(k in low for k in ["sad", "crying", "😢", "😭", "unhappy"]):
-                                expr = "sad"
-                                dur = 2.0
-                            elif any(k in low for k in ["surprised", "shock", "😲", "😮", "amazed", "wow"]):
-                                expr = "surprised"
-                                dur = 1.3
-                            elif any(k in low for k in ["angry", "mad", "😠", "😡", "furious"]):
-                                expr = "angry"
-                                dur = 1.8
-                            elif any(k in low for k in ["sleepy", "tired", "😴", "yawn", "drowsy"]):
-                                expr = "sleepy"
-                                dur = 2.5
-                            elif any(k in low for k in ["thinking", "hmm", "🤔", "pondering", "let me think"]):
-                                expr = "thinking"
-                                dur = 2.0
-                            elif any(k in low for k in ["love", "heart", "😍", "❤️", "💕", "adore"]):
-                                expr = "love"
-                                dur = 2.0
-                            elif any(k in low for k in ["neutral face", "back to normal", "neutral"]):
-                                expr = "neutral"
-                                dur = 0.6
-                            if expr:
-                                logging.info(f"[Expression Watcher] Detected '{expr}' expression, triggering for {dur}s")
-                                try:
-                                    result = await set_avatar_expression(expr=expr, duration=dur)
-                                    logging.info(f"[Expression Watcher] Result: {result}")
-                                except Exception as e:
-                                    logging.warning(f"[Expression Watcher] set_avatar_expression failed: {e}")
-                        except Exception:
-                            pass
-                await asyncio.sleep(0.1)  # Check every 100ms for faster response
-            except asyncio.CancelledError:
-                break
-            except Exception:
-                await asyncio.sleep(0.5)
-
-    expr_task = asyncio.create_task(_expression_watcher(session._agent.chat_ctx))
-
-    ctx.add_shutdown_callback(
-        lambda: shutdown_hook(session._agent.chat_ctx, mem0, memory_str, avatar_proc, expr_task)
-    )
-=======
-    try:
-        # Initialize Mem0 client with API key if available
+        # Initialize the memory backend: the embedded local store, or Mem0 when MEMORY_BACKEND / MEM0_API_KEY select it
         try:
-            mem0_api_key = os.getenv("MEM0_API_KEY")
-            mem0 = AsyncMemoryClient(api_key=mem0_api_key) if mem0_api_key else AsyncMemoryClient()
+            if use_local_memory() or AsyncMemoryClient is None:
+                mem0 = LocalMemoryClient()
+            else:
+                mem0_api_key = os.getenv("MEM0_API_KEY")
+                mem0 = AsyncMemoryClient(api_key=mem0_api_key) if mem0_api_key else AsyncMemoryClient()
         except Exception as e:
-            logging.warning(f"Mem0 client init failed, continuing without it: {e}")
+            logging.warning(f"Memory client init failed, continuing without it: {e}")
             mem0 = None
 
         # Restore only preferences for cleaner context
@@ -342,38 +140,64 @@ async def entrypoint(ctx: agents.JobContext):
             except Exception as e:
                 logging.warning(f"Mem0 get_all failed, skipping preferences load: {e}")
         if results:
-            memories = [result["memory"] for result in results]
-            memory_str = json.dumps(memories, indent=2)
-            logging.info(f"Loaded preferences: {memory_str}")
+            # Only the best-ranked preferences that fit the token budget go into the prompt
+            memory_ctx = build_memory_context(results, topic=last_topic())
+            memory_str = memory_ctx.text
+            logging.info(f"Loaded preferences:\n{memory_str}")
+            start_news_prefetch(memory_texts(results))
             initial_ctx.add_message(
                 role="assistant",
-                content=f"Here are known facts about the user {user_name}: {memory_str}",
+                content=f"Here are known facts about the user {user_name}:\n{memory_str}",
             )
 
+        # Journal each turn as it is added; shutdown then only flushes what is still pending
+        journal = MemoryJournal(backend=mem0, user_id=user_name, known=initial_ctx.items)
+        journal.attach(session)
+        journal.start()
+
         # Start the agent session
         await session.start(
             room=ctx.room,
             agent=Assistant(chat_ctx=initial_ctx),
             room_input_options=RoomInputOptions(
-                noise_cancellation=None,
+                noise_cancellation=noise_cancellation.BVC(),
             ),
         )
 
         await ctx.connect()
-        
-        await session.generate_reply(instructions=SESSION_INSTRUCTION)
+        # Start desktop avatar UI
+        avatar_proc = None
+        try:
+            avatar_path = os.path.join(os.path.dirname(__file__), "avatar", "desktop_avatar.py")
+            # Lip-sync levels are pushed from this process (see LipSyncAudioOutput)
+            avatar_proc = subprocess.Popen([sys.executable, "-u", avatar_path, "--audio", "push"])
+            logging.info("Desktop avatar started")
+        except Exception as e:
+            logging.warning(f"Failed to start desktop avatar: {e}")
+
+        # Measure the assistant's outgoing audio and push the levels to the avatar
+        try:
+            if session.output.audio is not None:
+                session.output.audio = LipSyncAudioOutput(session.output.audio, get_avatar_channel())
+        except Exception as e:
+            logging.warning(f"Failed to attach avatar lip-sync: {e}")
 
-        # Proper async shutdown callback wrapper
+        # Trigger avatar expressions from assistant messages as they are added to the conversation
+        expr_pipeline = ExpressionPipeline(dispatch=set_avatar_expression)
+        expr_pipeline.attach(session)
+        expr_pipeline.start()
+
+        # Registered before the first reply, so the avatar and the journal are closed even if it fails
         async def _shutdown_wrapper():
-            final_chat_ctx = agent_chat_ctx if agent_chat_ctx is not None else ChatContext()
-            await shutdown_hook(final_chat_ctx, mem0, memory_str)
-        
+            await shutdown_hook(session._agent.chat_ctx, journal, avatar_proc, expr_pipeline)
+
         ctx.add_shutdown_callback(_shutdown_wrapper)
-        
+
+        await session.generate_reply(instructions=SESSION_INSTRUCTION)
+
     except Exception as e:
         logging.error(f"Error in entrypoint: {e}")
         raise
->>>>>>> master
 
 
 if __name__ == "__main__":
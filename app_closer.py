@@ -0,0 +1,126 @@
+import os
+import subprocess
+import time
+from typing import Dict, Iterable, List, NamedTuple
+
+import psutil
+
+# Shared grace period for every process being closed, then survivors are killed
+CLOSE_TIMEOUT = float(os.getenv("APP_CLOSE_TIMEOUT", "3"))
+KILL_TIMEOUT = 1.0
+
+
+class CloseOutcome(NamedTuple):
+    pid: int
+    name: str
+    outcome: str  # "terminated", "killed", "already gone", "access denied" or "survived"
+
+
+class CloseReport(NamedTuple):
+    outcomes: List[CloseOutcome]
+    elapsed: float
+
+    @property
+    def closed(self) -> List[CloseOutcome]:
+        return [o for o in self.outcomes if o.outcome in ("terminated", "killed", "already gone")]
+
+    @property
+    def failed(self) -> List[CloseOutcome]:
+        return [o for o in self.outcomes if o.outcome in ("access denied", "survived")]
+
+    def summary(self) -> str:
+        counts: Dict[str, int] = {}
+        for o in self.outcomes:
+            counts[o.outcome] = counts.get(o.outcome, 0) + 1
+        return ", ".join(f"{n} {outcome}" for outcome, n in counts.items()) or "no processes"
+
+
+def _gone(proc: psutil.Process) -> bool:
+    # An exited process nobody has reaped yet (its parent was closed too) still exists as a zombie
+    try:
+        return proc.status() == psutil.STATUS_ZOMBIE
+    except psutil.NoSuchProcess:
+        return True
+    except psutil.AccessDenied:
+        return False
+
+
+def _name(proc: psutil.Process) -> str:
+    try:
+        return proc.name()
+    except psutil.Error:
+        return "?"
+
+
+def close_process_trees(pids: Iterable[int], timeout: float = CLOSE_TIMEOUT,
+                        kill_timeout: float = KILL_TIMEOUT) -> CloseReport:
+    """
+    Close every process in `pids` together with all of its descendants.
+
+    The trees are collected first (children are re-parented once their parent exits), then
+    every process is sent terminate at once and all of them share one `timeout` in
+    psutil.wait_procs. Whatever is still alive is killed and given `kill_timeout` more.
+    Blocking; call it through asyncio.to_thread from async code.
+    """
+    started = time.perf_counter()
+    outcomes: Dict[int, CloseOutcome] = {}
+    procs: Dict[int, psutil.Process] = {}
+    names: Dict[int, str] = {}
+    for pid in pids:
+        try:
+            root = psutil.Process(pid)
+        except psutil.NoSuchProcess:
+            outcomes[pid] = CloseOutcome(pid, "?", "already gone")
+            continue
+        try:
+            tree = [root] + root.children(recursive=True)
+        except psutil.Error:
+            tree = [root]
+        for proc in tree:
+            if proc.pid not in procs and proc.pid != os.getpid():
+                procs[proc.pid] = proc
+                names[proc.pid] = _name(proc)
+
+    signalled = []
+    for pid, proc in procs.items():
+        try:
+            proc.terminate()
+            signalled.append(proc)
+        except psutil.NoSuchProcess:
+            outcomes[pid] = CloseOutcome(pid, names[pid], "already gone")
+        except psutil.AccessDenied:
+            outcomes[pid] = CloseOutcome(pid, names[pid], "access denied")
+
+    gone, alive = psutil.wait_procs(signalled, timeout=timeout)
+    survivors = []
+    for proc in alive:
+        if _gone(proc):
+            gone.append(proc)
+        else:
+            survivors.append(proc)
+    for proc in gone:
+        outcomes[proc.pid] = CloseOutcome(proc.pid, names[proc.pid], "terminated")
+
+    if survivors:
+        for proc in survivors:
+            try:
+                proc.kill()
+            except psutil.NoSuchProcess:
+                pass
+            except psutil.AccessDenied:
+                outcomes[proc.pid] = CloseOutcome(proc.pid, names[proc.pid], "access denied")
+        killable = [p for p in survivors if p.pid not in outcomes]
+        _, still_alive = psutil.wait_procs(killable, timeout=kill_timeout)
+        for proc in killable:
+            survived = proc in still_alive and not _gone(proc)
+            outcomes[proc.pid] = CloseOutcome(proc.pid, names[proc.pid], "survived" if survived else "killed")
+
+    if os.name == "nt":
+        # Elevated processes refuse TerminateProcess from a normal user; taskkill sometimes still can
+        for pid, outcome in list(outcomes.items()):
+            if outcome.outcome == "access denied":
+                result = subprocess.run(["taskkill", "/f", "/t", "/pid", str(pid)], capture_output=True)
+                if result.returncode == 0:
+                    outcomes[pid] = outcome._replace(outcome="killed")
+
+    return CloseReport(sorted(outcomes.values()), time.perf_counter() - started)
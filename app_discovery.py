@@ -0,0 +1,303 @@
+import json
+import logging
+import os
+import shlex
+import threading
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from app_registry import normalize_app_name
+from disk_cache import cache_path
+
+INDEX_VERSION = 1
+# Exec field codes (%f, %U, ...) are placeholders for files/URLs; launching without arguments drops them.
+# "@@u ... @@" are the markers flatpak wraps them in.
+_FIELD_CODES = {"%f", "%F", "%u", "%U", "%d", "%D", "%n", "%N", "%i", "%c", "%k", "%v", "%m", "@@", "@@u"}
+
+
+class InstalledApp(NamedTuple):
+    name: str  # display name ("Visual Studio Code") or executable name for $PATH entries
+    exec: str  # Exec line of the .desktop file, or the executable's full path
+    icon: str  # Icon name or path ("" if none)
+    path: str  # .desktop file or executable
+    kind: str  # "desktop" or "path"
+
+
+def xdg_application_dirs() -> List[str]:
+    """applications/ directories in XDG priority order (user data dir first)."""
+    data_home = os.getenv("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    data_dirs = (os.getenv("XDG_DATA_DIRS") or "/usr/local/share:/usr/share").split(os.pathsep)
+    dirs = [data_home] + [d for d in data_dirs if d]
+    # Flatpak and snap export their launchers here; sessions normally add them to XDG_DATA_DIRS already
+    dirs += [os.path.join(data_home, "flatpak", "exports", "share"), "/var/lib/flatpak/exports/share",
+             "/var/lib/snapd/desktop"]
+    seen = set()
+    result = []
+    for d in dirs:
+        path = os.path.join(os.path.abspath(d), "applications")
+        if path not in seen:
+            seen.add(path)
+            result.append(path)
+    return result
+
+
+def path_dirs() -> List[str]:
+    seen = set()
+    result = []
+    for d in (os.getenv("PATH") or "").split(os.pathsep):
+        d = os.path.abspath(d) if d else ""
+        if d and d not in seen:
+            seen.add(d)
+            result.append(d)
+    return result
+
+
+def parse_desktop_file(path: str) -> Optional[InstalledApp]:
+    """The launchable application described by a .desktop file, or None (hidden, not an app, no Exec)."""
+    fields: Dict[str, str] = {}
+    in_entry = False
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("["):
+                    if in_entry:
+                        break  # only the [Desktop Entry] group describes the app itself
+                    in_entry = line == "[Desktop Entry]"
+                elif in_entry and "=" in line and not line.startswith("#"):
+                    key, _, value = line.partition("=")
+                    fields.setdefault(key.strip(), value.strip())
+    except OSError:
+        return None
+    if fields.get("Type", "Application") != "Application" or not fields.get("Exec") or not fields.get("Name"):
+        return None
+    # Terminal apps (htop, vim) need a terminal the assistant does not open
+    if any(fields.get(k, "").lower() == "true" for k in ("NoDisplay", "Hidden", "Terminal")):
+        return None
+    return InstalledApp(fields["Name"], fields["Exec"], fields.get("Icon", ""), path, "desktop")
+
+
+def exec_argv(exec_line: str) -> List[str]:
+    """argv for a .desktop Exec line, with field codes removed and %% unescaped."""
+    try:
+        args = shlex.split(exec_line)
+    except ValueError:
+        args = exec_line.split()
+    return [a.replace("%%", "%") for a in args if a not in _FIELD_CODES]
+
+
+def _pathext() -> List[str]:
+    """Executable suffixes from PATHEXT (lowercase) on Windows; none elsewhere."""
+    if os.name != "nt":
+        return []
+    return [ext.lower() for ext in (os.getenv("PATHEXT") or ".EXE;.BAT;.CMD").split(";") if ext]
+
+
+def command_key(filename: str, pathext: List[str]) -> str:
+    """Index key of an executable: "Notepad.exe" becomes "notepad", as typed in a shell."""
+    key = filename.lower()
+    root, ext = os.path.splitext(key)
+    return root if ext in pathext else key
+
+
+def _is_executable(entry: os.DirEntry) -> bool:
+    try:
+        if not entry.is_file():
+            return False
+    except OSError:
+        return False
+    if os.name == "nt":
+        return os.path.splitext(entry.name)[1].lower() in _pathext()
+    return os.access(entry.path, os.X_OK)
+
+
+class AppIndex:
+    """
+    Index of installed applications: .desktop launchers from the XDG application dirs and
+    executables on $PATH, with name, Exec line and icon.
+
+    The index is persisted as JSON together with the mtime of every scanned directory. A
+    refresh stats the directories and rescans only those whose mtime changed (installing or
+    removing an app adds or removes a directory entry, which bumps it), so after the first
+    run a refresh costs a few dozen stat calls. Lookups refresh at most every
+    `check_interval` seconds, as AppRegistry does.
+    """
+
+    def __init__(self, index_path: Optional[str] = None, app_dirs: Optional[List[str]] = None,
+                 bin_dirs: Optional[List[str]] = None, check_interval: float = 5.0):
+        self.index_path = index_path or cache_path("app_index.json")
+        self.app_dirs = app_dirs if app_dirs is not None else xdg_application_dirs()
+        self.bin_dirs = bin_dirs if bin_dirs is not None else path_dirs()
+        self.check_interval = check_interval
+        # directory -> {"mtime": ns, "apps": [[name, exec, icon, path, kind], ...]}
+        self._dirs: Optional[Dict[str, dict]] = None
+        self._apps: List[InstalledApp] = []
+        self._by_name: Dict[str, InstalledApp] = {}
+        self._by_command: Dict[str, InstalledApp] = {}
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self.version = 0  # bumped whenever the set of apps changes
+        self.rescanned_dirs = 0
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                return data["dirs"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            logging.warning(f"Ignoring unreadable app index {self.index_path}: {e}")
+        return {}
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+            tmp = f"{self.index_path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "dirs": self._dirs}, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, self.index_path)
+        except OSError as e:
+            logging.warning(f"Failed to write app index {self.index_path}: {e}")
+
+    @staticmethod
+    def _mtime(directory: str) -> Optional[int]:
+        try:
+            return os.stat(directory).st_mtime_ns
+        except OSError:
+            return None
+
+    def _scan_app_dir(self, directory: str) -> Tuple[List[list], List[str]]:
+        apps, subdirs = [], []
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return apps, subdirs
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    subdirs.append(entry.path)
+                elif entry.name.endswith(".desktop"):
+                    app = parse_desktop_file(entry.path)
+                    if app is not None:
+                        apps.append(list(app))
+            except OSError:
+                continue
+        return apps, subdirs
+
+    def _scan_bin_dir(self, directory: str) -> List[list]:
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return []
+        return [[e.name, e.path, "", e.path, "path"] for e in entries if _is_executable(e)]
+
+    def _walk_app_dirs(self, old: Dict[str, dict], new: Dict[str, dict]) -> Iterator[str]:
+        """Yields every applications/ directory (and subdirectory), rescanning the changed ones into `new`."""
+        stack = list(reversed(self.app_dirs))
+        while stack:
+            directory = stack.pop()
+            mtime = self._mtime(directory)
+            if mtime is None:
+                continue
+            record = old.get(directory)
+            if record is None or record["mtime"] != mtime:
+                apps, subdirs = self._scan_app_dir(directory)
+                record = {"mtime": mtime, "apps": apps, "subdirs": subdirs}
+                self.rescanned_dirs += 1
+            new[directory] = record
+            yield directory
+            stack.extend(reversed(record.get("subdirs", [])))
+
+    def refresh(self, force: bool = False) -> bool:
+        """Rescan directories whose mtime changed; returns True if the index changed."""
+        with self._lock:
+            old = self._dirs if self._dirs is not None else self._load()
+            first = self._dirs is None
+            if force:
+                old = {}
+            new: Dict[str, dict] = {}
+            app_dirs = list(self._walk_app_dirs(old, new))
+            for directory in self.bin_dirs:
+                mtime = self._mtime(directory)
+                if mtime is None:
+                    continue
+                record = old.get(directory)
+                if record is None or record["mtime"] != mtime:
+                    record = {"mtime": mtime, "apps": self._scan_bin_dir(directory)}
+                    self.rescanned_dirs += 1
+                new[directory] = record
+            self._checked = time.monotonic()
+            changed = new != old
+            self._dirs = new
+            if changed:
+                self._save()
+            if changed or first:
+                self._rebuild(app_dirs)
+            return changed
+
+    def _rebuild(self, app_dirs: List[str]) -> None:
+        apps: List[InstalledApp] = []
+        by_name: Dict[str, InstalledApp] = {}
+        by_command: Dict[str, InstalledApp] = {}
+        # Launchers first, in XDG priority order: the first file with a given desktop-file ID wins
+        seen_ids = set()
+        pathext = _pathext()
+        roots = sorted(self.app_dirs, key=len, reverse=True)
+        for directory in app_dirs:
+            root = next((r for r in roots if directory == r or directory.startswith(r + os.sep)), directory)
+            for fields in self._dirs[directory]["apps"]:
+                app = InstalledApp(*fields)
+                desktop_id = os.path.relpath(app.path, root).replace(os.sep, "-")
+                if desktop_id in seen_ids:
+                    continue
+                seen_ids.add(desktop_id)
+                apps.append(app)
+                by_name.setdefault(normalize_app_name(app.name), app)
+                argv = exec_argv(app.exec)
+                if argv:
+                    by_command.setdefault(command_key(os.path.basename(argv[0]), pathext), app)
+        # Then executables, the first $PATH directory winning as in the shell
+        for directory in self.bin_dirs:
+            record = self._dirs.get(directory)
+            for fields in record["apps"] if record else ():
+                app = InstalledApp(*fields)
+                key = command_key(app.name, pathext)
+                if key not in by_command:
+                    by_command[key] = app
+                    apps.append(app)
+        self._apps, self._by_name, self._by_command = apps, by_name, by_command
+        self.version += 1
+
+    def _ensure_fresh(self) -> None:
+        if self._dirs is None or time.monotonic() - self._checked >= self.check_interval:
+            self.refresh()
+
+    def apps(self, kind: Optional[str] = None) -> List[InstalledApp]:
+        self._ensure_fresh()
+        return [a for a in self._apps if kind is None or a.kind == kind]
+
+    def lookup(self, name: str) -> Optional[InstalledApp]:
+        """App by display name ("Visual Studio Code") or command ("code", "firefox")."""
+        self._ensure_fresh()
+        key = normalize_app_name(name)
+        return self._by_name.get(key) or self._by_command.get(command_key(key, _pathext()))
+
+    def warm(self) -> None:
+        """Load or build the index in a background thread."""
+        threading.Thread(target=self._ensure_fresh, name="app-index", daemon=True).start()
+
+
+def launch_argv(app: InstalledApp) -> List[str]:
+    return exec_argv(app.exec) if app.kind == "desktop" else [app.exec]
+
+
+_index: Optional[AppIndex] = None
+
+
+def get_app_index() -> AppIndex:
+    global _index
+    if _index is None:
+        _index = AppIndex()
+    return _index
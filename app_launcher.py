@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import os
+import subprocess
+import time
+from typing import Iterable, NamedTuple, Optional, Set
+
+from process_snapshot import get_process_snapshot
+
+# How long a launch may take before the tool gives up waiting and answers anyway
+LAUNCH_DEADLINE = float(os.getenv("APP_LAUNCH_DEADLINE", "5"))
+# A process still running this long after exec is past missing-library / bad-argument failures
+SETTLE_TIME = 0.2
+_POLL_INTERVAL = 0.05
+
+# Launched apps outlive the tool call; the loop only holds tasks weakly, so keep the tasks that
+# wait on them (and their Process objects) until the app exits and asyncio has reaped it
+_reapers: Set[asyncio.Task] = set()
+
+
+class LaunchResult(NamedTuple):
+    ok: bool
+    pid: Optional[int]  # the app's process, when one was seen
+    latency: float  # seconds from the launch request to confirmation (or to giving up)
+    detail: str  # "running", "handed off", "already running", "exited with code 1", ...
+
+
+def running_pids(names: Iterable[str]) -> Set[int]:
+    """PIDs of processes with one of `names`, from a just-refreshed process snapshot."""
+    names = list(names)
+    if not names:
+        return set()
+    return get_process_snapshot().refresh().pids_for(names)
+
+
+async def wait_for_new_process(names: Iterable[str], before: Set[int], started: float,
+                               deadline: float = LAUNCH_DEADLINE) -> LaunchResult:
+    """Poll until a process with one of `names` appears that was not in `before`, or the deadline passes."""
+    names = list(names)
+    while True:
+        new = await asyncio.to_thread(running_pids, names)
+        new -= before
+        elapsed = time.perf_counter() - started
+        if new:
+            return LaunchResult(True, min(new), elapsed, "running")
+        if elapsed >= deadline:
+            return LaunchResult(False, None, elapsed, f"no new process within {deadline:.1f}s")
+        await asyncio.sleep(min(_POLL_INTERVAL, deadline - elapsed))
+
+
+async def _reap(proc: asyncio.subprocess.Process) -> None:
+    await proc.wait()
+
+
+def _reaped(task: asyncio.Task) -> None:
+    _reapers.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logging.warning(f"Waiting for a launched app failed: {task.exception()!r}")
+
+
+async def launch_and_verify(argv, process_names: Iterable[str] = (), deadline: float = LAUNCH_DEADLINE,
+                            settle: float = SETTLE_TIME) -> LaunchResult:
+    """
+    Start `argv` as an asyncio subprocess, detached from the assistant, and confirm it came up.
+
+    The launch is confirmed as soon as the process has stayed alive for `settle` seconds. If
+    it exits first, a non-zero code is a failure; a zero code means a launcher handed off to
+    the real app ("cmd /c start", wrapper scripts), which is then confirmed by a new PID with
+    one of `process_names` (or immediately, if it was already running). Never waits longer
+    than `deadline` seconds.
+    """
+    started = time.perf_counter()
+    process_names = list(process_names)
+    before = await asyncio.to_thread(running_pids, process_names) if process_names else set()
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *argv,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            cwd=os.path.expanduser("~"),
+            start_new_session=True,
+        )
+    except OSError as e:
+        return LaunchResult(False, None, time.perf_counter() - started, f"failed to start: {e}")
+    # The next process lookup (e.g. closing the app right away) must see the new process
+    get_process_snapshot().invalidate()
+
+    try:
+        code = await asyncio.wait_for(asyncio.shield(proc.wait()), timeout=min(settle, deadline))
+    except asyncio.TimeoutError:
+        task = asyncio.create_task(_reap(proc))
+        _reapers.add(task)
+        task.add_done_callback(_reaped)
+        return LaunchResult(True, proc.pid, time.perf_counter() - started, "running")
+
+    if code != 0:
+        return LaunchResult(False, None, time.perf_counter() - started, f"exited with code {code}")
+    if not process_names:
+        return LaunchResult(True, None, time.perf_counter() - started, "handed off")
+    if before:
+        return LaunchResult(True, min(before), time.perf_counter() - started, "already running")
+    result = await wait_for_new_process(process_names, before, started, deadline)
+    if not result.ok:
+        logging.info(f"Launcher {argv[0]} exited but none of {process_names} appeared: {result.detail}")
+    return result
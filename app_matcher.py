@@ -0,0 +1,181 @@
+import re
+from collections import Counter, defaultdict
+from itertools import chain
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+# Words speech-to-text adds around an app name that never identify the app
+FILLER_WORDS = {
+    "a", "an", "the", "my", "me", "for", "please", "app", "apps", "application", "program",
+    "software", "window", "browser",
+}
+# Below this score a match is a guess; callers should fall back to searching the system
+MIN_CONFIDENCE = 0.75
+_MAX_CANDIDATES = 12
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class AppCandidate(NamedTuple):
+    name: str  # display / launch name, e.g. "Google Chrome"
+    key: str  # lookup key for the launcher tables, e.g. "chrome"
+    source: str  # where the name came from: "alias", "fallback", "registry", ...
+
+
+class AppMatch(NamedTuple):
+    candidate: AppCandidate
+    score: float  # 1.0 = exact after normalization
+    variant: str  # indexed spelling that matched
+
+
+def name_tokens(text: str) -> List[str]:
+    """Lowercase word tokens without filler words; "Notepad++" -> ["notepad", "plus", "plus"]."""
+    text = text.lower().replace("+", " plus ").replace("&", " and ")
+    tokens = [t for t in _TOKEN_RE.findall(text) if t not in FILLER_WORDS]
+    return tokens or _TOKEN_RE.findall(text)
+
+
+def _trigrams(compact: str) -> Set[str]:
+    padded = f"  {compact} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance, or limit + 1 if it is larger than `limit`.
+    Bit-parallel (Myers / Hyyrö): one column of the DP table per character of `b`, held in
+    the bits of two integers, so an app-name comparison is a dozen integer operations.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if not a or not b:
+        return len(a) or len(b)
+    peq: Dict[str, int] = {}
+    for i, ch in enumerate(a):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+    mask = (1 << len(a)) - 1
+    last = 1 << (len(a) - 1)
+    pv, mv, score = mask, 0, len(a)
+    for ch in b:
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & mask
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+    return score if score <= limit else limit + 1
+
+
+class AppMatcher:
+    """
+    Precomputed fuzzy index over application names.
+
+    Every spelling (alias, registry name, launcher key) is normalized to its tokens and a
+    compact form without spaces, so "note pad", "Notepad" and "notepad app" all meet at
+    "notepad". Lookup is an exact dict hit on the compact form, otherwise the spellings that
+    share the most trigrams with the query are ranked by edit distance. Token containment
+    ("microsoft word" contains "word") also counts as a strong match, and so does a spoken
+    leading word that names only one app ("vlc" for "VLC Media Player").
+    """
+
+    def __init__(self):
+        self._variants: List[str] = []  # compact spelling per variant id
+        self._variant_tokens: List[Set[str]] = []
+        self._gram_counts: List[int] = []
+        self._first_tokens: List[str] = []
+        self._candidates: List[AppCandidate] = []
+        self._exact: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        self._token_postings: Dict[str, List[int]] = defaultdict(list)
+
+    def add(self, variant: str, candidate: AppCandidate) -> None:
+        tokens = name_tokens(variant)
+        compact = "".join(tokens)
+        if not compact or compact in self._exact:
+            return
+        vid = len(self._variants)
+        self._variants.append(compact)
+        self._variant_tokens.append(set(tokens))
+        self._first_tokens.append(tokens[0])
+        self._candidates.append(candidate)
+        self._exact[compact] = vid
+        grams = _trigrams(compact)
+        self._gram_counts.append(len(grams))
+        for gram in grams:
+            self._postings[gram].append(vid)
+        for token in set(tokens):
+            self._token_postings[token].append(vid)
+
+    def add_all(self, variants: Iterable[str], candidate: AppCandidate) -> None:
+        for variant in variants:
+            self.add(variant, candidate)
+
+    def __len__(self) -> int:
+        return len(self._variants)
+
+    def match(self, query: str, limit: int = 3) -> List[AppMatch]:
+        """Best matches for a spoken app name, highest score first."""
+        tokens = name_tokens(query)
+        compact = "".join(tokens)
+        if not compact:
+            return []
+        vid = self._exact.get(compact)
+        if vid is not None:
+            return [AppMatch(self._candidates[vid], 1.0, self._variants[vid])]
+
+        grams = _trigrams(compact)
+        shared = Counter(chain.from_iterable(self._postings.get(gram, ()) for gram in grams))
+        scores: Dict[int, float] = {}
+        ranked = []
+        for v, count in shared.items():
+            target_len = len(self._variants[v])
+            longest = max(len(compact), target_len)
+            max_edits = int(longest * (1 - MIN_CONFIDENCE))
+            # Each edit destroys at most three trigrams, so too few shared ones rule a spelling out
+            if abs(len(compact) - target_len) > max_edits \
+                    or count < max(len(grams), self._gram_counts[v]) - 3 * max_edits:
+                continue
+            ranked.append((count * 2 / (len(grams) + self._gram_counts[v]), v, max_edits, longest))
+        ranked.sort(reverse=True)
+        for _, v, max_edits, longest in ranked[:_MAX_CANDIDATES]:
+            distance = edit_distance(compact, self._variants[v], max_edits)
+            if distance <= max_edits:
+                scores[v] = 1.0 - distance / longest
+
+        query_tokens = set(tokens)
+        spoken = set()  # spellings whose every word was spoken ("word" in "microsoft word please")
+        started = set()  # spellings that begin with every spoken word ("vlc" for "VLC Media Player")
+        for token in query_tokens:
+            for v in self._token_postings.get(token, ()):
+                variant_tokens = self._variant_tokens[v]
+                if len(tokens) > 1 and len(self._variants[v]) >= 4 and variant_tokens <= query_tokens:
+                    spoken.add(v)
+                elif len(compact) >= 3 and query_tokens <= variant_tokens and self._first_tokens[v] in query_tokens:
+                    started.add(v)
+        for v in spoken:
+            scores[v] = max(scores.get(v, 0.0), 0.85 + 0.1 * len(self._variants[v]) / len(compact))
+        # A leading word is only a confident match if it names a single app
+        prefix_score = 0.8 if len({self._candidates[v] for v in started}) == 1 else 0.6
+        for v in started:
+            scores[v] = max(scores.get(v, 0.0), prefix_score)
+
+        best: Dict[AppCandidate, AppMatch] = {}
+        for v, score in sorted(scores.items(), key=lambda item: item[1], reverse=True):
+            cand = self._candidates[v]
+            if cand not in best:
+                best[cand] = AppMatch(cand, round(min(score, 0.99), 3), self._variants[v])
+                if len(best) == limit:
+                    break
+        return list(best.values())
+
+    def best(self, query: str, min_score: float = MIN_CONFIDENCE) -> Optional[AppMatch]:
+        """The top match if it is confident enough, else None."""
+        matches = self.match(query, limit=1)
+        if matches and matches[0].score >= min_score:
+            return matches[0]
+        return None
@@ -0,0 +1,187 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+DB_PATH = "Ramx.db"
+
+# Table per kind of entry: (table, target column)
+TABLES = {
+    "sys": ("sys_command", "path"),
+    "web": ("web_command", "url"),
+}
+# Early versions of db.py created these misspelled tables
+_LEGACY_TABLES = {"sys": "sys_commmand", "web": "web_commmand"}
+SCHEMA_VERSION = 1
+
+
+class AppEntry(NamedTuple):
+    name: str
+    target: str  # executable path (sys) or URL (web)
+    kind: str  # "sys" or "web"
+
+
+def normalize_app_name(name: str) -> str:
+    return " ".join(name.strip().lower().split())
+
+
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    """
+    Create the app tables, add the normalized-name key with its UNIQUE index, and migrate
+    rows out of the legacy *_commmand tables. Safe to run on every start.
+    """
+    tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    with conn:
+        for kind, (table, column) in TABLES.items():
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table}("
+                f"id INTEGER PRIMARY KEY, "
+                f"name TEXT NOT NULL CHECK (length(trim(name)) > 0), "
+                f"{column} TEXT NOT NULL CHECK (length(trim({column})) > 0), "
+                f"key TEXT NOT NULL DEFAULT '')"
+            )
+            columns = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+            if "key" not in columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN key TEXT NOT NULL DEFAULT ''")
+            # Fill keys for rows written without one, then drop duplicates before indexing. Rows
+            # without a usable name (NULL in tables made by old code) keep the empty key and are never loaded
+            for row_id, name in conn.execute(
+                f"SELECT id, CAST(name AS TEXT) FROM {table} WHERE key = '' AND trim(coalesce(name, '')) != ''"
+            ).fetchall():
+                conn.execute(f"UPDATE {table} SET key = ? WHERE id = ?", (normalize_app_name(name), row_id))
+            conn.execute(f"DELETE FROM {table} WHERE id NOT IN (SELECT MIN(id) FROM {table} GROUP BY key)")
+            conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {table}_key ON {table}(key)")
+
+            legacy = _LEGACY_TABLES[kind]
+            if legacy in tables:
+                legacy_columns = [r[1] for r in conn.execute(f"PRAGMA table_info({legacy})")]
+                source = column if column in legacy_columns else legacy_columns[2]
+                rows = conn.execute(
+                    f"SELECT CAST(name AS TEXT), CAST({source} AS TEXT) FROM {legacy} "
+                    f"WHERE name IS NOT NULL AND {source} IS NOT NULL ORDER BY id"
+                ).fetchall()
+                for name, target in rows:
+                    if name and target and name.strip() and target.strip():
+                        conn.execute(
+                            f"INSERT OR IGNORE INTO {table}(name, {column}, key) VALUES (?, ?, ?)",
+                            (name.strip(), target.strip(), normalize_app_name(name)),
+                        )
+                conn.execute(f"DROP TABLE {legacy}")
+                logging.info(f"Migrated {len(rows)} rows from {legacy} to {table}")
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+class AppRegistry:
+    """
+    In-process mirror of the sys_command / web_command tables.
+
+    Both tables are loaded once into a dict keyed on the normalized name, so lookups are a
+    single dict access. At most every `check_interval` seconds a lookup checks whether the
+    database changed (PRAGMA data_version for commits from other connections, file identity
+    and mtime for a replaced file) and reloads the mirror if so.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, check_interval: float = 1.0):
+        self.db_path = db_path
+        self.check_interval = check_interval
+        self._conn: Optional[sqlite3.Connection] = None
+        self._apps: Dict[str, AppEntry] = {}
+        self._file_state: Optional[Tuple[int, int, int]] = None
+        self._data_version: Optional[int] = None
+        self._checked = 0.0
+        self._lock = threading.RLock()
+        self.reloads = 0
+
+    def _file_identity(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.db_path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            ensure_schema(self._conn)
+        return self._conn
+
+    def _reload(self) -> None:
+        conn = self._connect()
+        apps: Dict[str, AppEntry] = {}
+        # sys entries win over web entries with the same name, as in the old two-query lookup
+        for kind in ("web", "sys"):
+            table, column = TABLES[kind]
+            for name, target, key in conn.execute(f"SELECT name, {column}, key FROM {table} WHERE key != ''"):
+                apps[key] = AppEntry(name, target, kind)
+        self._apps = apps
+        self._data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        self._file_state = self._file_identity()
+        self._checked = time.monotonic()
+        self.reloads += 1
+
+    def _refresh(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and self._file_state is not None and now - self._checked < self.check_interval:
+            return
+        with self._lock:
+            file_state = self._file_identity()
+            if self._conn is not None and file_state is not None and self._file_state is not None \
+                    and file_state[0] != self._file_state[0]:
+                # The database file was replaced: the old connection points at the old file
+                self._conn.close()
+                self._conn = None
+            if force or self._conn is None or file_state != self._file_state \
+                    or self._conn.execute("PRAGMA data_version").fetchone()[0] != self._data_version:
+                self._reload()
+            self._checked = now
+
+    def lookup(self, name: str) -> Optional[AppEntry]:
+        self._refresh()
+        return self._apps.get(normalize_app_name(name))
+
+    def entries(self) -> List[AppEntry]:
+        self._refresh()
+        return list(self._apps.values())
+
+    def add(self, name: str, target: str, kind: str = "sys") -> None:
+        """Insert or update an entry (matched on the normalized name)."""
+        table, column = TABLES[kind]
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    f"INSERT INTO {table}(name, {column}, key) VALUES (?, ?, ?) "
+                    f"ON CONFLICT(key) DO UPDATE SET name = excluded.name, {column} = excluded.{column}",
+                    (name.strip(), target.strip(), normalize_app_name(name)),
+                )
+            self._refresh(force=True)
+
+    def remove(self, name: str) -> bool:
+        key = normalize_app_name(name)
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                removed = sum(
+                    conn.execute(f"DELETE FROM {table} WHERE key = ?", (key,)).rowcount
+                    for table, _ in TABLES.values()
+                )
+            self._refresh(force=True)
+        return removed > 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_registry: Optional[AppRegistry] = None
+
+
+def get_app_registry() -> AppRegistry:
+    global _registry
+    if _registry is None:
+        _registry = AppRegistry()
+    return _registry
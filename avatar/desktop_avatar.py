@@ -1,6 +1,10 @@
+import os
 import sys
 import time
 import json
+import wave
+from array import array
+from collections import deque
 
 from PySide6 import QtCore, QtGui, QtWidgets
 from PySide6.QtCore import Qt, QTimer
@@ -19,7 +23,124 @@ except Exception as e:
     AudioSession = None
 
 
-class AudioPeakMeter:
+class AudioLevelSource:
+    """
+    Where the avatar gets the assistant's voice level for lip-sync.
+    Backends: AudioPeakMeter (pycaw, Windows), PushedLevelSource (levels sent by the agent
+    over UDP) and WavReplayLevelSource (replays a WAV file, for tests and headless runs).
+    """
+
+    # Polled sources must be sampled by the timer even when idle to notice new audio;
+    # push-based sources wake the widget when data arrives instead.
+    polled = True
+    # Shaped sources deliver levels that already went through the lip-sync envelope
+    shaped = False
+
+    @property
+    def available(self) -> bool:
+        return False
+
+    def busy(self) -> bool:
+        """True while the source knows more audio is coming (keeps the render loop awake)."""
+        return False
+
+    def get_peak(self) -> float:
+        """Return current audio level [0.0, 1.0]. 0.0 if unavailable."""
+        return 0.0
+
+
+class PushedLevelSource(AudioLevelSource):
+    """
+    Levels computed by the agent from its outgoing TTS frames and sent over the UDP channel
+    as {"l": [level, ...], "d": seconds_per_level}, or already shaped by its envelope
+    follower as {"lx": "<one hex byte per level>", "d": ...}. The agent may send audio faster
+    than real time, so levels are queued and played out against the wall clock.
+    """
+
+    polled = False
+
+    def __init__(self):
+        self._levels: deque = deque()  # (level, duration)
+        self._current = 0.0
+        self._current_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    def push(self, levels, duration: float, shaped: bool = False):
+        self.shaped = shaped
+        duration = max(0.001, float(duration))
+        for level in levels:
+            self._levels.append((max(0.0, min(1.0, float(level))), duration))
+
+    def clear(self):
+        self._levels.clear()
+        self._current = 0.0
+        self._current_until = 0.0
+
+    def busy(self) -> bool:
+        return bool(self._levels)
+
+    def get_peak(self) -> float:
+        now = time.monotonic()
+        if now < self._current_until:
+            return self._current
+        # Continue right after the previous level, or start fresh after a gap
+        start = self._current_until if now - self._current_until < 0.1 else now
+        while self._levels:
+            level, duration = self._levels.popleft()
+            start += duration
+            if start > now:
+                self._current, self._current_until = level, start
+                return level
+        self._current = 0.0
+        return 0.0
+
+
+class WavReplayLevelSource(AudioLevelSource):
+    """Replays the peak envelope of a 16-bit PCM WAV file in real time."""
+
+    def __init__(self, path: str, window: float = 0.016, loop: bool = False):
+        with wave.open(path, "rb") as wav:
+            channels = wav.getnchannels()
+            rate = wav.getframerate()
+            if wav.getsampwidth() != 2:
+                raise ValueError("only 16-bit PCM WAV files are supported")
+            samples = array("h", wav.readframes(wav.getnframes()))
+        if sys.byteorder == "big":
+            samples.byteswap()
+        step = max(1, int(rate * window)) * channels
+        self._peaks = [
+            max(map(abs, samples[i:i + step]), default=0) / 32768.0
+            for i in range(0, len(samples), step)
+        ]
+        self._window = window
+        self._loop = loop
+        self._started = None
+
+    @property
+    def available(self) -> bool:
+        return bool(self._peaks)
+
+    def busy(self) -> bool:
+        return self._loop or self._started is None or self._index() < len(self._peaks)
+
+    def _index(self) -> int:
+        if self._started is None:
+            self._started = time.monotonic()
+        return int((time.monotonic() - self._started) / self._window)
+
+    def get_peak(self) -> float:
+        if not self._peaks:
+            return 0.0
+        i = self._index()
+        if self._loop:
+            i %= len(self._peaks)
+        return self._peaks[i] if i < len(self._peaks) else 0.0
+
+
+class AudioPeakMeter(AudioLevelSource):
     def __init__(self):
         """Initialize audio meter to capture ONLY system audio output (not microphone)"""
         self._meter = None
@@ -66,6 +187,10 @@ class AudioPeakMeter:
             print("   Note: You may need to run as administrator for system audio capture")
             self._meter = None
 
+    @property
+    def available(self) -> bool:
+        return self._meter is not None
+
     def get_peak(self) -> float:
         """Return current audio peak [0.0, 1.0]. 0.0 if unavailable."""
         if not self._meter:
@@ -84,8 +209,63 @@ class AudioPeakMeter:
             return 0.0
 
 
+EXPRESSIONS = {"wink", "smile_open", "neutral", "cool", "happy", "sad", "surprised", "angry", "sleepy", "thinking", "love"}
+
+
+# Expressions with a fixed mouth; the others (neutral, wink, cool) lip-sync to the audio level
+STATIC_MOUTH_EXPRESSIONS = {"happy", "smile_open", "sad", "surprised", "angry", "sleepy", "thinking", "love"}
+
+
+def make_audio_source(spec: str | None = None) -> AudioLevelSource:
+    """
+    Create the lip-sync level source from a spec: "pycaw", "push" or "wav:<path>".
+    Defaults to $RAMX_AVATAR_AUDIO, then pycaw when it is installed, else push.
+    """
+    spec = (spec or os.getenv("RAMX_AVATAR_AUDIO") or "").strip()
+    if spec.startswith("wav:"):
+        return WavReplayLevelSource(spec[4:])
+    if spec == "push":
+        return PushedLevelSource()
+    if spec == "pycaw" or AudioUtilities is not None:
+        return AudioPeakMeter()  # System audio only - no microphone
+    return PushedLevelSource()
+
+
+# Frame scheduling: full rate while talking or showing an expression, slow audio polling otherwise
+ACTIVE_INTERVAL_MS = 16
+IDLE_INTERVAL_MS = 100
+IDLE_LEVEL = 0.01
+# Mouth height is quantized to this many steps when deciding whether a repaint is needed
+LEVEL_STEPS = 64
+
+
+def decode_command(payload: dict):
+    """
+    Decode a parsed control datagram into (seq, [(expr, duration), ...], cmd).
+    Accepts the sequenced format {"s": 12, "q": [["happy", 0.5], ["wink", 0.3], ["neutral", 0]]},
+    commands such as {"s": 13, "cmd": "stats"}, and the legacy single-expression format
+    {"expr": "happy", "duration": 1.2} (seq is None). Unknown expressions are dropped.
+    """
+    seq = int(payload["s"]) if "s" in payload else None
+    cmd = payload.get("cmd")
+    if "q" in payload:
+        raw = payload.get("q") or []
+    elif "expr" in payload:
+        seq = None
+        raw = [[payload.get("expr", ""), payload.get("duration", 1.2)]]
+    else:
+        raw = []
+    steps = []
+    for step in raw:
+        expr = str(step[0]).strip().lower()
+        dur = float(step[1]) if len(step) > 1 else 1.2
+        if expr in EXPRESSIONS:
+            steps.append((expr, dur))
+    return seq, steps, cmd
+
+
 class AvatarWidget(QWidget):
-    def __init__(self):
+    def __init__(self, audio_source: AudioLevelSource | None = None):
         super().__init__()
         self.setWindowTitle("RamX Avatar")
         self.setWindowFlags(
@@ -97,23 +277,31 @@ class AvatarWidget(QWidget):
         self._drag_pos: QtCore.QPoint | None = None
         self._level = 0.0
         self._smoothed = 0.0
-        self._meter = AudioPeakMeter()  # System audio only - no microphone
+        self._meter = audio_source if audio_source is not None else make_audio_source()
         self._expr = "neutral"
         self._expr_until = 0.0
+        self._expr_queue: deque = deque()  # remaining (expr, duration) steps of a sequence
+        # Pre-rendered static face per (expr, width, height, dpr); cleared on resize
+        self._layers: dict = {}
+        self._layer_cache_enabled = True
 
-        # Update timer (approx 60 FPS)
+        # Adaptive update timer: ~60 FPS when active, slow polling (or stopped) when idle
         self._timer = QTimer(self)
         self._timer.timeout.connect(self._on_tick)
-        self._timer.start(16)
+        self._timer.start(ACTIVE_INTERVAL_MS)
+        self._painted_state = None
+        # Counters reported by the "stats" command
+        self._ticks = 0
+        self._frames = 0
+        self._stats_wall = time.monotonic()
+        self._stats_cpu = time.process_time()
 
         self._udp = QUdpSocket(self)
         self._udp.bind(QHostAddress.LocalHost, 8765)
         self._udp.readyRead.connect(self._on_udp)
 
-    def _on_tick(self):
-        # Read audio peak
-        level = self._meter.get_peak()
-        
+    def _shape_level(self, level: float):
+        """Amplify and smooth a raw meter reading into self._smoothed."""
         # Amplify the level for more visible movement (boost quiet sounds)
         # Apply a power curve to make small sounds more visible
         if level > 0.01:  # Ignore very quiet noise
@@ -128,42 +316,160 @@ class AvatarWidget(QWidget):
             self._smoothed = self._smoothed * (1 - attack) + level * attack
         else:
             self._smoothed = self._smoothed * (1 - decay) + level * decay
-        
+
+    def _on_tick(self):
+        # Read audio peak
+        level = self._meter.get_peak()
+        if self._meter.shaped:
+            # The agent's envelope follower already amplified and smoothed these levels
+            self._smoothed = level
+        else:
+            self._shape_level(level)
         self._level = max(0.0, min(1.0, self._smoothed))
-        
-        if self._expr != "neutral" and time.time() >= self._expr_until:
-            self._expr = "neutral"
-        self.update()
+
+        if self._expr_until and time.time() >= self._expr_until:
+            if self._expr_queue:
+                self.set_expression(*self._expr_queue.popleft())
+            else:
+                self._expr = "neutral"
+                self._expr_until = 0.0
+
+        self._ticks += 1
+        self._schedule()
+        # Repaint only when the picture would actually change
+        state = self._visual_state()
+        if state != self._painted_state:
+            self._painted_state = state
+            self.update()
+
+    def _visual_state(self):
+        if self._expr in STATIC_MOUTH_EXPRESSIONS:
+            return (self._expr,)
+        return (self._expr, round(self._level * LEVEL_STEPS))
+
+    def _schedule(self):
+        """Pick the timer rate for the next tick."""
+        if self._smoothed > IDLE_LEVEL or self._expr_until or self._expr != "neutral" or self._meter.busy():
+            interval = ACTIVE_INTERVAL_MS
+        elif self._meter.polled and self._meter.available:
+            # Keep polling the audio meter slowly so speech wakes us up
+            interval = IDLE_INTERVAL_MS
+        else:
+            # Nothing can change until a UDP command arrives
+            self._timer.stop()
+            return
+        if self._timer.interval() != interval or not self._timer.isActive():
+            self._timer.start(interval)
+
+    def _wake(self):
+        if self._timer.interval() != ACTIVE_INTERVAL_MS or not self._timer.isActive():
+            self._timer.start(ACTIVE_INTERVAL_MS)
+
+    def _stats(self) -> dict:
+        """Frame counters and CPU usage since the previous stats request."""
+        wall, cpu = time.monotonic(), time.process_time()
+        elapsed = max(1e-6, wall - self._stats_wall)
+        stats = {
+            "ticks": self._ticks,
+            "frames": self._frames,
+            "fps": round(self._frames / elapsed, 1),
+            "cpu_percent": round((cpu - self._stats_cpu) / elapsed * 100, 2),
+            "interval_ms": self._timer.interval() if self._timer.isActive() else 0,
+            "window_s": round(elapsed, 2),
+        }
+        self._ticks = self._frames = 0
+        self._stats_wall, self._stats_cpu = wall, cpu
+        return stats
 
     def set_expression(self, expr: str, duration: float = 1.2):
         self._expr = expr
         self._expr_until = time.time() + max(0.1, duration)
+        self._wake()
+
+    def play_sequence(self, steps):
+        """Play [(expr, duration), ...] in order, replacing any sequence in progress."""
+        self._expr_queue = deque(steps[1:])
+        if steps:
+            self.set_expression(*steps[0])
 
     def _on_udp(self):
         while self._udp.hasPendingDatagrams():
             datagram = self._udp.receiveDatagram()
             try:
                 payload = json.loads(bytes(datagram.data()).decode("utf-8", errors="ignore"))
-                expr = str(payload.get("expr", "")).strip().lower()
-                dur = float(payload.get("duration", 1.2))
-                if expr in {"wink", "smile_open", "neutral", "cool", "happy", "sad", "surprised", "angry", "sleepy", "thinking", "love"}:
-                    self.set_expression(expr, dur)
+                if "lx" in payload or "l" in payload:
+                    # Lip-sync levels pushed by the agent
+                    if isinstance(self._meter, PushedLevelSource):
+                        if "lx" in payload:
+                            levels = [b / 255 for b in bytes.fromhex(payload["lx"])]
+                            self._meter.push(levels, payload.get("d", 0.016), shaped=True)
+                        else:
+                            self._meter.push(payload["l"], payload.get("d", 0.02))
+                        self._wake()
+                    continue
+                seq, steps, cmd = decode_command(payload)
             except Exception:
-                pass
+                continue
+            if cmd == "clear_levels" and isinstance(self._meter, PushedLevelSource):
+                self._meter.clear()
+            if steps:
+                self.play_sequence(steps)
+            if seq is not None:
+                # Acknowledge so the agent can tell the avatar is alive
+                reply = {"ack": seq}
+                if cmd == "stats":
+                    reply["stats"] = self._stats()
+                ack = json.dumps(reply, separators=(",", ":")).encode("utf-8")
+                self._udp.writeDatagram(ack, datagram.senderAddress(), datagram.senderPort())
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
+    def _face_rect(self) -> QtCore.QRectF:
+        # Centered square within the widget, inset for the glow
         rect = self.rect().adjusted(8, 8, -8, -8)
-
-        # Create a centered square within rect and clip to a circle
         size = min(rect.width(), rect.height())
-        face_rect = QtCore.QRectF(
+        return QtCore.QRectF(
             rect.center().x() - size / 2,
             rect.center().y() - size / 2,
             size,
             size,
         )
+
+    def resizeEvent(self, event):
+        self._layers.clear()
+        super().resizeEvent(event)
+
+    def _static_layer(self, expr: str) -> QtGui.QPixmap:
+        """Pre-rendered face for `expr` at the current size (everything except the lip-sync mouth)."""
+        dpr = self.devicePixelRatioF()
+        key = (expr, self.width(), self.height(), dpr)
+        layer = self._layers.get(key)
+        if layer is None:
+            layer = QtGui.QPixmap(round(self.width() * dpr), round(self.height() * dpr))
+            layer.setDevicePixelRatio(dpr)
+            layer.fill(Qt.transparent)
+            painter = QPainter(layer)
+            painter.setRenderHint(QPainter.Antialiasing)
+            self._paint_static(painter, self._face_rect(), expr)
+            painter.end()
+            self._layers[key] = layer
+        return layer
+
+    def paintEvent(self, event):
+        self._frames += 1
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        face_rect = self._face_rect()
+        if self._layer_cache_enabled:
+            painter.drawPixmap(0, 0, self._static_layer(self._expr))
+        else:
+            self._paint_static(painter, face_rect, self._expr)
+        # Only the audio-driven mouth changes from frame to frame
+        if self._expr not in STATIC_MOUTH_EXPRESSIONS:
+            painter.setClipping(False)
+            self._paint_lip_sync_mouth(painter, face_rect)
+
+    def _paint_static(self, painter: QPainter, face_rect: QtCore.QRectF, expr: str):
+        size = face_rect.width()
+        # Clip to a circle
         circle_clip = QtGui.QPainterPath()
         circle_clip.addEllipse(face_rect)
         painter.setClipPath(circle_clip)
@@ -196,7 +502,7 @@ class AvatarWidget(QWidget):
         # === EXPRESSION-SPECIFIC EYE RENDERING ===
         
         # Cool expression - draw sunglasses instead of eyes
-        if self._expr == "cool":
+        if expr == "cool":
             # Draw cool sunglasses
             glasses_width = 80
             glasses_height = 28
@@ -239,36 +545,36 @@ class AvatarWidget(QWidget):
                 6, 4
             )
         # Wink expression - make right eye smaller
-        elif self._expr == "wink":
+        elif expr == "wink":
             right_h = 4
             right_eye_rect = QtCore.QRectF(cx + eye_gap - eye_w/2, eye_y + eye_h/2 - 2, eye_w, right_h)
         # Surprised expression - make eyes bigger
-        elif self._expr == "surprised":
+        elif expr == "surprised":
             eye_w, eye_h = 40, 40
             left_eye_rect = QtCore.QRectF(cx - eye_gap - eye_w/2, eye_y - 4, eye_w, eye_h)
             right_eye_rect = QtCore.QRectF(cx + eye_gap - eye_w/2, eye_y - 4, eye_w, eye_h)
         # Sleepy expression - half-closed eyes
-        elif self._expr == "sleepy":
+        elif expr == "sleepy":
             eye_h = 12
             left_eye_rect = QtCore.QRectF(cx - eye_gap - eye_w/2, eye_y + 10, eye_w, eye_h)
             right_eye_rect = QtCore.QRectF(cx + eye_gap - eye_w/2, eye_y + 10, eye_w, eye_h)
         # Angry expression - angled eyes
-        elif self._expr == "angry":
+        elif expr == "angry":
             # Will draw custom angry eyes below
             pass
         # Love expression - heart eyes
-        elif self._expr == "love":
+        elif expr == "love":
             # Will draw hearts below
             pass
         else:
             right_eye_rect = QtCore.QRectF(cx + eye_gap - eye_w/2, eye_y, eye_w, right_h)
         
-        if self._expr not in {"cool", "angry", "love"}:
+        if expr not in {"cool", "angry", "love"}:
             left_eye_rect = QtCore.QRectF(cx - eye_gap - eye_w/2, eye_y, eye_w, left_h)
         
         # Add blush for certain expressions
-        if self._expr in {"happy", "smile_open", "love", "wink"}:
-            blush_color = QColor(255, 150, 180, 100) if self._expr == "love" else QColor(255, 180, 200, 80)
+        if expr in {"happy", "smile_open", "love", "wink"}:
+            blush_color = QColor(255, 150, 180, 100) if expr == "love" else QColor(255, 180, 200, 80)
             painter.setBrush(QBrush(blush_color))
             painter.setPen(Qt.NoPen)
             # Left blush
@@ -283,18 +589,18 @@ class AvatarWidget(QWidget):
             )
         
         # Draw eye shadows for depth (except for special expressions)
-        if self._expr not in {"cool", "love"}:
+        if expr not in {"cool", "love", "angry"}:
             shadow_color = QColor(0, 0, 0, 40)
             painter.setBrush(QBrush(shadow_color))
             painter.setPen(Qt.NoPen)
-            if self._expr != "wink":
+            if expr != "wink":
                 painter.drawEllipse(left_eye_rect.adjusted(0, 2, 0, 2))
                 painter.drawEllipse(right_eye_rect.adjusted(0, 2, 0, 2))
             else:
                 painter.drawEllipse(left_eye_rect.adjusted(0, 2, 0, 2))
         
         # Draw eye whites (larger circles) - skip for special expressions
-        if self._expr == "love":
+        if expr == "love":
             # Draw heart eyes with gradient
             heart_size = 30
             
@@ -343,7 +649,7 @@ class AvatarWidget(QWidget):
             )
             painter.drawPath(right_heart_path)
             
-        elif self._expr == "angry":
+        elif expr == "angry":
             # Draw angry angled eyes
             painter.setBrush(QBrush(QColor(255, 255, 255)))
             painter.setPen(Qt.NoPen)
@@ -369,11 +675,11 @@ class AvatarWidget(QWidget):
                 QtCore.QPointF(cx + eye_gap + angry_eye_w/2 + 5, eye_y - 8)
             )
             
-        elif self._expr != "cool":
+        elif expr != "cool":
             painter.setBrush(QBrush(QColor(255, 255, 255)))
             painter.setPen(Qt.NoPen)
             painter.drawEllipse(left_eye_rect)
-            if self._expr != "wink":
+            if expr != "wink":
                 painter.drawEllipse(right_eye_rect)
             else:
                 # Draw wink as a curved line
@@ -381,7 +687,7 @@ class AvatarWidget(QWidget):
                 painter.drawArc(right_eye_rect, 0, 180 * 16)
         
         # Draw pupils (bigger and cuter) - skip for special expressions
-        if self._expr == "surprised":
+        if expr == "surprised":
             # Bigger pupils for surprised look
             pupil_size = 18
             pupil_offset_y = 0
@@ -407,7 +713,7 @@ class AvatarWidget(QWidget):
                 4, 4
             )
             
-        elif self._expr == "angry":
+        elif expr == "angry":
             # Small intense pupils
             pupil_size = 12
             painter.setBrush(QBrush(QColor(30, 30, 40)))
@@ -420,7 +726,7 @@ class AvatarWidget(QWidget):
                 pupil_size/2, pupil_size/2
             )
             
-        elif self._expr == "sleepy":
+        elif expr == "sleepy":
             # Droopy pupils
             pupil_size = 10
             painter.setBrush(QBrush(QColor(30, 30, 40)))
@@ -433,7 +739,7 @@ class AvatarWidget(QWidget):
                 pupil_size/2, pupil_size/2
             )
             
-        elif self._expr not in {"wink", "cool", "love", "thinking"}:
+        elif expr not in {"wink", "cool", "love", "thinking"}:
             pupil_size = 14
             pupil_offset_y = 3
             
@@ -485,7 +791,7 @@ class AvatarWidget(QWidget):
                 ),
                 2, 2
             )
-        elif self._expr == "wink":
+        elif expr == "wink":
             # Left eye pupil when winking
             pupil_size = 14
             pupil_offset_y = 3
@@ -501,7 +807,7 @@ class AvatarWidget(QWidget):
                 2.5, 2.5
             )
             
-        elif self._expr == "thinking":
+        elif expr == "thinking":
             # Eyes looking up and to the side
             pupil_size = 14
             painter.setBrush(QBrush(QColor(30, 30, 40)))
@@ -517,7 +823,7 @@ class AvatarWidget(QWidget):
         # === CUTE MOUTH ===
         mouth_y_base = face_rect.top() + face_rect.height() * 0.68
         
-        if self._expr == "happy" or self._expr == "smile_open":
+        if expr == "happy" or expr == "smile_open":
             # Big happy smile with enhanced gradient
             mouth_width = face_rect.width() * 0.45
             mouth_h = 35
@@ -550,7 +856,7 @@ class AvatarWidget(QWidget):
                 mouth_rect.height() * 0.3
             )
             painter.drawRoundedRect(tongue_rect, 8, 8)
-        elif self._expr == "sad":
+        elif expr == "sad":
             # Sad downturned eyebrows
             painter.setPen(QPen(QColor(100, 130, 180), 3.5, Qt.SolidLine, Qt.RoundCap))
             # Left eyebrow (angled up on outer side)
@@ -593,7 +899,7 @@ class AvatarWidget(QWidget):
             # Draw downward arc (inverted) - starts at 180 degrees (left), goes -180 degrees (downward)
             painter.drawArc(mouth_rect, 180 * 16, -180 * 16)
             
-        elif self._expr == "surprised":
+        elif expr == "surprised":
             # Open O mouth with gradient
             mouth_size = 28
             mouth_center = QtCore.QPointF(face_rect.center().x(), mouth_y_base + 5)
@@ -611,7 +917,7 @@ class AvatarWidget(QWidget):
             painter.setPen(QPen(QColor(220, 50, 80), 2.5))
             painter.drawEllipse(mouth_center, mouth_size/2, mouth_size/2)
             
-        elif self._expr == "angry":
+        elif expr == "angry":
             # Angry gritted teeth
             mouth_width = face_rect.width() * 0.3
             mouth_h = 8
@@ -633,7 +939,7 @@ class AvatarWidget(QWidget):
                     QtCore.QPointF(x, mouth_rect.bottom())
                 )
                 
-        elif self._expr == "sleepy":
+        elif expr == "sleepy":
             # Small yawn
             mouth_width = face_rect.width() * 0.25
             mouth_h = 15
@@ -668,7 +974,7 @@ class AvatarWidget(QWidget):
                 "z"
             )
             
-        elif self._expr == "thinking":
+        elif expr == "thinking":
             # Small contemplative mouth
             mouth_width = face_rect.width() * 0.25
             painter.setBrush(Qt.NoBrush)
@@ -700,7 +1006,7 @@ class AvatarWidget(QWidget):
                 10, 10
             )
             
-        elif self._expr == "love":
+        elif expr == "love":
             # Happy upward curved smile for love expression
             mouth_width = face_rect.width() * 0.42
             mouth_h = 25
@@ -715,50 +1021,27 @@ class AvatarWidget(QWidget):
             # Draw upward arc (happy smile) - starts at 0 degrees (right), goes 180 degrees (upward)
             painter.drawArc(mouth_rect, 0, 180 * 16)
             
-        else:
-            # Animated mouth based on audio level (lip sync) with gradient
-            mouth_width = face_rect.width() * 0.35
-            base_height = 6
-            max_extra = 28
-            mouth_h = base_height + self._level * max_extra
-            mouth_x = face_rect.center().x() - mouth_width/2
-            mouth_y = mouth_y_base - mouth_h/2
-            mouth_rect = QtCore.QRectF(mouth_x, mouth_y, mouth_width, mouth_h)
-            
-            # Shadow for depth
-            if mouth_h > 8:
-                painter.setBrush(QBrush(QColor(0, 0, 0, 25)))
-                painter.setPen(Qt.NoPen)
-                painter.drawRoundedRect(mouth_rect.adjusted(0, 1, 0, 1), 12, 12)
-            
-            # Cute rounded mouth with gradient
-            mouth_grad = QtGui.QLinearGradient(mouth_rect.topLeft(), mouth_rect.bottomLeft())
-            mouth_grad.setColorAt(0, QColor(255, 100, 120))
-            mouth_grad.setColorAt(1, QColor(255, 80, 100))
-            painter.setBrush(QBrush(mouth_grad))
-            painter.setPen(QPen(QColor(220, 50, 80), 2))
-            painter.drawRoundedRect(mouth_rect, 12, 12)
 
         # Dynamic outer glow based on expression
         glow_color = QColor(100, 150, 255, 60)
         glow_width = 8
         
-        if self._expr == "love":
+        if expr == "love":
             glow_color = QColor(255, 100, 150, 80)
             glow_width = 10
-        elif self._expr == "angry":
+        elif expr == "angry":
             glow_color = QColor(255, 80, 80, 70)
             glow_width = 9
-        elif self._expr == "happy" or self._expr == "smile_open":
+        elif expr == "happy" or expr == "smile_open":
             glow_color = QColor(255, 200, 100, 70)
             glow_width = 9
-        elif self._expr == "sad":
+        elif expr == "sad":
             glow_color = QColor(100, 120, 180, 50)
             glow_width = 6
-        elif self._expr == "sleepy":
+        elif expr == "sleepy":
             glow_color = QColor(120, 120, 180, 40)
             glow_width = 6
-        elif self._expr == "surprised":
+        elif expr == "surprised":
             glow_color = QColor(150, 200, 255, 80)
             glow_width = 10
         
@@ -766,6 +1049,31 @@ class AvatarWidget(QWidget):
         painter.setBrush(Qt.NoBrush)
         painter.drawEllipse(face_rect.adjusted(4, 4, -4, -4))
 
+    def _paint_lip_sync_mouth(self, painter: QPainter, face_rect: QtCore.QRectF):
+        mouth_y_base = face_rect.top() + face_rect.height() * 0.68
+        # Animated mouth based on audio level (lip sync) with gradient
+        mouth_width = face_rect.width() * 0.35
+        base_height = 6
+        max_extra = 28
+        mouth_h = base_height + self._level * max_extra
+        mouth_x = face_rect.center().x() - mouth_width/2
+        mouth_y = mouth_y_base - mouth_h/2
+        mouth_rect = QtCore.QRectF(mouth_x, mouth_y, mouth_width, mouth_h)
+        
+        # Shadow for depth
+        if mouth_h > 8:
+            painter.setBrush(QBrush(QColor(0, 0, 0, 25)))
+            painter.setPen(Qt.NoPen)
+            painter.drawRoundedRect(mouth_rect.adjusted(0, 1, 0, 1), 12, 12)
+        
+        # Cute rounded mouth with gradient
+        mouth_grad = QtGui.QLinearGradient(mouth_rect.topLeft(), mouth_rect.bottomLeft())
+        mouth_grad.setColorAt(0, QColor(255, 100, 120))
+        mouth_grad.setColorAt(1, QColor(255, 80, 100))
+        painter.setBrush(QBrush(mouth_grad))
+        painter.setPen(QPen(QColor(220, 50, 80), 2))
+        painter.drawRoundedRect(mouth_rect, 12, 12)
+
     # Drag window
     def mousePressEvent(self, event: QtGui.QMouseEvent):
         if event.button() == Qt.LeftButton:
@@ -799,7 +1107,11 @@ class AvatarWidget(QWidget):
 
 def main():
     app = QApplication(sys.argv)
-    w = AvatarWidget()
+    # Optional: --audio pycaw|push|wav:<path>
+    spec = None
+    if "--audio" in sys.argv[1:-1]:
+        spec = sys.argv[sys.argv.index("--audio") + 1]
+    w = AvatarWidget(make_audio_source(spec))
     # Position bottom-right-ish of the primary screen
     screen = app.primaryScreen().availableGeometry()
     w.move(screen.right() - w.width() - 24, screen.bottom() - w.height() - 24)
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+from typing import List
+
+import numpy as np
+from livekit import rtc
+from livekit.agents.voice import io
+
+from set_avatar_expression import AvatarChannel
+
+# Windows of ~16 ms match the avatar's 60 FPS frame rate
+_WINDOW = 0.016
+# Levels are sent in small batches; the avatar plays them out in real time
+_LEVELS_PER_PACKET = 6
+
+
+class LevelEnvelope:
+    """
+    Lip-sync envelope follower over PCM frames, batched with NumPy.
+
+    Splits the audio into fixed windows (carrying the remainder across frames), measures the
+    peak (or RMS) of every window in one vectorized pass, then applies the same shaping the avatar used on
+    its meter readings: noise floor, 2.5x gain, 0.7 power curve and attack/decay smoothing.
+    Peak is the default because that shaping was tuned on GetPeakValue() readings; RMS reads
+    lower (3 dB for a pure tone, more for speech), so with the same gain the mouth opens less.
+    """
+
+    def __init__(
+        self,
+        window: float = _WINDOW,
+        measure: str = "peak",
+        gain: float = 2.5,
+        curve: float = 0.7,
+        attack: float = 0.5,
+        decay: float = 0.2,
+        floor: float = 0.01,
+    ):
+        self.window = window
+        self._measure = measure
+        self._gain = gain
+        self._curve = curve
+        self._attack = attack
+        self._decay = decay
+        self._floor = floor
+        self._rest = np.zeros(0, dtype=np.int16)
+        self._smoothed = 0.0
+
+    def reset(self) -> None:
+        self._rest = np.zeros(0, dtype=np.int16)
+        self._smoothed = 0.0
+
+    def process(self, pcm: np.ndarray, sample_rate: int, num_channels: int = 1) -> List[float]:
+        """Feed interleaved int16 samples; return the shaped levels of every completed window."""
+        step = max(1, int(sample_rate * self.window)) * num_channels
+        buf = np.concatenate((self._rest, pcm)) if self._rest.size else pcm
+        count = buf.size // step
+        self._rest = buf[count * step:].copy()
+        if not count:
+            return []
+
+        windows = buf[: count * step].reshape(count, step)
+        if self._measure == "rms":
+            squares = windows.astype(np.float32) ** 2
+            raw = np.sqrt(squares.mean(axis=1))
+        else:
+            raw = np.abs(windows.astype(np.int32)).max(axis=1)
+
+        # A frame yields only a window or two, so the shaping and the attack/decay recursion
+        # (which depends on the previous output) are cheaper on Python floats than as arrays
+        out = []
+        smoothed = self._smoothed
+        floor, gain, curve = self._floor, self._gain, self._curve
+        attack, decay = self._attack, self._decay
+        for peak in raw.tolist():
+            level = peak / 32768.0
+            if level > floor:
+                level = min(1.0, level * gain) ** curve
+            smoothed += (level - smoothed) * (attack if level > smoothed else decay)
+            out.append(smoothed)
+        self._smoothed = smoothed
+        return out
+
+
+def encode_levels(levels) -> str:
+    """Quantize levels to one byte each, hex encoded (2 characters per level on the wire)."""
+    return (np.asarray(levels, dtype=np.float32) * 255.0 + 0.5).astype(np.uint8).tobytes().hex()
+
+
+class LipSyncAudioOutput(io.AudioOutput):
+    """
+    Pass-through audio output that runs the assistant's TTS frames through a LevelEnvelope on
+    their way to the room and streams the shaped levels to the desktop avatar over its UDP
+    channel as {"lx": "<hex bytes>", "d": seconds_per_level}.
+    Install with: session.output.audio = LipSyncAudioOutput(session.output.audio, channel)
+    """
+
+    def __init__(self, next_in_chain: io.AudioOutput, channel: AvatarChannel):
+        super().__init__(
+            label="AvatarLipSync",
+            capabilities=io.AudioOutputCapabilities(pause=True),
+            next_in_chain=next_in_chain,
+            sample_rate=next_in_chain.sample_rate,
+        )
+        self._channel = channel
+        self._envelope = LevelEnvelope()
+        self._levels: List[float] = []
+
+    async def capture_frame(self, frame: rtc.AudioFrame) -> None:
+        await super().capture_frame(frame)
+        try:
+            pcm = np.frombuffer(frame.data, dtype=np.int16)
+            self._levels.extend(self._envelope.process(pcm, frame.sample_rate, frame.num_channels))
+            if len(self._levels) >= _LEVELS_PER_PACKET:
+                await self._channel.send_raw(self._take_levels())
+        except Exception as e:
+            logging.debug(f"[LipSync] level push failed: {e}")
+        await self.next_in_chain.capture_frame(frame)
+
+    def _take_levels(self) -> dict:
+        levels, self._levels = self._levels, []
+        return {"lx": encode_levels(levels), "d": self._envelope.window}
+
+    def flush(self) -> None:
+        super().flush()
+        self.next_in_chain.flush()
+        if self._levels:
+            self._send_later(self._take_levels())
+
+    def clear_buffer(self) -> None:
+        self.next_in_chain.clear_buffer()
+        # Interrupted: stop the mouth right away
+        self._levels = []
+        self._envelope.reset()
+        self._send_later({"cmd": "clear_levels"})
+
+    def _send_later(self, message: dict) -> None:
+        try:
+            asyncio.get_running_loop().create_task(self._channel.send_raw(message))
+        except RuntimeError:
+            pass
@@ -0,0 +1,121 @@
+"""
+Benchmark: app-name resolution for open_application, exact alias lookup vs the AppMatcher index.
+
+Runs a list of app names as speech-to-text tends to deliver them (split words, extra
+"app"/"browser", misspellings) and compares
+  - before: COMMON_ALIASES.get(name.lower()), then an exact FALLBACK_CMDS / registry key
+  - after:  AppMatcher.best(name) over the same vocabulary
+A resolution counts as correct when it names the expected app; names that are not installed
+("photoshop") are correct when nothing is matched, so they go to the Start Menu search.
+The vocabulary is copied from open_application.py, which needs pyautogui and a desktop to import.
+"""
+import statistics
+import time
+
+from app_matcher import AppCandidate, AppMatcher
+
+RUNS = 2000
+
+COMMON_ALIASES = {
+    "chrome": "Google Chrome", "google chrome": "Google Chrome", "edge": "Microsoft Edge",
+    "microsoft edge": "Microsoft Edge", "calc": "Calculator", "calculator": "Calculator",
+    "notepad": "Notepad", "notepad++": "Notepad++", "word": "Word", "microsoft word": "Word",
+    "ms word": "Word", "excel": "Excel", "microsoft excel": "Excel", "ms excel": "Excel",
+    "powerpoint": "PowerPoint", "microsoft powerpoint": "PowerPoint", "paint": "Paint",
+    "ms paint": "Paint", "vscode": "Visual Studio Code", "vs code": "Visual Studio Code",
+    "visual studio code": "Visual Studio Code", "telegram": "Telegram", "spotify": "Spotify",
+    "discord": "Discord", "file explorer": "File Explorer", "explorer": "File Explorer",
+}
+FALLBACK_KEYS = ["chrome", "google chrome", "edge", "microsoft edge", "notepad", "calculator",
+                 "word", "excel", "powerpoint", "paint", "telegram"]
+REGISTRY = ["Web Whatsapp", "Canva", "Zoom", "Slack", "Obsidian", "Steam", "VLC Media Player", "OBS Studio"]
+REGISTRY_KEYS = {name.lower(): name for name in REGISTRY}
+
+# (spoken name, expected app or None)
+QUERIES = [
+    ("chrome", "Google Chrome"), ("Chrome", "Google Chrome"), ("chrome browser", "Google Chrome"),
+    ("google crome", "Google Chrome"), ("crome", "Google Chrome"), ("the chrome app", "Google Chrome"),
+    ("note pad", "Notepad"), ("notepad", "Notepad"), ("note pad app", "Notepad"),
+    ("notepad plus plus", "Notepad++"), ("note pad plus plus", "Notepad++"),
+    ("vs code", "Visual Studio Code"), ("v s code", "Visual Studio Code"), ("visual studio", "Visual Studio Code"),
+    ("vscode", "Visual Studio Code"), ("calculater", "Calculator"), ("calculator app", "Calculator"),
+    ("power point", "PowerPoint"), ("powerpoint", "PowerPoint"), ("microsoft power point", "PowerPoint"),
+    ("ms paint", "Paint"), ("m s paint", "Paint"), ("paint", "Paint"), ("excell", "Excel"),
+    ("microsoft excel", "Excel"), ("micro soft word", "Word"), ("ms word", "Word"),
+    ("telegram app", "Telegram"), ("telegramm", "Telegram"), ("microsoft edge browser", "Microsoft Edge"),
+    ("edge", "Microsoft Edge"), ("spotifi", "Spotify"), ("discord app", "Discord"),
+    ("file explorer", "File Explorer"), ("files explorer", "File Explorer"),
+    ("web whatsapp", "Web Whatsapp"), ("whatsapp web", "Web Whatsapp"), ("canva", "Canva"), ("canvas", "Canva"),
+    ("zoom app", "Zoom"), ("obsidian", "Obsidian"), ("vlc", "VLC Media Player"), ("vlc player", "VLC Media Player"),
+    ("obs", "OBS Studio"), ("steam app", "Steam"),
+    ("photoshop", None), ("blender", None), ("minecraft", None), ("settings", None), ("gimp", None),
+    ("microsoft", None),
+]
+
+
+def build_matcher() -> AppMatcher:
+    matcher = AppMatcher()
+    for name in REGISTRY:
+        matcher.add(name, AppCandidate(name, name.lower(), "registry"))
+    for alias, display in COMMON_ALIASES.items():
+        candidate = AppCandidate(display, display.lower(), "builtin")
+        matcher.add(display, candidate)
+        matcher.add(alias, candidate)
+    for key in FALLBACK_KEYS:
+        display = COMMON_ALIASES.get(key, key)
+        matcher.add(key, AppCandidate(display, display.lower(), "builtin"))
+    return matcher
+
+
+def exact_lookup(name: str):
+    key = name.strip().lower()
+    if key in COMMON_ALIASES:
+        return COMMON_ALIASES[key]
+    if key in REGISTRY_KEYS:
+        return REGISTRY_KEYS[key]
+    return COMMON_ALIASES.get(key, key) if key in FALLBACK_KEYS else None
+
+
+def fuzzy_lookup(matcher: AppMatcher):
+    def lookup(name: str):
+        match = matcher.best(name)
+        return match.candidate.name if match else None
+    return lookup
+
+
+def evaluate(label, lookup):
+    correct = 0
+    misses = []
+    for query, expected in QUERIES:
+        got = lookup(query)
+        if got == expected:
+            correct += 1
+        else:
+            misses.append(f"{query!r} -> {got!r}")
+
+    timings = []
+    for _ in range(RUNS // len(QUERIES) + 1):
+        for query, _ in QUERIES:
+            start = time.perf_counter()
+            lookup(query)
+            timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+    p99 = timings[int(len(timings) * 0.99)]
+    print(f"{label:<24} accuracy {correct}/{len(QUERIES)} ({correct / len(QUERIES):.0%})   "
+          f"p50 {statistics.median(timings):6.1f} µs   p99 {p99:6.1f} µs")
+    for miss in misses:
+        print(f"    wrong: {miss}")
+    return correct
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("APP NAME MATCHING BENCHMARK")
+    print("=" * 60)
+    start = time.perf_counter()
+    matcher = build_matcher()
+    print(f"index: {len(matcher)} spellings built in {(time.perf_counter() - start) * 1e3:.2f} ms")
+    baseline = evaluate("exact aliases (before)", exact_lookup)
+    fuzzy = evaluate("AppMatcher (after)", fuzzy_lookup(matcher))
+    print(f"\nresolved without the Start Menu fallback: {baseline} -> {fuzzy} of {len(QUERIES)}")
+    print("(each Start Menu launch spends ~1.9 s in sleeps and keystrokes)")
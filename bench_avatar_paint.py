@@ -0,0 +1,61 @@
+"""
+Benchmark: avatar per-frame paint cost with and without the cached expression layers.
+
+Renders every expression offscreen (no window or display needed), varying the
+lip-sync level each frame like the 60 FPS timer does.
+Run: python bench_avatar_paint.py
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import QtGui
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QApplication
+
+from avatar.desktop_avatar import AvatarWidget, EXPRESSIONS
+
+FRAMES = 300
+
+
+def _frame_cost(widget: AvatarWidget, image: QtGui.QImage, expr: str, cached: bool) -> float:
+    widget._layer_cache_enabled = cached
+    widget._layers.clear()
+    widget._expr = expr
+    widget._level = 0.0
+    widget.render(image)  # warm-up (builds the cached layer when enabled)
+    start = time.perf_counter()
+    for i in range(FRAMES):
+        widget._level = (i % 20) / 20
+        widget.render(image)
+    return (time.perf_counter() - start) / FRAMES
+
+
+def main():
+    app = QApplication(sys.argv)
+    widget = AvatarWidget()
+    widget._timer.stop()
+    image = QtGui.QImage(widget.size(), QtGui.QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+
+    print("=" * 60)
+    print(f"AVATAR PAINT BENCHMARK ({widget.width()}x{widget.height()}, {FRAMES} frames each)")
+    print("=" * 60)
+    total_old = total_new = 0.0
+    for expr in sorted(EXPRESSIONS):
+        old = _frame_cost(widget, image, expr, cached=False)
+        new = _frame_cost(widget, image, expr, cached=True)
+        total_old += old
+        total_new += new
+        print(f"{expr:<12} uncached: {old * 1e6:8.1f} us/frame   cached: {new * 1e6:8.1f} us/frame   x{old / new:5.1f}")
+    print("-" * 60)
+    print(f"{'average':<12} uncached: {total_old / len(EXPRESSIONS) * 1e6:8.1f} us/frame   "
+          f"cached: {total_new / len(EXPRESSIONS) * 1e6:8.1f} us/frame")
+    widget.close()
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
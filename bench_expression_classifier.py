@@ -0,0 +1,127 @@
+"""
+Microbenchmark: compiled expression classifier vs the old if/elif keyword ladders.
+
+The ladders below are verbatim copies of the code the classifier replaced
+(agent._expression_watcher and set_avatar_expression._normalize); the script
+also checks that both give the same answers on every sample.
+Run: python bench_expression_classifier.py
+"""
+import random
+import re
+import timeit
+
+from expression_classifier import EXPRESSION_RULES, classify_message, normalize_expression
+
+# A single alternation regex over every keyword, for comparison
+_ALTERNATION = re.compile("|".join(
+    re.escape(kw) for kw in sorted({k for _, _, ks in EXPRESSION_RULES for k in ks}, key=len, reverse=True)
+))
+
+
+def ladder_message(text):
+    low = text.lower()
+    if any(k in low for k in ["winking face", "wink", "😉"]):
+        return "wink", 1.2
+    elif any(k in low for k in ["open mouth smile", "big smile", "😀", "😃", "grin"]):
+        return "smile_open", 1.5
+    elif any(k in low for k in ["cool", "sunglasses", "😎", "shades"]):
+        return "cool", 1.5
+    elif any(k in low for k in ["happy", "joy", "joyful", "😊", "😄", "excited", "tears of joy", "awesome"]):
+        return "happy", 1.5
+    elif any(k in low for k in ["sad", "crying", "😢", "😭", "unhappy"]):
+        return "sad", 2.0
+    elif any(k in low for k in ["surprised", "shock", "😲", "😮", "amazed", "wow"]):
+        return "surprised", 1.3
+    elif any(k in low for k in ["angry", "mad", "😠", "😡", "furious"]):
+        return "angry", 1.8
+    elif any(k in low for k in ["sleepy", "tired", "😴", "yawn", "drowsy"]):
+        return "sleepy", 2.5
+    elif any(k in low for k in ["thinking", "hmm", "🤔", "pondering", "let me think"]):
+        return "thinking", 2.0
+    elif any(k in low for k in ["love", "heart", "😍", "❤️", "💕", "adore"]):
+        return "love", 2.0
+    elif any(k in low for k in ["neutral face", "back to normal", "neutral"]):
+        return "neutral", 0.6
+    return None
+
+
+def ladder_normalize(expr):
+    e = expr.strip().lower()
+    if any(k in e for k in ["wink", "winking", "😉", "winky"]):
+        return "wink"
+    if any(k in e for k in ["smile open", "open mouth smile", "big smile", "😀", "😃", "open smile"]):
+        return "smile_open"
+    if any(k in e for k in ["cool", "sunglasses", "😎", "shades"]):
+        return "cool"
+    if any(k in e for k in ["happy", "joy", "joyful", "😊", "😄", "excited", "tears of joy", "awesome"]):
+        return "happy"
+    if any(k in e for k in ["sad", "crying", "😢", "😭", "unhappy", "down"]):
+        return "sad"
+    if any(k in e for k in ["surprised", "shock", "😲", "😮", "amazed", "wow"]):
+        return "surprised"
+    if any(k in e for k in ["angry", "mad", "😠", "😡", "furious", "annoyed"]):
+        return "angry"
+    if any(k in e for k in ["sleepy", "tired", "😴", "yawn", "drowsy"]):
+        return "sleepy"
+    if any(k in e for k in ["thinking", "hmm", "🤔", "pondering", "wondering"]):
+        return "thinking"
+    if any(k in e for k in ["love", "heart", "😍", "❤️", "💕", "adore"]):
+        return "love"
+    if e in {"neutral", "reset", "rest"}:
+        return "neutral"
+    if e in {"wink", "smile_open", "neutral", "cool", "happy", "sad", "surprised", "angry", "sleepy", "thinking", "love"}:
+        return e
+    return "neutral"
+
+
+FILLER = (
+    "Bilkul Abhinav, yeh raha aapka answer. Python mein list comprehension ek compact tarika hai "
+    "jisse aap ek naya list bana sakte ho. Pehle loop likho, phir condition add karo, aur result "
+    "ko variable mein store karo. NCC ki drill practice ke baad thoda rest bhi zaroori hai. "
+)
+KEYWORDS = ["😉", "grin", "shades", "awesome", "unhappy", "wow", "furious", "yawn", "hmm", "❤️", "neutral"]
+
+
+def _samples(n, length):
+    rnd = random.Random(7)
+    out = []
+    for i in range(n):
+        text = (FILLER * (length // len(FILLER) + 1))[:length]
+        if i % 4:
+            # Put a keyword somewhere near the end, where the ladders find it last
+            pos = rnd.randint(length * 3 // 4, length)
+            text = text[:pos] + " " + rnd.choice(KEYWORDS) + " " + text[pos:]
+        out.append(text)
+    return out
+
+
+def main():
+    print("=" * 60)
+    print("EXPRESSION CLASSIFIER MICROBENCHMARK")
+    print("=" * 60)
+
+    for length in (200, 2000, 8000):
+        samples = _samples(200, length)
+        for s in samples:
+            assert classify_message(s) == ladder_message(s), s
+        old = timeit.timeit(lambda: [ladder_message(s) for s in samples], number=5)
+        new = timeit.timeit(lambda: [classify_message(s) for s in samples], number=5)
+        per = 5 * len(samples)
+        alt = timeit.timeit(lambda: [list(_ALTERNATION.finditer(s.lower())) for s in samples], number=5)
+        print(f"message {length:>5} chars   ladder: {old / per * 1e6:8.1f} us   "
+              f"compiled: {new / per * 1e6:8.1f} us   x{old / new:5.1f}   "
+              f"(alternation regex: {alt / per * 1e6:8.1f} us)")
+
+    names = ["wink", "Winky", "big smile", "smile_open", "cool shades", "tears of joy", "down",
+             "annoyed", "wondering", "love", "reset", "rest", "unknown", "😴", "neutral"]
+    for n in names:
+        assert normalize_expression(n) == ladder_normalize(n), n
+    old = timeit.timeit(lambda: [ladder_normalize(n) for n in names], number=2000)
+    new = timeit.timeit(lambda: [normalize_expression(n) for n in names], number=2000)
+    per = 2000 * len(names)
+    print(f"normalize (names)        ladder: {old / per * 1e6:8.2f} us   "
+          f"compiled: {new / per * 1e6:8.2f} us   x{old / new:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
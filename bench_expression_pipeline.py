@@ -0,0 +1,143 @@
+"""
+Benchmark: chat-context polling vs event-driven expression pipeline.
+
+Measures, for a conversation that already holds 10k items:
+  - CPU time used while the conversation is idle
+  - latency from a new assistant message to the expression dispatch
+
+No LiveKit session or avatar is needed; a tiny fake session emits the events.
+Run: python bench_expression_pipeline.py
+"""
+import asyncio
+import time
+
+from expression_classifier import classify_message
+from expression_pipeline import ExpressionPipeline, _item_text
+
+HISTORY = 10_000
+IDLE_SECONDS = 3.0
+MESSAGES = 20
+
+
+class FakeItem:
+    def __init__(self, role: str, content: str):
+        self.role = role
+        self.content = [content]
+
+
+class FakeSession:
+    """Minimal stand-in for AgentSession's event emitter."""
+
+    def __init__(self):
+        self.items = []
+        self._handlers = {}
+
+    def on(self, name, fn):
+        self._handlers.setdefault(name, []).append(fn)
+
+    def off(self, name, fn):
+        self._handlers.get(name, []).remove(fn)
+
+    def add(self, item):
+        self.items.append(item)
+        for fn in self._handlers.get("conversation_item_added", []):
+            fn(item)
+
+
+def _history():
+    items = []
+    for i in range(HISTORY):
+        role = "user" if i % 2 == 0 else "assistant"
+        items.append(FakeItem(role, f"message number {i} about the weather and music"))
+    return items
+
+
+async def _polling_watcher(items, dispatch):
+    """The previous implementation: copy the whole history every 100 ms."""
+    last_idx = len(items)
+    while True:
+        snapshot = list(items)
+        if last_idx < len(snapshot):
+            new_items = snapshot[last_idx:]
+            last_idx = len(snapshot)
+            for it in new_items:
+                if getattr(it, "role", None) != "assistant":
+                    continue
+                detected = classify_message(_item_text(it))
+                if detected:
+                    await dispatch(expr=detected[0], duration=detected[1])
+        await asyncio.sleep(0.1)
+
+
+async def _measure(start_watcher, add_item):
+    sent_at = []
+    latencies = []
+
+    async def dispatch(expr: str, duration: float) -> str:
+        latencies.append(time.perf_counter() - sent_at[-1])
+        return "ok"
+
+    stop = await start_watcher(dispatch)
+
+    # Idle CPU
+    await asyncio.sleep(0.2)
+    cpu0 = time.process_time()
+    await asyncio.sleep(IDLE_SECONDS)
+    idle_cpu = time.process_time() - cpu0
+
+    # Dispatch latency
+    for _ in range(MESSAGES):
+        sent_at.append(time.perf_counter())
+        add_item(FakeItem("assistant", "Awesome! That is tears of joy worthy!"))
+        while len(latencies) < len(sent_at):
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.037)  # de-phase from the polling interval
+
+    await stop()
+    return idle_cpu, latencies
+
+
+async def bench_polling():
+    items = _history()
+
+    async def start(dispatch):
+        task = asyncio.create_task(_polling_watcher(items, dispatch))
+
+        async def stop():
+            task.cancel()
+        return stop
+
+    return await _measure(start, items.append)
+
+
+async def bench_pipeline():
+    session = FakeSession()
+    session.items = _history()
+
+    async def start(dispatch):
+        pipeline = ExpressionPipeline(dispatch=dispatch)
+        pipeline.attach(session)
+        pipeline.start()
+        return pipeline.aclose
+
+    return await _measure(start, session.add)
+
+
+def _report(name, idle_cpu, latencies):
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2] * 1000
+    worst = latencies[-1] * 1000
+    print(f"{name:<12} idle CPU: {idle_cpu * 1000:8.2f} ms over {IDLE_SECONDS:.0f}s  "
+          f"({idle_cpu / IDLE_SECONDS * 100:5.2f}% of a core)  "
+          f"latency p50: {p50:7.2f} ms  max: {worst:7.2f} ms")
+
+
+if __name__ == "__main__":
+    import logging
+    logging.disable(logging.INFO)
+
+    print("=" * 60)
+    print(f"EXPRESSION DISPATCH BENCHMARK ({HISTORY} item conversation)")
+    print("=" * 60)
+    _report("polling", *asyncio.run(bench_polling()))
+    _report("event queue", *asyncio.run(bench_pipeline()))
@@ -0,0 +1,91 @@
+"""
+Benchmark: session-start and recall cost of the embedded LocalMemoryClient.
+
+Fills a store with N memories (default 10000; a tenth of them preferences), then times
+  - cold start: open the store (SQLite read + embedding matrix load) and get_all the preferences,
+    which is what entrypoint does before the session starts
+  - get_all of the preferences on an open store
+  - search (top-5 cosine over the user's memories) on an open store
+  - add of one 20-turn journal batch
+The hosted client needs a network round-trip for each of these.
+Run: python bench_local_memory.py [N]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from local_memory import LocalMemoryClient
+
+RUNS = 20
+TOPICS = ["jazz", "coffee", "hiking", "horror movies", "python", "football", "sushi", "podcasts", "chess", "rain"]
+VERBS = ["likes", "loves", "prefers", "enjoys", "hates", "dislikes"]
+
+
+def memory_text(i):
+    return f"User {VERBS[i % len(VERBS)]} {TOPICS[i % len(TOPICS)]} variant {i}"
+
+
+async def fill(path, count):
+    client = LocalMemoryClient(path)
+    batch = 500
+    for start in range(0, count, batch):
+        texts = [memory_text(i) for i in range(start, min(count, start + batch))]
+        category = "preferences" if start % (batch * 10) == 0 else "conversation"
+        await client.add(texts, user_id="RamX", category=category)
+    client.close()
+
+
+async def timed(fn, runs=RUNS):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def main(count):
+    path = os.path.join(tempfile.mkdtemp(), "memory.db")
+    start = time.perf_counter()
+    await fill(path, count)
+    print(f"filled {count} memories in {time.perf_counter() - start:.1f}s")
+
+    async def cold_start():
+        client = LocalMemoryClient(path)
+        await client.get_all(user_id="RamX", category="preferences")
+        client.close()
+
+    client = LocalMemoryClient(path)
+    preferences = await client.get_all(user_id="RamX", category="preferences")
+    turns = 0
+
+    async def add_batch():
+        nonlocal turns
+        await client.add([f"user: message {turns + i}" for i in range(20)], user_id="RamX", category="conversation")
+        turns += 20
+
+    cold = await timed(cold_start, runs=5)
+    get_all = await timed(lambda: client.get_all(user_id="RamX", category="preferences"))
+    search = await timed(lambda: client.search("does the user like coffee", user_id="RamX", limit=5))
+    add = await timed(add_batch)
+    client.close()
+
+    rows = [
+        (f"cold start + get_all ({len(preferences)} preferences)", cold),
+        ("get_all on an open store", get_all),
+        (f"search top-5 over {count} memories", search),
+        ("add a 20-turn batch", add),
+    ]
+    for label, value in rows:
+        print(f"{label:<44}{value:8.2f} ms")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print("=" * 60)
+    print("LOCAL MEMORY BENCHMARK")
+    print("=" * 60)
+    asyncio.run(main(count))
@@ -0,0 +1,130 @@
+"""
+Benchmark: extracting a session's turns for memory, full chat_ctx rescans vs the incremental journal.
+
+A session of N turns (default 5000) with a large loaded preference set (default 2000 facts,
+injected as the first context message, as entrypoint does) is extracted
+  - before: the old shutdown_hook loop, which flattens every item and checks it against the
+            JSON dump of the loaded preferences, run once at shutdown and, for the checkpoint
+            case, after every 50 turns (each run rescans the whole context)
+  - after:  MemoryJournal.record_new with a cursor and a set of journaled turn ids, so each
+            run only reads the turns added since the previous one
+Run: python bench_memory_extraction.py [TURNS] [FACTS]
+"""
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from memory_journal import MemoryJournal
+
+CHECKPOINT_EVERY = 50
+RUNS = 5
+
+
+def old_extract(items, memory_str):
+    conversation_memories = []
+    preference_memories = []
+    for item in items:
+        content_str = ""
+        content = getattr(item, "content", "")
+        if content:
+            if isinstance(content, list):
+                content_str = "".join(map(str, content))
+            else:
+                content_str = str(content)
+        else:
+            content_str = str(item)
+        if not content_str.strip():
+            continue
+        if memory_str and memory_str in content_str:
+            continue
+        role = getattr(item, "role", None)
+        if role and role in ["user", "assistant"]:
+            conversation_memories.append(f"{role}: {content_str.strip()}")
+            if role == "user" and any(
+                kw in content_str.lower()
+                for kw in ["like", "love", "prefer", "enjoy", "hate", "dislike"]
+            ):
+                preference_memories.append(content_str.strip())
+    return conversation_memories, preference_memories
+
+
+def make_session(turns, facts):
+    memories = [f"User likes topic number {i} and wants updates about it every morning" for i in range(facts)]
+    memory_str = json.dumps(memories, indent=2)
+    facts_item = SimpleNamespace(id="facts", role="assistant",
+                                 content=[f"Here are known facts about the user RamX: {memory_str}"])
+    items = [facts_item]
+    for i in range(turns):
+        role = "user" if i % 2 == 0 else "assistant"
+        text = f"I really like track {i}, play more like it" if i % 10 == 0 else f"message {i} " + "x" * 60
+        items.append(SimpleNamespace(id=f"item_{i}", role=role, content=[text]))
+    return items, memory_str
+
+
+def new_journal(items):
+    return MemoryJournal(None, path=os.path.join(tempfile.mkdtemp(), "journal.db"), known=items[:1])
+
+
+def timed(fn, runs=RUNS):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+if __name__ == "__main__":
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    facts = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    items, memory_str = make_session(turns, facts)
+    print("=" * 60)
+    print("MEMORY EXTRACTION BENCHMARK")
+    print("=" * 60)
+    print(f"{turns} turns, {facts} loaded facts ({len(memory_str) / 1024:.0f} KiB memory_str)")
+
+    # Live recording: the journal sees each turn once, as it is added
+    journal = new_journal(items)
+    start = time.perf_counter()
+    for item in items:
+        journal.record(item)
+    live = (time.perf_counter() - start) * 1000
+    conversation, _ = old_extract(items, memory_str)
+    assert journal.pending() == len(conversation) + sum(1 for i in range(0, turns, 10))
+
+    old_shutdown = timed(lambda: old_extract(items, memory_str))
+    new_shutdown = timed(lambda: journal.record_new(items), runs=1)
+    tail = timed(lambda: journal.record_new(items))
+    journal.close()
+
+    def old_checkpoints():
+        for end in range(CHECKPOINT_EVERY, len(items) + 1, CHECKPOINT_EVERY):
+            old_extract(items[:end], memory_str)
+
+    # In the agent every turn is journaled live by the session event before a checkpoint sees it
+    checkpoints = new_journal(items)
+    for item in items:
+        checkpoints.record(item)
+
+    def new_checkpoints():
+        for end in range(CHECKPOINT_EVERY, len(items) + 1, CHECKPOINT_EVERY):
+            checkpoints.record_new(items[:end])
+
+    old_cp = timed(old_checkpoints, runs=1)
+    new_cp = timed(new_checkpoints, runs=1)
+    checkpoints.close()
+
+    rows = [
+        (f"before: shutdown rescan of {len(items)} items", f"{old_shutdown:9.2f} ms", ""),
+        ("after:  shutdown, first cursor pass", f"{new_shutdown:9.2f} ms", f"({old_shutdown / new_shutdown:.1f}x)"),
+        ("after:  shutdown, no new turns since last pass", f"{tail:9.3f} ms", ""),
+        ("after:  live journaling per turn (incl. insert)", f"{live / len(items) * 1000:9.2f} µs", ""),
+        (f"before: rescan every {CHECKPOINT_EVERY} turns", f"{old_cp:9.2f} ms", ""),
+        (f"after:  record_new every {CHECKPOINT_EVERY} turns", f"{new_cp:9.2f} ms", f"({old_cp / new_cp:.1f}x)"),
+    ]
+    for label, value, ratio in rows:
+        print(f"{label:<48}{value}  {ratio}".rstrip())
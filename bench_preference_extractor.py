@@ -0,0 +1,91 @@
+"""
+Benchmark: preference detection on typical user turns, the old keyword filter vs PreferenceExtractor.
+
+Each turn is labeled with whether it states a preference. For both approaches the script reports
+how many turns were sent to the "preferences" category, how many of those were real
+preferences (precision), how many real preferences were caught (recall), the bytes written
+and the time per turn over a 5000-turn session made of these turns.
+Run: python bench_preference_extractor.py
+"""
+import time
+
+from preference_extractor import get_preference_extractor
+
+KEYWORDS = ["like", "love", "prefer", "enjoy", "hate", "dislike"]
+
+# (user turn, states a preference)
+TURNS = [
+    ("I love Linkin Park", True),
+    ("I really don't like horror movies", True),
+    ("I'm a big fan of the Beatles", True),
+    ("I prefer short answers", True),
+    ("I can't stand loud alarms", True),
+    ("My favorite band is Radiohead", True),
+    ("I enjoy hiking on weekends", True),
+    ("I hate waking up early", True),
+    ("I'm not into country music", True),
+    ("I never liked pineapple on pizza", True),
+    ("I'm really into sci-fi novels", True),
+    ("I like my coffee black", True),
+    ("open chrome", False),
+    ("what's the weather like today", False),
+    ("play something like Coldplay", False),
+    ("I'd like to open Spotify", False),
+    ("would you like to hear a joke", False),
+    ("it looks like it's going to rain", False),
+    ("set an alarm for 7", False),
+    ("I feel like watching a movie tonight", False),
+    ("search for places I might like in Paris", False),
+    ("do you like jazz", False),
+    ("I love it when you do that", False),
+    ("close notepad", False),
+    ("play the song Love Story", False),
+    ("what did the news say about the election", False),
+    ("I would love a coffee right now", False),
+    ("show me something likeable", False),
+    ("that was unlike anything before", False),
+    ("tell me about the likelihood of rain", False),
+    ("turn the volume up", False),
+    ("next track please", False),
+    ("I'd prefer if you spoke slower for this answer", False),
+    ("who sang Crazy in Love", False),
+    ("open the app I like, you know, the music one", False),
+    ("I hate to interrupt but what time is it", False),
+]
+SESSION_TURNS = 5000
+
+
+def old_filter(text):
+    return [text.strip()] if any(kw in text.lower() for kw in KEYWORDS) else []
+
+
+def new_filter(text, extractor=get_preference_extractor()):
+    return [fact.memory for fact in extractor.extract(text)]
+
+
+def evaluate(name, detect):
+    sent = caught = correct = written = 0
+    for text, is_preference in TURNS:
+        memories = detect(text)
+        if memories:
+            sent += 1
+            correct += is_preference
+            written += sum(len(m) for m in memories)
+        caught += bool(memories) and is_preference
+    session = [TURNS[i % len(TURNS)][0] for i in range(SESSION_TURNS)]
+    start = time.perf_counter()
+    for text in session:
+        detect(text)
+    per_turn = (time.perf_counter() - start) / SESSION_TURNS * 1e6
+    total = sum(p for _, p in TURNS)
+    print(f"{name:<10} sent {sent:2d}/{len(TURNS)} turns   precision {correct / max(sent, 1):5.0%}   "
+          f"recall {caught / total:5.0%}   {written:5d} bytes   {per_turn:6.1f} µs/turn")
+    return sent, correct
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("PREFERENCE EXTRACTION BENCHMARK")
+    print("=" * 60)
+    evaluate("keywords", old_filter)
+    evaluate("extractor", new_filter)
@@ -0,0 +1,98 @@
+"""
+Benchmark: process-table scans per app-tool call, repeated psutil scans vs the shared ProcessSnapshot.
+
+Starts N idle `sleep` processes (default 2000) so the host has thousands of processes, then
+times what one "close chrome" + "list running apps" round costs
+  - before: _is_application_running, the psutil close fallback and list_running_applications
+            each iterate the whole process table (3 full psutil.process_iter scans)
+  - after:  one snapshot refresh (full, or incremental as between TTLs) answers all three lookups
+plus the cost of an incremental refresh (psutil.pids() diff) and of a lookup on a fresh snapshot.
+Run: python bench_process_snapshot.py [N]
+"""
+import statistics
+import subprocess
+import sys
+import time
+
+import psutil
+
+from process_snapshot import ProcessSnapshot
+
+RUNS = 15
+TARGET = "chrome.exe"
+LIST_NAMES = ["chrome.exe", "msedge.exe", "notepad.exe", "notepad++.exe", "calculator.exe",
+              "winword.exe", "excel.exe", "powerpnt.exe", "mspaint.exe"]
+
+
+def old_round() -> None:
+    # _is_application_running
+    for proc in psutil.process_iter(["name"]):
+        if (proc.info["name"] or "").lower() == TARGET:
+            break
+    # close_application psutil fallback
+    for proc in psutil.process_iter(["pid", "name"]):
+        if (proc.info["name"] or "").lower() == TARGET:
+            break
+    # list_running_applications
+    running = []
+    for proc in psutil.process_iter(["name"]):
+        name = (proc.info["name"] or "").lower()
+        if name in LIST_NAMES and name not in running:
+            running.append(name)
+
+
+def new_round(snapshot: ProcessSnapshot, full: bool) -> None:
+    snapshot.refresh(full=full)
+    snapshot.is_running(TARGET)
+    snapshot.pids(TARGET)
+    names = snapshot.names()
+    [n for n in LIST_NAMES if n in names]
+
+
+def timed(fn, runs=RUNS):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print("=" * 60)
+    print("PROCESS SNAPSHOT BENCHMARK")
+    print("=" * 60)
+    children = [subprocess.Popen(["sleep", "600"]) for _ in range(count)]
+    try:
+        print(f"processes on host: {len(psutil.pids())}")
+        snapshot = ProcessSnapshot(ttl=60, full_scan_interval=3600)
+        snapshot.refresh(full=True)
+
+        old = timed(old_round)
+        new_full = timed(lambda: new_round(snapshot, full=True))
+        new = timed(lambda: new_round(snapshot, full=False))
+        incremental = timed(snapshot.refresh)
+        lookup = timed(lambda: snapshot.is_running(TARGET), runs=1000) * 1000
+
+        # Incremental refresh after some churn: 50 processes exit and 50 start
+        for child in children[:50]:
+            child.kill()
+            child.wait()
+        children = children[50:] + [subprocess.Popen(["sleep", "600"]) for _ in range(50)]
+        start = time.perf_counter()
+        snapshot.refresh()
+        churn = (time.perf_counter() - start) * 1000
+        assert len(snapshot.pids("sleep")) == count
+
+        print(f"before: 3 full scans per round      {old:8.2f} ms")
+        print(f"after:  1 full snapshot scan         {new_full:8.2f} ms  ({old / new_full:.1f}x)")
+        print(f"after:  1 incremental refresh        {new:8.2f} ms  ({old / new:.1f}x)")
+        print(f"incremental refresh alone            {incremental:8.2f} ms")
+        print(f"incremental refresh, 50 exit/50 new  {churn:8.2f} ms")
+        print(f"lookup on a fresh snapshot           {lookup:8.2f} µs")
+    finally:
+        for child in children:
+            child.kill()
+        for child in children:
+            child.wait()
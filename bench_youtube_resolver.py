@@ -0,0 +1,166 @@
+"""
+Benchmark: YouTube track resolution, full download + findall vs streamed first match + cache.
+
+Serves a results page from a local HTTP server and compares
+  - before: download the whole page, decode it, re.findall over all of it, use the first id
+  - after:  stream the page, stop at the first valid id, then answer repeats from the disk cache
+Pass saved YouTube results pages to use them as fixtures:
+    python bench_youtube_resolver.py page1.html page2.html
+Without arguments a synthetic page with the same layout is used (large inline scripts first,
+then the ytInitialData JSON holding the video renderers).
+"""
+import asyncio
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import youtube_music_control as ytm
+from disk_cache import JsonDiskCache
+from http_client import aclose_http_client, http_get
+
+RUNS = 20
+CHUNK = 16 * 1024
+
+
+def _synthetic_page() -> bytes:
+    rnd = random.Random(3)
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-"
+
+    def vid():
+        return "".join(rnd.choice(alphabet) for _ in range(11))
+
+    script = "".join(f"var a{i}=function(b){{return b.split('').reverse().join('')}};" for i in range(9000))
+    renderers = []
+    for i in range(20):
+        v = vid()
+        renderers.append(
+            '{"videoRenderer":{"videoId":"%s","thumbnail":{"thumbnails":[%s]},"title":{"runs":[{"text":"Song %d"}]},'
+            '"navigationEndpoint":{"commandMetadata":{"webCommandMetadata":{"url":"/watch?v=%s"}}},"padding":"%s"}}'
+            % (v, ",".join('{"url":"https://i.ytimg.com/vi/%s/%d.jpg"}' % (v, k) for k in range(40)), i, v, "x" * 20000)
+        )
+    return (
+        "<!DOCTYPE html><html><head><style>" + "body{margin:0}" * 20000 + "</style>"
+        + "<script>" + script + "</script></head><body>"
+        + "<script>var ytInitialData = {\"contents\":[" + ",".join(renderers) + "]};</script>"
+        + "<script>" + script[: len(script) // 2] + "</script></body></html>"
+    ).encode("utf-8")
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    pages = []
+
+    def do_GET(self):
+        page = PageHandler.pages[0]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(page)))
+        self.end_headers()
+        try:
+            for i in range(0, len(page), CHUNK):
+                self.wfile.write(page[i:i + CHUNK])
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the streaming client stopped reading
+
+    def log_message(self, *args):
+        pass
+
+
+async def _before(url):
+    start = time.perf_counter()
+    response = await http_get(url, params={"search_query": "tum hi ho"})
+    fetched = time.perf_counter()
+    video_ids = re.findall(r"watch\?v=(\S{11})", response.text)
+    done = time.perf_counter()
+    return video_ids[0], len(response.content), done - start, done - fetched
+
+
+_first_video_id = ytm.first_video_id
+_bytes_read = []
+
+
+async def _counting_first_video_id(chunks):
+    video_id, read = await _first_video_id(chunks)
+    _bytes_read.append(read)
+    return video_id, read
+
+
+async def _after(track):
+    ytm.track_cache = JsonDiskCache(os.path.join(tempfile.mkdtemp(), "tracks.json"))
+    start = time.perf_counter()
+    video_id = await ytm.resolve_video_id(track)
+    return video_id, time.perf_counter() - start
+
+
+async def _cached(track):
+    start = time.perf_counter()
+    video_id = await ytm.resolve_video_id(track)
+    return video_id, time.perf_counter() - start
+
+
+async def _parse_only(page: bytes):
+    """Parse cost alone, on the in-memory page split into network-sized chunks."""
+    start = time.perf_counter()
+    old = re.findall(r"watch\?v=(\S{11})", page.decode("utf-8"))[0]
+    mid = time.perf_counter()
+
+    async def chunks():
+        for i in range(0, len(page), CHUNK):
+            yield page[i:i + CHUNK]
+
+    new, read = await _first_video_id(chunks())
+    end = time.perf_counter()
+    assert old == new, (old, new)
+    return mid - start, end - mid, read
+
+
+async def bench(page: bytes, url: str):
+    PageHandler.pages = [page]
+    parse_old = parse_new = 0.0
+    for _ in range(RUNS):
+        o, n, read = await _parse_only(page)
+        parse_old += o
+        parse_new += n
+
+    before = [await _before(url) for _ in range(RUNS)]
+    _bytes_read.clear()
+    after = [await _after(f"tum hi ho {i}") for i in range(RUNS)]
+    cached = [await _cached(f"tum hi ho {RUNS - 1}") for _ in range(RUNS)]
+    assert before[0][0] == after[0][0] == cached[0][0]
+
+    print(f"page: {len(page) / 1024:.0f} KB, first id after {read / 1024:.0f} KB")
+    print(f"  parse   findall over page: {parse_old / RUNS * 1000:7.2f} ms   "
+          f"streamed first match: {parse_new / RUNS * 1000:7.2f} ms")
+    print(f"  before  read {before[0][1] / 1024:7.0f} KB   "
+          f"resolve {sum(b[2] for b in before) / RUNS * 1000:7.2f} ms")
+    print(f"  after   read {sum(_bytes_read) / len(_bytes_read) / 1024:7.0f} KB   "
+          f"resolve {sum(a[1] for a in after) / RUNS * 1000:7.2f} ms")
+    print(f"  cached  resolve {sum(c[1] for c in cached) / RUNS * 1e6:7.1f} us (no network)")
+
+
+async def main(paths):
+    pages = [open(p, "rb").read() for p in paths] or [_synthetic_page()]
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/results"
+    ytm.YOUTUBE_SEARCH_URL = url
+    ytm.first_video_id = _counting_first_video_id
+
+    print("=" * 60)
+    print("YOUTUBE RESOLVER BENCHMARK")
+    print("=" * 60)
+    try:
+        for page in pages:
+            await bench(page, url)
+    finally:
+        await aclose_http_client()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
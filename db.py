@@ -1,26 +1,13 @@
-import sqlite3
+from app_registry import AppRegistry
 
-conn = sqlite3.connect('Ramx.db')
-cursor = conn.cursor()
+# Creates (or migrates) the sys_command / web_command tables in Ramx.db and adds sample entries.
+# Entries are keyed on the normalized name, so running this again updates instead of duplicating.
+registry = AppRegistry('Ramx.db')
 
-# Create sys_commmand table for locally installed apps
-query = "CREATE TABLE IF NOT EXISTS sys_commmand(id INTEGER PRIMARY KEY, name varchar(255),path varchar(255))"
-cursor.execute(query)
+# Web apps (opened in the default browser)
+registry.add('Web Whatsapp', 'https://web.whatsapp.com/', kind='web')
 
-<<<<<<< HEAD
-# Create web_commmand table for web apps
-query = "CREATE TABLE IF NOT EXISTS web_commmand(id INTEGER PRIMARY KEY, name varchar(255),url Varchar(255))"
-cursor.execute(query)
+# below entry is for locally installed apps
+# registry.add('Chrome', 'C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe', kind='sys')
 
-# Insert sample data into web_commmand
-query = "INSERT INTO web_commmand VALUES (null, 'Web Whatsapp','https://web.whatsapp.com/')"
-=======
-query = "INSERT INTO web_command VALUES (null, 'Web Whatsapp','https://web.whatsapp.com/')"
->>>>>>> master
-cursor.execute(query)
-conn.commit()
-
-# below query is for locally installed apps
-# query = "INSERT INTO sys_commmand VALUES (null, 'Chrome','C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe')"
-# cursor.execute(query)
-# conn.commit()
\ No newline at end of file
+registry.close()
@@ -0,0 +1,87 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Persistent caches live next to the code unless RAMX_CACHE_DIR points elsewhere
+CACHE_DIR = os.getenv("RAMX_CACHE_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+
+def cache_path(filename: str) -> str:
+    return os.path.join(CACHE_DIR, filename)
+
+
+class JsonDiskCache:
+    """
+    Small persistent key -> value cache stored as one JSON file.
+
+    The file is read once on first use and rewritten atomically (temp file + rename) on
+    every change, so a crash never leaves a half-written cache behind. Entries older than
+    `max_age` seconds are ignored, and only the `maxsize` most recently used are kept: a hit
+    moves its entry to the end, and that order is written out with the next change. Reads and
+    writes touch the file, so async callers go through asyncio.to_thread.
+    """
+
+    def __init__(self, path: str, maxsize: int = 500, max_age: Optional[float] = None):
+        self.path = path
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self._entries: Optional[Dict[str, list]] = None  # key -> [value, saved_at]
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self) -> Dict[str, list]:
+        if self._entries is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._entries = {k: v for k, v in data.items() if isinstance(v, list) and len(v) == 2}
+            except FileNotFoundError:
+                self._entries = {}
+            except (OSError, ValueError, AttributeError) as e:
+                logging.warning(f"Ignoring unreadable cache file {self.path}: {e}")
+                self._entries = {}
+        return self._entries
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(key)
+            if entry is None or (self.max_age is not None and time.time() - entry[1] > self.max_age):
+                self.misses += 1
+                return None
+            # Most recently used last, so eviction drops the least recently used
+            entries[key] = entries.pop(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            entries = self._load()
+            entries.pop(key, None)
+            entries[key] = [value, time.time()]
+            while len(entries) > self.maxsize:
+                del entries[next(iter(entries))]
+            self._save(entries)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if self._load().pop(key, None) is not None:
+                self._save(self._entries)
+
+    def _save(self, entries: Dict[str, list]) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entries, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logging.warning(f"Failed to write cache file {self.path}: {e}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load())
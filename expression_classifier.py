@@ -0,0 +1,110 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Canonical expressions understood by avatar/desktop_avatar.py
+EXPRESSIONS = (
+    "wink", "smile_open", "neutral", "cool", "happy", "sad",
+    "surprised", "angry", "sleepy", "thinking", "love",
+)
+
+# (expression, duration, keywords) in priority order: the first rule with a keyword
+# anywhere in the text wins, exactly like the old if/elif ladders.
+EXPRESSION_RULES: List[Tuple[str, float, List[str]]] = [
+    ("wink", 1.2, ["winking face", "wink", "😉"]),
+    ("smile_open", 1.5, ["open mouth smile", "big smile", "😀", "😃", "grin"]),
+    ("cool", 1.5, ["cool", "sunglasses", "😎", "shades"]),
+    ("happy", 1.5, ["happy", "joy", "joyful", "😊", "😄", "excited", "tears of joy", "awesome"]),
+    ("sad", 2.0, ["sad", "crying", "😢", "😭", "unhappy"]),
+    ("surprised", 1.3, ["surprised", "shock", "😲", "😮", "amazed", "wow"]),
+    ("angry", 1.8, ["angry", "mad", "😠", "😡", "furious"]),
+    ("sleepy", 2.5, ["sleepy", "tired", "😴", "yawn", "drowsy"]),
+    ("thinking", 2.0, ["thinking", "hmm", "🤔", "pondering", "let me think"]),
+    ("love", 2.0, ["love", "heart", "😍", "❤️", "💕", "adore"]),
+    ("neutral", 0.6, ["neutral face", "back to normal", "neutral"]),
+]
+
+# Extra phrases accepted when an expression is requested by name (set_avatar_expression)
+ALIAS_KEYWORDS: Dict[str, List[str]] = {
+    "wink": ["winking", "winky"],
+    "smile_open": ["smile open", "open smile"],
+    "sad": ["down"],
+    "angry": ["annoyed"],
+    "thinking": ["wondering"],
+}
+# Message keywords that do not name an expression: "grin" in a requested name stays unknown
+MESSAGE_ONLY_KEYWORDS = {"grin", "let me think"}
+
+
+class ExpressionClassifier:
+    """
+    Keyword classifier compiled once from a prioritized rule table.
+
+    The rules are flattened into a single priority-ordered tuple of (keyword, rank), with
+    keywords that can never decide the result pruned (e.g. "tears of joy" once "joy" is in
+    the same rule, or "unhappy" behind the higher-priority "happy"). Classifying lowercases
+    the text once and walks the table until the first hit, so results are identical to the
+    old if/elif ladders.
+    """
+
+    def __init__(self, rules: Sequence[Tuple[str, float, Sequence[str]]]):
+        self._results: List[Tuple[str, float]] = []
+        best: Dict[str, int] = {}
+        for rank, (expr, duration, keywords) in enumerate(rules):
+            self._results.append((expr, duration))
+            for kw in keywords:
+                kw = kw.lower()
+                if kw and kw not in best:
+                    best[kw] = rank
+        # A keyword containing a keyword of the same or a better rule is matched by that one first
+        keywords = [
+            (kw, rank) for kw, rank in best.items()
+            if not any(other != kw and other in kw and r <= rank for other, r in best.items())
+        ]
+        keywords.sort(key=lambda kr: kr[1])
+        self._table: Tuple[Tuple[str, Tuple[str, float]], ...] = tuple(
+            (kw, self._results[rank]) for kw, rank in keywords
+        )
+
+    def classify(self, text: str) -> Optional[Tuple[str, float]]:
+        """Return (expression, duration) for the highest-priority keyword in `text`, or None."""
+        if not text:
+            return None
+        low = text.lower()
+        for kw, result in self._table:
+            if kw in low:
+                return result
+        return None
+
+
+def _with_aliases(rules, aliases):
+    merged = []
+    for expr, duration, keywords in rules:
+        if expr == "neutral":
+            # Neutral is only accepted by exact name when normalizing (see normalize_expression)
+            continue
+        keywords = [kw for kw in keywords if kw not in MESSAGE_ONLY_KEYWORDS]
+        merged.append((expr, duration, keywords + aliases.get(expr, [])))
+    return merged
+
+
+# Built once at import
+MESSAGE_CLASSIFIER = ExpressionClassifier(EXPRESSION_RULES)
+ALIAS_CLASSIFIER = ExpressionClassifier(_with_aliases(EXPRESSION_RULES, ALIAS_KEYWORDS))
+
+
+def classify_message(text: str) -> Optional[Tuple[str, float]]:
+    """Detect an expression in an assistant message. Returns (expression, duration) or None."""
+    return MESSAGE_CLASSIFIER.classify(text)
+
+
+def normalize_expression(expr: str) -> str:
+    """Map a requested expression name or phrase to a canonical expression (neutral if unknown)."""
+    e = expr.strip().lower()
+    if e in {"neutral", "reset", "rest"}:
+        return "neutral"
+    hit = ALIAS_CLASSIFIER.classify(e)
+    if hit:
+        return hit[0]
+    # Fallback: pass through if it matches known ones
+    if e in EXPRESSIONS:
+        return e
+    return "neutral"
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+from expression_classifier import classify_message
+
+# Coroutine used to show an expression, e.g. set_avatar_expression(expr=..., duration=...)
+Dispatch = Callable[..., Awaitable[str]]
+
+
+def _item_text(item) -> str:
+    """Flatten a chat item's content into plain text."""
+    content = getattr(item, "content", "")
+    if isinstance(content, list):
+        return "".join(map(str, content))
+    return str(content)
+
+
+class ExpressionPipeline:
+    """
+    Triggers avatar expressions from assistant messages as they are added to the conversation.
+
+    Subscribes to the session's "conversation_item_added" event; the (sync) event handler only
+    enqueues the message text on a bounded queue, and a single consumer task classifies it and
+    calls the dispatch coroutine. Nothing runs while the conversation is idle.
+    """
+
+    def __init__(self, dispatch: Dispatch, maxsize: int = 16):
+        self._dispatch = dispatch
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._task: Optional[asyncio.Task] = None
+        self._session = None
+
+    def attach(self, session) -> None:
+        """Subscribe to conversation item events of an AgentSession."""
+        self._session = session
+        session.on("conversation_item_added", self._on_item_added)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def _on_item_added(self, event) -> None:
+        self.submit(getattr(event, "item", event))
+
+    def submit(self, item) -> None:
+        """Queue a chat item for classification. Safe to call from event callbacks."""
+        # Only watch assistant messages for expressions
+        if getattr(item, "role", None) != "assistant":
+            return
+        text = _item_text(item)
+        if not text.strip():
+            return
+        if self._queue.full():
+            # An expression only matters while its message is fresh, so drop the oldest one
+            try:
+                self._queue.get_nowait()
+                self._queue.task_done()
+            except asyncio.QueueEmpty:
+                pass
+        self._queue.put_nowait(text)
+
+    async def _run(self) -> None:
+        while True:
+            text = await self._queue.get()
+            try:
+                logging.info(f"[Expression Watcher] Checking: {text[:100]}...")
+                detected = classify_message(text)
+                if not detected:
+                    continue
+                expr, dur = detected
+                logging.info(f"[Expression Watcher] Detected '{expr}' expression, triggering for {dur}s")
+                result = await self._dispatch(expr=expr, duration=dur)
+                logging.info(f"[Expression Watcher] Result: {result}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"[Expression Watcher] set_avatar_expression failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def aclose(self, timeout: float = 2.0) -> None:
+        """
+        Unsubscribe from the session, let the consumer dispatch the messages already queued
+        (for at most `timeout` seconds), then stop it.
+        """
+        if self._session is not None:
+            try:
+                self._session.off("conversation_item_added", self._on_item_added)
+            except Exception:
+                pass
+            self._session = None
+        if self._task and not self._task.done():
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logging.info(f"[Expression Watcher] Dropping {self._queue.qsize()} queued messages on close")
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
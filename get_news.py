@@ -1,5 +1,164 @@
 
+import asyncio
+import logging
+import os
+import re
+import time
+from email.utils import parsedate_to_datetime
+from typing import Iterable, List, Optional
+
 from livekit.agents import function_tool, RunContext
+import httpx
+from http_client import http_get
+from ttl_cache import AsyncTTLCache
+
+NEWS_API_URL = "https://newsapi.org/v2/everything"
+# One request fetches this many articles; smaller num_articles requests are served from it
+FETCH_PAGE_SIZE = 20
+_MAX_PAGE_SIZE = 100  # NewsAPI limit
+NEWS_CACHE_TTL = float(os.getenv("NEWS_CACHE_TTL", "900"))
+# Backoff after HTTP 429 when the response carries no Retry-After header
+_BACKOFF_START = 30.0
+_BACKOFF_MAX = 900.0
+
+news_cache: AsyncTTLCache[list] = AsyncTTLCache(
+    ttl=NEWS_CACHE_TTL, maxsize=32, stale_ttl=NEWS_CACHE_TTL * 3, name="news"
+)
+_rate_limited_until = 0.0
+_backoff = 0.0
+_prefetch_task: Optional[asyncio.Task] = None
+
+
+class NewsRateLimited(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"rate-limited for {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+def _normalize_topic(topic: str) -> str:
+    return " ".join(topic.strip().lower().split())
+
+
+def _page_size(num_articles: int) -> int:
+    return max(FETCH_PAGE_SIZE, min(num_articles, _MAX_PAGE_SIZE))
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either a number of seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _note_rate_limit(retry_after: Optional[str]) -> float:
+    global _rate_limited_until, _backoff
+    wait = _retry_after_seconds(retry_after)
+    if wait is None:
+        # Exponential backoff while NewsAPI keeps refusing without saying for how long
+        _backoff = min(_BACKOFF_MAX, _backoff * 2 if _backoff else _BACKOFF_START)
+        wait = _backoff
+    _rate_limited_until = time.monotonic() + wait
+    logging.warning(f"NewsAPI rate limit hit, backing off for {wait:.0f}s")
+    return wait
+
+
+async def _fetch_articles(topic: str, page_size: int) -> list:
+    global _backoff
+    remaining = _rate_limited_until - time.monotonic()
+    if remaining > 0:
+        raise NewsRateLimited(remaining)
+
+    params = {"q": topic, "pageSize": page_size, "apiKey": os.getenv("NEWS_API_KEY")}
+    response = await http_get(NEWS_API_URL, params=params)
+    if response.status_code == 429:
+        raise NewsRateLimited(_note_rate_limit(response.headers.get("Retry-After")))
+    response.raise_for_status()
+    data = response.json()
+    if data.get("status") != "ok":
+        raise ValueError(data.get("message") or "Failed to fetch news articles.")
+    _backoff = 0.0
+    return data.get("articles", [])
+
+
+async def _get_articles(topic: str, num_articles: int) -> list:
+    key = (_normalize_topic(topic), _page_size(num_articles))
+    try:
+        articles = await news_cache.get(key, lambda: _fetch_articles(key[0], key[1]))
+    except NewsRateLimited:
+        # Anything cached beats nothing while NewsAPI asks us to wait
+        articles = news_cache.peek(key)
+        if articles is None:
+            raise
+    return articles[:num_articles]
+
+
+async def prefetch_news(topics: Iterable[str], num_articles: int = 3) -> None:
+    """Warm the cache for the given topics so the first news answer comes from memory."""
+    if not os.getenv("NEWS_API_KEY"):
+        return
+    topics = list(dict.fromkeys(_normalize_topic(t) for t in topics if t.strip()))
+    results = await asyncio.gather(
+        *(_get_articles(topic, num_articles) for topic in topics), return_exceptions=True
+    )
+    for topic, result in zip(topics, results):
+        if isinstance(result, Exception):
+            logging.warning(f"News prefetch for '{topic}' failed: {result}")
+    if topics:
+        logging.info(f"Prefetched news for: {', '.join(topics)}")
+
+
+_TOPIC_PATTERNS = [
+    re.compile(r"\b(?:news|headlines|updates)\s+(?:about|on|of|from)\s+([a-z][\w ]{1,40}?)(?=[.,;!?]|\band\b|$)"),
+    re.compile(r"\b([a-z][\w]+(?: [a-z][\w]+)?)\s+(?:news|headlines)\b"),
+]
+_NOT_TOPICS = {"latest", "some", "any", "daily", "breaking", "top", "good", "bad", "fake", "the latest"}
+_LEADING_WORDS = {
+    "like", "likes", "love", "loves", "enjoy", "enjoys", "prefer", "prefers", "follow", "follows",
+    "read", "reads", "reading", "watch", "watches", "the", "about", "to",
+}
+
+
+def news_topics_from_preferences(memories: Iterable[str], limit: int = 3) -> List[str]:
+    """Pick news topics out of stored preferences, e.g. "I like cricket news" -> "cricket"."""
+    topics: List[str] = []
+    for memory in memories:
+        text = str(memory).lower()
+        for pattern in _TOPIC_PATTERNS:
+            for match in pattern.finditer(text):
+                topic = match.group(1).strip()
+                words = topic.split()
+                while words and words[0] in _LEADING_WORDS:
+                    words = words[1:]
+                topic = " ".join(words)
+                if topic and topic not in _NOT_TOPICS and topic not in topics:
+                    topics.append(topic)
+    return topics[:limit]
+
+
+def start_news_prefetch(memories: Iterable[str]) -> None:
+    """Prefetch news for topics found in stored preferences in the background (NEWS_PREFETCH=0 disables)."""
+    global _prefetch_task
+    if os.getenv("NEWS_PREFETCH", "1") == "0":
+        return
+    topics = news_topics_from_preferences(memories)
+    if topics:
+        _prefetch_task = asyncio.create_task(prefetch_news(topics))
+
+
+def news_cache_info() -> dict:
+    """Cache counters, cached (topic, page size) keys and the current rate-limit backoff."""
+    info = news_cache.stats()
+    info["keys"] = news_cache.keys()
+    info["rate_limited_for"] = max(0.0, _rate_limited_until - time.monotonic())
+    return info
+
 
 @function_tool
 async def fetch_news(
@@ -17,24 +176,12 @@ async def fetch_news(
     Returns:
     - A string summarizing the latest news articles on the topic.
     """
-    import requests
-    import os
-
     NEWS_API_KEY = os.getenv("NEWS_API_KEY")
     if not NEWS_API_KEY:
         return "News API key is not configured."
 
-    url = f"https://newsapi.org/v2/everything?q={topic}&pageSize={num_articles}&apiKey={NEWS_API_KEY}"
-
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-
-        if data.get("status") != "ok":
-            return "Failed to fetch news articles."
-
-        articles = data.get("articles", [])
+        articles = await _get_articles(topic, max(1, num_articles))
         if not articles:
             return f"No news articles found for '{topic}'."
 
@@ -46,7 +193,11 @@ async def fetch_news(
 
         return news_summary.strip()
 
-    except requests.RequestException as e:
+    except NewsRateLimited as e:
+        return f"The news service is busy right now, please try again in {e.retry_after:.0f} seconds."
+    except ValueError:
+        return "Failed to fetch news articles."
+    except httpx.HTTPError as e:
         return f"An error occurred while fetching news: {e}"
     except Exception as e:
-        return f"An unexpected error occurred: {e}"
\ No newline at end of file
+        return f"An unexpected error occurred: {e}"
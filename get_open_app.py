@@ -1,11 +1,10 @@
-import sqlite3
 import subprocess
 import os
 from typing import Optional
 from functools import wraps
 from livekit.agents import function_tool
+from app_registry import get_app_registry
 
-DB_PATH = "Ramx.db"  
 TOOLS = {}  
 
 def tool(name: str):
@@ -23,26 +22,11 @@ def tool(name: str):
 
 def get_app_path(app_name: str) -> "Optional[str]":
     """
-    Fetch the app path from the database.
+    Fetch the app path (or URL) from the in-memory app registry.
     Searches both sys_command and web_command tables.
     """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-   
-    cursor.execute("SELECT path FROM sys_command WHERE name = ?", (app_name,))
-    result = cursor.fetchone()
-    if result:
-        conn.close()
-        return result[0]
-
-    cursor.execute("SELECT path FROM web_command WHERE name = ?", (app_name,))
-    result = cursor.fetchone()
-    conn.close()
-    if result:
-        return result[0]
-
-    return None
+    entry = get_app_registry().lookup(app_name)
+    return entry.target if entry else None
 
 
 @function_tool()
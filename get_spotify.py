@@ -1,47 +1,242 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, List, Optional
 from livekit.agents import function_tool, RunContext
+from disk_cache import JsonDiskCache, cache_path
+
+try:
+    import spotipy
+    from spotipy.cache_handler import CacheFileHandler, CacheHandler
+    from spotipy.oauth2 import SpotifyOAuth
+except ImportError:  # spotify_control reports the missing package when it is used
+    spotipy = None
+    CacheHandler = object
+
+# Refresh the access token in the background this long before it expires
+TOKEN_REFRESH_MARGIN = 300.0
+# The active device rarely changes; re-check it at most this often
+DEVICE_TTL = 30.0
+_SCOPE = "user-read-playback-state,user-modify-playback-state,user-read-currently-playing"
+# Most tracks in a play_queue request
+MAX_QUEUE = 10
+
+# Search query -> track, so favourite songs skip sp.search entirely
+track_uri_cache = JsonDiskCache(cache_path("spotify_tracks.json"), maxsize=1000, max_age=90 * 24 * 3600)
+
+
+def _spotify_cache_path() -> str:
+    cache_dir = os.path.join(os.path.expanduser("~"), "spotify_cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, ".cache")
+
+
+class SpotifyController:
+    """
+    Long-lived Spotify client shared by every spotify_control call.
+
+    - The OAuth token lives in memory; the token file is read once and written only when
+      the token changes, and the token is refreshed in the background ahead of expiry.
+    - The active device id is cached for DEVICE_TTL seconds.
+    - All requests go through one pooled requests.Session.
+    - Blocking spotipy calls run in worker threads, off the event loop.
+    """
+
+    def __init__(
+        self,
+        auth_manager=None,
+        api_prefix: Optional[str] = None,
+        device_ttl: float = DEVICE_TTL,
+        refresh_margin: float = TOKEN_REFRESH_MARGIN,
+    ):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        if spotipy is None:
+            raise RuntimeError("spotipy is not installed")
+
+        self.session = requests.Session()
+        # Same retry policy spotipy builds for its own sessions
+        retry = Retry(
+            total=3,
+            connect=None,
+            read=False,
+            allowed_methods=frozenset(["GET", "POST", "PUT", "DELETE"]),
+            status=3,
+            backoff_factor=0.3,
+            status_forcelist=spotipy.Spotify.default_retry_codes,
+        )
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=8, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        if auth_manager is None:
+            auth_manager = SpotifyOAuth(
+                client_id=os.getenv("SPOTIPY_CLIENT_ID"),
+                client_secret=os.getenv("SPOTIPY_CLIENT_SECRET"),
+                redirect_uri=os.getenv("SPOTIPY_REDIRECT_URI", "http://127.0.0.1:8888/callback"),
+                scope=_SCOPE,
+                cache_handler=MemoryFirstTokenCache(_spotify_cache_path()),
+                open_browser=True,
+                requests_session=self.session,
+            )
+        self.auth = auth_manager
+        self.sp = spotipy.Spotify(auth_manager=auth_manager, requests_session=self.session)
+        if api_prefix:
+            self.sp.prefix = api_prefix
+
+        self._device_ttl = device_ttl
+        self._refresh_margin = refresh_margin
+        self._device_id: Optional[str] = None
+        self._device_checked = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking spotipy call in a worker thread."""
+        await self._refresh_ahead()
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    async def device_id(self) -> Optional[str]:
+        """Active (or first available) device id, cached for a short TTL; None if there is none."""
+        now = time.monotonic()
+        if now - self._device_checked < self._device_ttl:
+            return self._device_id
+        devices = (await self.call(self.sp.devices)).get("devices") or []
+        active = next((d for d in devices if d.get("is_active")), devices[0] if devices else None)
+        self._device_id = active["id"] if active else None
+        self._device_checked = time.monotonic()
+        return self._device_id
+
+    def invalidate_device(self) -> None:
+        self._device_checked = 0.0
+
+    async def _refresh_ahead(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        # The first read loads the token file, so it runs off the event loop like the refresh
+        token = await asyncio.to_thread(self.auth.cache_handler.get_cached_token)
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return  # another call started a refresh meanwhile
+        if not token or not token.get("refresh_token"):
+            return
+        remaining = token["expires_at"] - time.time()
+        # Under a minute left spotipy refreshes inline anyway
+        if 60 < remaining < self._refresh_margin:
+            self._refresh_task = asyncio.create_task(asyncio.to_thread(self._refresh_token, token["refresh_token"]))
+
+    def _refresh_token(self, refresh_token: str) -> None:
+        try:
+            self.auth.refresh_access_token(refresh_token)
+            logging.info("Spotify access token refreshed")
+        except Exception as e:
+            logging.warning(f"Spotify token refresh failed: {e}")
+
+
+class MemoryFirstTokenCache(CacheHandler):
+    """spotipy cache handler that reads the token file once and keeps the token in memory."""
+
+    def __init__(self, path: str):
+        self._file = CacheFileHandler(cache_path=path)
+        self._token: Optional[dict] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def get_cached_token(self) -> Optional[dict]:
+        with self._lock:
+            if not self._loaded:
+                self._token = self._file.get_cached_token()
+                self._loaded = True
+            return self._token
+
+    def save_token_to_cache(self, token_info: dict) -> None:
+        with self._lock:
+            self._token = token_info
+            self._loaded = True
+            self._file.save_token_to_cache(token_info)
+
+
+_controller: Optional[SpotifyController] = None
+_controller_lock: Optional[asyncio.Lock] = None
+
+
+async def get_spotify_controller() -> SpotifyController:
+    """The shared controller, built in a worker thread on first use (spotipy import, token file)."""
+    global _controller, _controller_lock
+    if _controller is not None:
+        return _controller
+    if _controller_lock is None:
+        _controller_lock = asyncio.Lock()
+    async with _controller_lock:
+        if _controller is None:
+            _controller = await asyncio.to_thread(SpotifyController)
+    return _controller
+
+
+def set_spotify_controller(controller: Optional[SpotifyController]) -> None:
+    """Replace the shared controller (e.g. one pointed at a local fake Spotify API in tests)."""
+    global _controller
+    _controller = controller
+
+
+async def resolve_track(ctl: SpotifyController, query: str) -> Optional[dict]:
+    """Best match for a search query, from the persistent cache or sp.search; None if not found."""
+    key = " ".join(query.strip().lower().split())
+    # The cache reads and rewrites a JSON file, so it is used off the event loop
+    track = await asyncio.to_thread(track_uri_cache.get, key)
+    if track:
+        return track
+    results = await ctl.call(ctl.sp.search, q=query, type='track', limit=1)
+    items = results['tracks']['items']
+    if not items:
+        return None
+    item = items[0]
+    # Keep only what playback and the replies need
+    track = {
+        "uri": item['uri'],
+        "name": item['name'],
+        "artists": [{"name": a['name']} for a in item['artists'][:1]],
+        "external_urls": {"spotify": item['external_urls']['spotify']},
+    }
+    await asyncio.to_thread(track_uri_cache.set, key, track)
+    return track
+
+
+def _split_track_names(track_names: str) -> List[str]:
+    names = [n.strip() for n in track_names.replace("\n", ",").replace(";", ",").split(",")]
+    return [n for n in names if n][:MAX_QUEUE]
+
 
 @function_tool()
 async def spotify_control(
     context: RunContext,
     action: str,
     track_name: str = None,
-    open_in_browser: bool = True
+    open_in_browser: bool = True,
+    track_names: str = None
 ) -> str:
     """
     Control Spotify playback for Premium users, or provide links for Free users.
 
     Parameters:
-    - action: The action to perform (play, pause, resume, next, previous, current)
+    - action: The action to perform (play, play_queue, pause, resume, next, previous, current)
     - track_name: Name of the track to play (required for 'play' action)
     - open_in_browser: For Free users, whether to open track URL in the browser
+    - track_names: Comma separated track names to play in order (required for 'play_queue'),
+      e.g. "Kesariya, Tum Hi Ho, Apna Bana Le"
 
     Returns:
     - A string indicating the result
     """
-    import spotipy
-    from spotipy.oauth2 import SpotifyOAuth
-    import os
     import webbrowser
 
-    # Set up cache folder
-    CACHE_DIR = os.path.join(os.path.expanduser("~"), "spotify_cache")
-    os.makedirs(CACHE_DIR, exist_ok=True)
-    CACHE_PATH = os.path.join(CACHE_DIR, ".cache")
-
-    # Load environment variables
-    SPOTIPY_CLIENT_ID = os.getenv("SPOTIPY_CLIENT_ID")
-    SPOTIPY_CLIENT_SECRET = os.getenv("SPOTIPY_CLIENT_SECRET")
-    SPOTIPY_REDIRECT_URI = os.getenv("SPOTIPY_REDIRECT_URI", "http://127.0.0.1:8888/callback")
-
-    # Initialize Spotipy
-    sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
-        client_id=SPOTIPY_CLIENT_ID,
-        client_secret=SPOTIPY_CLIENT_SECRET,
-        redirect_uri=SPOTIPY_REDIRECT_URI,
-        scope="user-read-playback-state,user-modify-playback-state,user-read-currently-playing",
-        cache_path=CACHE_PATH,
-        open_browser=True
-    ))
+    try:
+        ctl = await get_spotify_controller()
+    except Exception as e:
+        return f"An unexpected error occurred: {str(e)}"
+    sp = ctl.sp
 
     # Normalize action
     action = action.lower()
@@ -51,48 +246,63 @@ async def spotify_control(
         track_uri = None
         track_url = None
         if action == "play" and track_name:
-            results = sp.search(q=track_name, type='track', limit=1)
-            if results['tracks']['items']:
-                track = results['tracks']['items'][0]
+            track = await resolve_track(ctl, track_name)
+            if track:
                 track_uri = track['uri']
                 track_url = track['external_urls']['spotify']
             else:
                 return f"Sorry, I couldn't find the track '{track_name}'."
 
+        # Resolve every queued track at once instead of one tool call per song
+        queue = []
+        missing = []
+        if action == "play_queue":
+            names = _split_track_names(track_names or track_name or "")
+            if not names:
+                return "Please provide the track names to queue."
+            found = await asyncio.gather(*(resolve_track(ctl, name) for name in names))
+            queue = [t for t in found if t]
+            missing = [name for name, t in zip(names, found) if not t]
+            if not queue:
+                return "Sorry, I couldn't find any of those tracks."
+
         # Get active device
-        devices = sp.devices()
-        if devices['devices']:
-            device_id = devices['devices'][0]['id']
-            is_premium = True
-        else:
-            device_id = None
-            is_premium = False
+        device_id = await ctl.device_id()
+        is_premium = device_id is not None
 
         # PREMIUM USER PLAYBACK
         if is_premium:
             if action == "play":
-                sp.start_playback(device_id=device_id, uris=[track_uri])
+                await ctl.call(sp.start_playback, device_id=device_id, uris=[track_uri])
                 return f"🎶 Playing '{track['name']}' by {track['artists'][0]['name']} on Spotify Premium."
+            elif action == "play_queue":
+                # One playback call plays the whole list in order
+                await ctl.call(sp.start_playback, device_id=device_id, uris=[t['uri'] for t in queue])
+                result = "🎶 Playing on Spotify Premium: " + ", ".join(
+                    f"'{t['name']}' by {t['artists'][0]['name']}" for t in queue)
+                if missing:
+                    result += f". Couldn't find: {', '.join(missing)}"
+                return result
             elif action == "pause":
-                sp.pause_playback(device_id=device_id)
+                await ctl.call(sp.pause_playback, device_id=device_id)
                 return "⏸️ Music paused."
             elif action == "resume":
-                sp.start_playback(device_id=device_id)
+                await ctl.call(sp.start_playback, device_id=device_id)
                 return "▶️ Music resumed."
             elif action == "next":
-                sp.next_track(device_id=device_id)
+                await ctl.call(sp.next_track, device_id=device_id)
                 return "⏭️ Skipped to the next track."
             elif action == "previous":
-                sp.previous_track(device_id=device_id)
+                await ctl.call(sp.previous_track, device_id=device_id)
                 return "⏮️ Went back to the previous track."
             elif action == "current":
-                current = sp.currently_playing()
+                current = await ctl.call(sp.currently_playing)
                 if current and current['item']:
                     track = current['item']
                     return f"🎧 Currently playing '{track['name']}' by {track['artists'][0]['name']}."
                 return "No track is currently playing."
             else:
-                return "Invalid action. Use play, pause, resume, next, previous, or current."
+                return "Invalid action. Use play, play_queue, pause, resume, next, previous, or current."
 
         # FREE USER: provide link only
         else:
@@ -102,10 +312,15 @@ async def spotify_control(
                         webbrowser.open(track_url)
                     return f"⚠️ Spotify Free account detected. Cannot play directly.\nYou can listen here: {track_url}"
                 return "⚠️ Track not found."
+            elif action == "play_queue":
+                links = "\n".join(f"{t['name']}: {t['external_urls']['spotify']}" for t in queue)
+                return f"⚠️ Spotify Free account detected. Cannot play directly.\nYou can listen here:\n{links}"
             else:
                 return "⚠️ Spotify Free account detected. Only 'play' action with track links is supported."
 
     except spotipy.exceptions.SpotifyException as e:
+        # The cached device may have gone away; look it up again next time
+        ctl.invalidate_device()
         if e.http_status == 403:
             return "⚠️ Playback failed: your Spotify account may not be Premium or no active device is available."
         return f"An error occurred while controlling Spotify: {str(e)}"
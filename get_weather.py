@@ -1,6 +1,26 @@
 import logging
+import os
 from livekit.agents import function_tool, RunContext
-import requests
+from http_client import http_get
+from ttl_cache import AsyncTTLCache
+
+# Current conditions barely change within 10 minutes; stale answers are served while refreshing
+WEATHER_CACHE_TTL = float(os.getenv("WEATHER_CACHE_TTL", "600"))
+weather_cache: AsyncTTLCache[str] = AsyncTTLCache(
+    ttl=WEATHER_CACHE_TTL, maxsize=64, stale_ttl=WEATHER_CACHE_TTL, name="weather"
+)
+
+
+def _normalize_city(city: str) -> str:
+    return " ".join(city.strip().lower().split())
+
+
+async def _fetch_weather(city: str) -> str:
+    response = await http_get(
+        f"https://wttr.in/{city}", params={"format": "3"})
+    response.raise_for_status()
+    return response.text.strip()
+
 
 @function_tool()
 async def get_current_weather(
@@ -9,16 +29,11 @@ async def get_current_weather(
     """
     Get the current weather for a given city using a weather API.
     """
+    key = _normalize_city(city)
     try:
-        response = requests.get(
-            f"https://wttr.in/{city}?format=3")
-        if response.status_code == 200:
-            logging.info(f"Weather data for '{city}': {response.text}")
-            return response.text.strip()
-        else:
-            logging.error(f"Error fetching weather data: {response.status_code}")
-            return "Sorry, I couldn't fetch the weather data at the moment."
-        
+        weather = await weather_cache.get(key, lambda: _fetch_weather(key))
+        logging.info(f"Weather data for '{city}': {weather} (cache: {weather_cache.stats()})")
+        return weather
     except Exception as e:
         logging.error(f"Error fetching weather data: {e}")
-        return "Sorry, I couldn't fetch the weather data at the moment."
\ No newline at end of file
+        return "Sorry, I couldn't fetch the weather data at the moment."
@@ -1,6 +1,107 @@
+import abc
+import asyncio
 import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 from livekit.agents import function_tool
-from langchain_community.tools import DuckDuckGoSearchRun
+from ttl_cache import AsyncTTLCache
+
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "300"))
+
+
+class SearchBackend(abc.ABC):
+    """
+    Interface for the web_search tool. Swap implementations with set_search_backend(),
+    e.g. a local stub service in tests and benchmarks.
+    """
+
+    name = "search"
+
+    @abc.abstractmethod
+    async def search(self, query: str) -> str:
+        """Search results for `query`, as text for the LLM."""
+
+    def warm(self) -> None:
+        """Start any expensive setup ahead of the first query."""
+
+    def close(self) -> None:
+        pass
+
+
+class ThreadedSearchBackend(SearchBackend):
+    """Runs a blocking search client on a small bounded thread pool, off the event loop."""
+
+    def __init__(self, max_workers: int = 2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="web-search")
+
+    @abc.abstractmethod
+    def _run(self, query: str) -> str:
+        """Blocking search, called on a worker thread."""
+
+    async def search(self, query: str) -> str:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._run, query)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class DuckDuckGoBackend(ThreadedSearchBackend):
+    """One long-lived DuckDuckGoSearchRun shared by every query."""
+
+    name = "duckduckgo"
+
+    def __init__(self, max_workers: int = 2):
+        super().__init__(max_workers)
+        self._tool = None
+        self._tool_lock = threading.Lock()
+
+    def _search_tool(self):
+        with self._tool_lock:
+            if self._tool is None:
+                # Importing langchain is slow; it happens on a pool thread, not the event loop
+                from langchain_community.tools import DuckDuckGoSearchRun
+                self._tool = DuckDuckGoSearchRun()
+            return self._tool
+
+    def warm(self) -> None:
+        self._executor.submit(self._search_tool)
+
+    def _run(self, query: str) -> str:
+        return self._search_tool().run(tool_input=query)
+
+
+_backend: Optional[SearchBackend] = None
+search_cache: AsyncTTLCache[str] = AsyncTTLCache(ttl=SEARCH_CACHE_TTL, maxsize=128, stale_ttl=0, name="web_search")
+
+
+def get_search_backend() -> SearchBackend:
+    global _backend
+    if _backend is None:
+        _backend = DuckDuckGoBackend()
+    return _backend
+
+
+def set_search_backend(backend: SearchBackend) -> None:
+    """Replace the search backend (closing the previous one) and drop its cached results."""
+    global _backend
+    if _backend is not None and _backend is not backend:
+        _backend.close()
+    _backend = backend
+    search_cache.clear()
+
+
+def close_search_backend() -> None:
+    global _backend
+    if _backend is not None:
+        _backend.close()
+        _backend = None
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.strip().lower().split())
+
 
 @function_tool()
 async def web_search(query: str) -> str:
@@ -8,9 +109,11 @@ async def web_search(query: str) -> str:
     Perform a web search using DuckDuckGo and return the top results.
     """
     try:
-        results = DuckDuckGoSearchRun().run(tool_input=query)
+        backend = get_search_backend()
+        key = _normalize_query(query)
+        results = await search_cache.get(key, lambda: backend.search(query))
         logging.info(f"Web search results '{query}': {results}")
         return results
     except Exception as e:
         logging.error(f"Error performing web search: {e}")
-        return "Sorry, I couldn't perform the web search at the moment."
\ No newline at end of file
+        return "Sorry, I couldn't perform the web search at the moment."
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+# Connect quickly or give up; slow APIs still get a generous read timeout
+_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0)
+# Concurrent requests allowed to a single host (httpx only limits the pool as a whole)
+MAX_PER_HOST = 4
+
+_client: Optional[httpx.AsyncClient] = None
+_client_lock: Optional[asyncio.Lock] = None
+_host_slots: Dict[str, asyncio.Semaphore] = {}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401  (installed with httpx[http2])
+        return True
+    except ImportError:
+        return False
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Shared AsyncClient for every network tool: keep-alive connection pooling, HTTP/2 when
+    the h2 package is installed, and default timeouts. Closed by aclose_http_client() on shutdown.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=_http2_available(),
+            limits=_LIMITS,
+            timeout=_TIMEOUT,
+            follow_redirects=True,
+        )
+    return _client
+
+
+async def open_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared client, building it in a worker thread the first time: loading the TLS
+    certificates takes tens of milliseconds that the event loop should not stall for.
+    """
+    global _client_lock
+    if _client is not None and not _client.is_closed:
+        return _client
+    if _client_lock is None:
+        _client_lock = asyncio.Lock()
+    async with _client_lock:
+        return await asyncio.to_thread(get_http_client)
+
+
+def _slots_for(url: str) -> asyncio.Semaphore:
+    host = urlsplit(url).netloc
+    slots = _host_slots.get(host)
+    if slots is None:
+        slots = _host_slots[host] = asyncio.Semaphore(MAX_PER_HOST)
+    return slots
+
+
+async def http_get(url: str, **kwargs) -> httpx.Response:
+    """GET through the shared client, allowing at most MAX_PER_HOST requests per host at a time."""
+    client = await open_http_client()
+    async with _slots_for(url):
+        return await client.get(url, **kwargs)
+
+
+@asynccontextmanager
+async def http_stream(method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+    """
+    Streaming request through the shared client: the body is read only as far as the caller
+    iterates, and leaving the block early closes the connection instead of downloading the rest.
+    """
+    client = await open_http_client()
+    async with _slots_for(url):
+        async with client.stream(method, url, **kwargs) as response:
+            yield response
+
+
+async def aclose_http_client() -> None:
+    global _client, _client_lock
+    if _client is not None:
+        try:
+            await _client.aclose()
+        except Exception as e:
+            logging.warning(f"Failed to close HTTP client: {e}")
+        _client = None
+    _client_lock = None
+    _host_slots.clear()
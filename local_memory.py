@@ -0,0 +1,284 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from disk_cache import cache_path
+
+MEMORY_PATH = cache_path("local_memory.db")
+# "local" always uses LocalMemoryClient, "mem0" the hosted client; "auto" picks mem0 only when
+# MEM0_API_KEY is set
+MEMORY_BACKEND = os.getenv("MEMORY_BACKEND", "auto").lower()
+EMBEDDING_DIM = 512
+
+# Maps a batch of texts to an (n, dim) float array; rows are normalized by the store
+EmbedFunction = Callable[[Sequence[str]], np.ndarray]
+
+_WORD = re.compile(r"\w+")
+# Function words carry no meaning for recall and would make unrelated memories look similar
+STOP_WORDS = frozenset(
+    "a an and are as at be by do does did for from has have i in is it its me my of on or so that "
+    "the their them they this to was what when where which who with you your".split()
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories(
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    memory TEXT NOT NULL,
+    metadata TEXT NOT NULL DEFAULT '{}',
+    created REAL NOT NULL,
+    embedding BLOB,
+    hits INTEGER NOT NULL DEFAULT 1,
+    updated REAL,
+    UNIQUE (user_id, category, memory)
+);
+CREATE TABLE IF NOT EXISTS batches(
+    key TEXT PRIMARY KEY,
+    created REAL NOT NULL
+);
+"""
+
+
+def use_local_memory() -> bool:
+    return MEMORY_BACKEND == "local" or (MEMORY_BACKEND == "auto" and not os.getenv("MEM0_API_KEY"))
+
+
+def hashing_embedding(texts: Sequence[str], dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """
+    Offline bag-of-features embedding: words and character trigrams of each word are hashed
+    (crc32, so vectors are stable across runs) into `dim` signed buckets. Close wordings share
+    most features, so cosine similarity works as a lexical-semantic match without a model.
+    """
+    out = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        buckets = []
+        weights = []
+        for word in _WORD.findall(text.lower()):
+            if word in STOP_WORDS:
+                continue
+            h = zlib.crc32(word.encode("utf-8"))
+            buckets.append(h)
+            weights.append(1.0)
+            padded = f"#{word}#"
+            for i in range(len(padded) - 2):
+                buckets.append(zlib.crc32(padded[i:i + 3].encode("utf-8")))
+                weights.append(0.5)
+        if not buckets:
+            continue
+        hashes = np.array(buckets, dtype=np.uint32)
+        signs = np.where(hashes & 0x80000000, -1.0, 1.0) * np.array(weights)
+        np.add.at(out[row], hashes % dim, signs)
+    return out
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _message_text(message) -> str:
+    if isinstance(message, dict):
+        role = message.get("role")
+        content = str(message.get("content", "")).strip()
+        return f"{role}: {content}" if role and role != "user" else content
+    return str(message).strip()
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+class LocalMemoryClient:
+    """
+    Embedded, offline memory backend with the add / get_all / search surface of mem0's AsyncMemoryClient.
+
+    Memories live in a SQLite table together with their embedding; the embeddings are loaded
+    once into a NumPy matrix (kept in step with every add) and search is one matrix-vector
+    product over the rows of the requested user and category, then a top-k by cosine
+    similarity. `embed` is any function from texts to vectors (the default hashes words and
+    trigrams); if its dimension changes, stored memories are re-embedded on open.
+
+    Each message passed to add is stored as one memory; an exact repeat is not stored again
+    but bumps the memory's `hits` and `updated` time, returned by get_all / search as "hits"
+    and "updated_at" for ranking. A batch sent with metadata["journal_batch"] is stored at
+    most once, so the memory journal can retry it safely (a retry does not count as a hit).
+    Blocking work runs in a worker thread.
+    """
+
+    def __init__(self, path: str = MEMORY_PATH, embed: Optional[EmbedFunction] = None):
+        self.path = path
+        self.embed = embed or hashing_embedding
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._ids = np.zeros(0, dtype=np.int64)
+        # user_id / category of each row as small integer codes, so filtering is vectorized
+        self._codes: Dict[str, int] = {}
+        self._users = np.zeros(0, dtype=np.int32)
+        self._categories = np.zeros(0, dtype=np.int32)
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+
+    def _open(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode = WAL")
+        with conn:
+            conn.executescript(SCHEMA)
+            # Stores created before hits / updated were tracked
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(memories)")}
+            if "hits" not in columns:
+                conn.execute("ALTER TABLE memories ADD COLUMN hits INTEGER NOT NULL DEFAULT 1")
+            if "updated" not in columns:
+                conn.execute("ALTER TABLE memories ADD COLUMN updated REAL")
+                conn.execute("UPDATE memories SET updated = created")
+        dim = self._embed(["dimension probe"]).shape[1]
+        rows = conn.execute("SELECT id, user_id, category, memory, embedding FROM memories ORDER BY id").fetchall()
+        stale = [r for r in rows if r[4] is None or len(r[4]) != dim * 4]
+        if stale:
+            # New embedding function (or rows written without one): re-embed once and store
+            vectors = self._embed([r[3] for r in stale])
+            with conn:
+                conn.executemany("UPDATE memories SET embedding = ? WHERE id = ?",
+                                 [(v.tobytes(), r[0]) for v, r in zip(vectors, stale)])
+            logging.info(f"Re-embedded {len(stale)} local memories")
+            fresh = {r[0]: v.tobytes() for v, r in zip(vectors, stale)}
+            rows = [(i, u, c, m, fresh.get(i, e)) for i, u, c, m, e in rows]
+        self._ids = np.array([r[0] for r in rows], dtype=np.int64)
+        self._users = np.array([self._code(r[1]) for r in rows], dtype=np.int32)
+        self._categories = np.array([self._code(r[2]) for r in rows], dtype=np.int32)
+        self._matrix = (np.frombuffer(b"".join(r[4] for r in rows), dtype=np.float32).reshape(len(rows), dim)
+                        if rows else np.zeros((0, dim), dtype=np.float32))
+        self._conn = conn
+        logging.info(f"Local memory store loaded: {len(rows)} memories")
+        return conn
+
+    def _embed(self, texts: Sequence[str]) -> np.ndarray:
+        return _normalize(self.embed(list(texts)))
+
+    def _code(self, value: str) -> int:
+        return self._codes.setdefault(value, len(self._codes))
+
+    def _mask(self, user_id: Optional[str], category: Optional[str]) -> np.ndarray:
+        mask = np.ones(len(self._ids), dtype=bool)
+        if user_id is not None:
+            mask &= self._users == self._codes.get(user_id, -1)
+        if category is not None:
+            mask &= self._categories == self._codes.get(category, -1)
+        return mask
+
+    def _add(self, messages, user_id: str, category: str, metadata: Optional[dict]) -> Dict:
+        if isinstance(messages, (str, dict)):
+            messages = [messages]
+        texts = list(dict.fromkeys(t for t in map(_message_text, messages) if t))
+        batch = (metadata or {}).get("journal_batch")
+        with self._lock:
+            conn = self._open()
+            if batch and conn.execute("SELECT 1 FROM batches WHERE key = ?", (batch,)).fetchone():
+                return {"results": []}
+            vectors = self._embed(texts) if texts else self._matrix[:0]
+            now = time.time()
+            added = []
+            with conn:
+                for text, vector in zip(texts, vectors):
+                    # A memory said again is not stored twice; it counts as one more hit instead
+                    row_id, hits = conn.execute(
+                        "INSERT INTO memories(user_id, category, memory, metadata, created, updated, embedding) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT(user_id, category, memory) DO UPDATE SET hits = hits + 1, updated = ? "
+                        "RETURNING id, hits",
+                        (user_id, category, text, json.dumps(metadata or {}), now, now, vector.tobytes(), now),
+                    ).fetchone()
+                    if hits == 1:
+                        added.append((row_id, text, vector))
+                if batch:
+                    conn.execute("INSERT OR IGNORE INTO batches(key, created) VALUES (?, ?)", (batch, now))
+            if added:
+                self._ids = np.concatenate([self._ids, np.array([a[0] for a in added], dtype=np.int64)])
+                self._users = np.concatenate([self._users, np.full(len(added), self._code(user_id), dtype=np.int32)])
+                self._categories = np.concatenate(
+                    [self._categories, np.full(len(added), self._code(category), dtype=np.int32)])
+                self._matrix = np.vstack([self._matrix, np.stack([a[2] for a in added])])
+        return {"results": [{"id": str(i), "memory": text, "event": "ADD"} for i, text, _ in added]}
+
+    def _rows(self, ids: Sequence[int]) -> Dict[int, Dict]:
+        if not len(ids):
+            return {}
+        marks = ",".join("?" * len(ids))
+        rows = self._conn.execute(
+            f"SELECT id, user_id, category, memory, metadata, created, hits, updated FROM memories "
+            f"WHERE id IN ({marks})",
+            [int(i) for i in ids],
+        )
+        return {
+            row_id: {
+                "id": str(row_id),
+                "memory": memory,
+                "user_id": user_id,
+                "categories": [category],
+                "metadata": json.loads(metadata),
+                "created_at": _iso(created),
+                "updated_at": _iso(updated if updated is not None else created),
+                "hits": hits,
+            }
+            for row_id, user_id, category, memory, metadata, created, hits, updated in rows
+        }
+
+    def _get_all(self, user_id: Optional[str], category: Optional[str]) -> List[Dict]:
+        with self._lock:
+            self._open()
+            ids = self._ids[self._mask(user_id, category)]
+            rows = self._rows(ids)
+        return [rows[i] for i in ids.tolist() if i in rows]
+
+    def _search(self, query: str, user_id: Optional[str], category: Optional[str], limit: int) -> List[Dict]:
+        with self._lock:
+            self._open()
+            mask = self._mask(user_id, category)
+            if not mask.any() or limit <= 0:
+                return []
+            ids = self._ids[mask]
+            scores = self._matrix[mask] @ self._embed([query])[0]
+            if len(scores) > limit:
+                top = np.argpartition(-scores, limit - 1)[:limit]
+            else:
+                top = np.arange(len(scores))
+            top = top[np.argsort(-scores[top], kind="stable")]
+            rows = self._rows(ids[top])
+        results = []
+        for i in top:
+            row = rows.get(int(ids[i]))
+            if row is not None:
+                results.append({**row, "score": float(scores[i])})
+        return results
+
+    async def add(self, messages, user_id: str = "default", category: str = "general",
+                  metadata: Optional[dict] = None, **kwargs) -> Dict:
+        return await asyncio.to_thread(self._add, messages, user_id, category, metadata)
+
+    async def get_all(self, user_id: Optional[str] = None, category: Optional[str] = None, **kwargs) -> List[Dict]:
+        return await asyncio.to_thread(self._get_all, user_id, category)
+
+    async def search(self, query: str, user_id: Optional[str] = None, category: Optional[str] = None,
+                     limit: int = 5, **kwargs) -> List[Dict]:
+        return await asyncio.to_thread(self._search, query, user_id, category, limit)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
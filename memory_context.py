@@ -0,0 +1,184 @@
+import logging
+import math
+import os
+import re
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from local_memory import STOP_WORDS, hashing_embedding
+
+# Rough token budget for the memories injected into the initial context
+MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", "400"))
+# Memories this similar (Jaccard over content words) are the same fact said again
+DUPLICATE_SIMILARITY = 0.8
+RECENCY_HALF_LIFE_DAYS = 30.0
+# Weights of the ranking signals, each scaled to 0..1
+RECENCY_WEIGHT = 0.4
+FREQUENCY_WEIGHT = 0.3
+RELEVANCE_WEIGHT = 0.3
+
+# Words that make a memory more useful at a given time of day
+TIME_OF_DAY_WORDS = {
+    "morning": "morning breakfast coffee tea news wake weather commute gym workout",
+    "afternoon": "afternoon lunch work meeting study focus coding",
+    "evening": "evening dinner music relax movie movies series cooking podcast",
+    "night": "night sleep late bed calm quiet reading",
+}
+
+_WORD = re.compile(r"\w+")
+
+
+class RankedMemory(NamedTuple):
+    text: str
+    score: float
+    count: int  # how many times the fact was stored: the hits of every memory merged into it
+    tokens: int
+
+
+class MemoryContext(NamedTuple):
+    text: str  # compact block for the initial context, one fact per line
+    memories: List[str]  # the facts that made it in, best first
+    tokens: int
+    dropped_duplicates: int
+    dropped_over_budget: int
+    dropped_tokens: int
+
+
+def estimate_tokens(text: str) -> int:
+    # About four characters per token for English text; no tokenizer needed for a budget
+    return max(1, (len(text) + 3) // 4)
+
+
+def time_of_day(now: datetime) -> str:
+    hour = now.hour
+    if 5 <= hour < 12:
+        return "morning"
+    if 12 <= hour < 17:
+        return "afternoon"
+    if 17 <= hour < 22:
+        return "evening"
+    return "night"
+
+
+def _entries(results) -> List[Dict]:
+    # mem0 returns a list, or {"results": [...]} from the v2 API
+    if isinstance(results, dict):
+        results = results.get("results", [])
+    return [r for r in results if isinstance(r, dict) and str(r.get("memory", "")).strip()]
+
+
+def _timestamp(entry: Dict) -> Optional[float]:
+    for field in ("updated_at", "created_at"):
+        value = entry.get(field)
+        if not value:
+            continue
+        try:
+            stamp = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            continue
+        if stamp.tzinfo is None:
+            stamp = stamp.replace(tzinfo=timezone.utc)
+        return stamp.timestamp()
+    return None
+
+
+def _hits(entry: Dict) -> int:
+    # LocalMemoryClient counts how often a memory was stored again; other backends store each once
+    try:
+        return max(1, int(entry.get("hits") or 1))
+    except (TypeError, ValueError):
+        return 1
+
+
+def _words(text: str) -> frozenset:
+    return frozenset(w for w in _WORD.findall(text.lower()) if w not in STOP_WORDS)
+
+
+def _similarity(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 1.0 if a == b else 0.0
+    return len(a & b) / len(a | b)
+
+
+def build_memory_context(results, topic: str = "", now: Optional[datetime] = None,
+                         budget: int = MEMORY_TOKEN_BUDGET) -> MemoryContext:
+    """
+    Pick the memories worth injecting at session start and pack them into `budget` tokens.
+
+    Near-identical memories (content-word Jaccard >= DUPLICATE_SIMILARITY) are merged into the
+    most recent one, and their summed "hits" (1 for a memory without a count) is its frequency.
+    Each remaining memory is scored on recency (updated_at, the last time it was said, halving
+    every RECENCY_HALF_LIFE_DAYS), frequency and
+    relevance (cosine similarity to `topic`, e.g. the end of the last conversation, plus
+    words that fit the time of day), then memories are taken best first while they fit.
+    """
+    now = now or datetime.now(timezone.utc)
+    entries = _entries(results)
+    # Newest first, so a merged group is represented by its latest wording
+    entries.sort(key=lambda e: _timestamp(e) or 0.0, reverse=True)
+
+    groups: List[List] = []  # [text, words, count, timestamp]
+    by_word: Dict[str, List[int]] = {}
+    for entry in entries:
+        text = " ".join(str(entry["memory"]).split())
+        words = _words(text)
+        candidates = {g for w in words for g in by_word.get(w, ())} if words else set(range(len(groups)))
+        match = next((g for g in sorted(candidates) if _similarity(words, groups[g][1]) >= DUPLICATE_SIMILARITY), None)
+        if match is not None:
+            groups[match][2] += _hits(entry)
+            continue
+        for w in words:
+            by_word.setdefault(w, []).append(len(groups))
+        groups.append([text, words, _hits(entry), _timestamp(entry)])
+
+    ranked: List[RankedMemory] = []
+    if groups:
+        texts = [g[0] for g in groups]
+        context = " ".join([topic or "", TIME_OF_DAY_WORDS[time_of_day(now.astimezone())]])
+        vectors = hashing_embedding(texts + [context])
+        norms = np.linalg.norm(vectors, axis=1)
+        norms[norms == 0] = 1.0
+        relevance = np.clip(vectors[:-1] @ vectors[-1] / (norms[:-1] * norms[-1]), 0.0, 1.0)
+        max_count = max(g[2] for g in groups)
+        for g, rel in zip(groups, relevance.tolist()):
+            text, _, count, stamp = g
+            if stamp is None:
+                recency = 0.5
+            else:
+                age_days = max(0.0, now.timestamp() - stamp) / 86400
+                recency = 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+            frequency = math.log1p(count) / math.log1p(max_count)
+            score = RECENCY_WEIGHT * recency + FREQUENCY_WEIGHT * frequency + RELEVANCE_WEIGHT * rel
+            ranked.append(RankedMemory(text, score, count, estimate_tokens(f"- {text}\n")))
+    ranked.sort(key=lambda m: m.score, reverse=True)
+
+    kept: List[RankedMemory] = []
+    used = 0
+    dropped_tokens = 0
+    for memory in ranked:
+        if used + memory.tokens <= budget:
+            kept.append(memory)
+            used += memory.tokens
+        else:
+            dropped_tokens += memory.tokens
+    text = "\n".join(f"- {m.text}" for m in kept)
+    result = MemoryContext(
+        text=text,
+        memories=[m.text for m in kept],
+        tokens=used,
+        dropped_duplicates=len(entries) - len(groups),
+        dropped_over_budget=len(ranked) - len(kept),
+        dropped_tokens=dropped_tokens,
+    )
+    logging.info(
+        f"Memory context: {len(kept)} of {len(entries)} memories in {used} tokens (budget {budget}); "
+        f"dropped {result.dropped_duplicates} duplicates and {result.dropped_over_budget} over budget "
+        f"(~{dropped_tokens} tokens)"
+    )
+    return result
+
+
+def memory_texts(results) -> List[str]:
+    return [str(e["memory"]) for e in _entries(results)]
@@ -0,0 +1,346 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from typing import Iterable, List, NamedTuple, Optional, Sequence
+
+from disk_cache import cache_path
+from preference_extractor import get_preference_extractor
+
+JOURNAL_PATH = cache_path("memory_journal.db")
+# Pending turns are pushed to the memory backend every FLUSH_INTERVAL seconds, or as soon as
+# BATCH_SIZE of them are waiting
+FLUSH_INTERVAL = float(os.getenv("MEMORY_FLUSH_INTERVAL", "10"))
+BATCH_SIZE = 20
+MAX_BACKOFF = 300.0
+# How long shutdown waits for the tail; whatever is left is replayed on the next start
+SHUTDOWN_FLUSH_TIMEOUT = 5.0
+# Flushed turns are kept this long, then pruned when the journal is opened
+RETENTION = 7 * 24 * 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS turns(
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    session TEXT NOT NULL,
+    role TEXT NOT NULL CHECK (role IN ('user', 'assistant')),
+    content TEXT NOT NULL,
+    category TEXT NOT NULL,
+    key TEXT NOT NULL UNIQUE,
+    batch TEXT,
+    created REAL NOT NULL,
+    flushed REAL,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS turns_pending ON turns(flushed, seq);
+CREATE INDEX IF NOT EXISTS turns_batch ON turns(batch);
+"""
+
+
+class Batch(NamedTuple):
+    key: str  # idempotency key, sent as metadata and reused on every retry of the same rows
+    category: str
+    seqs: List[int]
+    messages: List[str]
+
+
+def _item_text(item) -> str:
+    """Flatten a chat item's content into plain text."""
+    content = getattr(item, "content", "")
+    if isinstance(content, list):
+        return "".join(map(str, content))
+    return str(content)
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def last_topic(path: str = JOURNAL_PATH, turns: int = 3) -> str:
+    """The last few user turns in the journal (the end of the previous session), oldest first."""
+    if not os.path.exists(path):
+        return ""
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute(
+                "SELECT content FROM turns WHERE role = 'user' AND category = 'conversation' "
+                "ORDER BY seq DESC LIMIT ?",
+                (turns,),
+            ).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logging.warning(f"Could not read the memory journal: {e}")
+        return ""
+    return " ".join(content.split(": ", 1)[-1] for (content,) in reversed(rows))
+
+
+class MemoryJournal:
+    """
+    Append-only local journal of conversation turns, flushed to the memory backend in the background.
+
+    Every user/assistant turn is written to a SQLite (WAL) table as soon as it is added to the
+    conversation; each preference fact extracted from a user turn ("User loves Linkin Park")
+    gets a row in the "preferences" category, once per session. A flusher task sends the
+    pending rows in per-category batches through `backend.add(...)`, marking them flushed
+    only once the call succeeded, and backs off
+    exponentially while the backend fails. A batch keeps its idempotency key (passed as
+    `metadata={"journal_batch": key}`) across retries and restarts, so a batch that reached the
+    backend before a crash is recognisable when it is sent again. Only LocalMemoryClient acts
+    on the key and stores such a batch once; hosted Mem0 keeps it as plain metadata, so a
+    retry after a lost response can be stored twice there (delivery is at least once).
+
+    Rows are never lost with the process: anything not flushed when a session ends or crashes
+    is sent by the next session's flusher. Shutdown only has to flush the tail.
+    """
+
+    def __init__(self, backend=None, user_id: str = "RamX", path: str = JOURNAL_PATH,
+                 known: Iterable = (), interval: float = FLUSH_INTERVAL, batch_size: int = BATCH_SIZE,
+                 max_backoff: float = MAX_BACKOFF):
+        self.backend = backend
+        self.user_id = user_id
+        self.path = path
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_backoff = max_backoff
+        self.session = uuid.uuid4().hex
+        # Chat items already in the context at start (the loaded memories) are stored already
+        self._known = {_digest(getattr(item, "role", "") or "", _item_text(item).strip()) for item in known}
+        self._seen = set()  # identities of the turns journaled this session
+        self._facts = set()  # preference facts journaled this session
+        self._extractor = get_preference_extractor()
+        self._occurrences = {}  # (role, text) -> times seen this session, for items without an id
+        self._cursor = 0  # chat context items already passed to record_new
+        self._cursor_item = None
+        self._unsent = 0  # rows recorded since the flusher last ran
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._session = None
+        self.failures = 0
+        self.flushed = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        # WAL + NORMAL survives a process crash; only an OS crash can lose the last commits
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+            self._conn.execute("DELETE FROM turns WHERE flushed IS NOT NULL AND flushed < ?",
+                               (time.time() - RETENTION,))
+
+    # -- recording -------------------------------------------------------------------------
+
+    def attach(self, session) -> None:
+        """Subscribe to conversation item events of an AgentSession."""
+        self._session = session
+        session.on("conversation_item_added", self._on_item_added)
+
+    def _on_item_added(self, event) -> None:
+        try:
+            self.record(getattr(event, "item", event))
+        except sqlite3.Error as e:
+            logging.warning(f"Memory journal write failed: {e}")
+
+    def record(self, item) -> int:
+        """Journal one chat item. Returns the number of rows written (0 for skipped or known items)."""
+        item_id = getattr(item, "id", None)
+        if item_id and item_id in self._seen:
+            return 0
+        role = getattr(item, "role", None)
+        if role not in ("user", "assistant"):
+            return 0
+        text = _item_text(item).strip()
+        if not text or _digest(role, text) in self._known:
+            return 0
+
+        if item_id:
+            identity = item_id
+        else:
+            # Without an id, the n-th identical turn of a session is the same turn on every pass
+            n = self._occurrences.get((role, text), 0)
+            self._occurrences[(role, text)] = n + 1
+            identity = _digest(role, text, str(n))
+            if identity in self._seen:
+                return 0
+        self._seen.add(identity)
+
+        rows = [("conversation", f"{role}: {text}", "conversation")]
+        if role == "user":
+            for fact in self._extractor.extract(text):
+                memory = fact.memory
+                if memory.lower() not in self._facts:
+                    self._facts.add(memory.lower())
+                    rows.append(("preferences", memory, f"preferences/{memory.lower()}"))
+        now = time.time()
+        with self._conn:
+            written = 0
+            for category, content, part in rows:
+                cur = self._conn.execute(
+                    "INSERT OR IGNORE INTO turns(session, role, content, category, key, created) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.session, role, content, category, _digest(self.session, str(identity), part), now),
+                )
+                written += cur.rowcount
+        if written:
+            self._unsent += written
+            if self._unsent >= self.batch_size:
+                self._wake.set()
+        return written
+
+    def record_new(self, items: Sequence) -> int:
+        """
+        Journal the items of a chat context added since the last call. Items already journaled
+        (e.g. through the session events) are skipped by their id without touching their text.
+        If the context was truncated or rewritten since the last call, it is walked again from
+        the start; the journal keys keep that from writing anything twice.
+        """
+        cursor = self._cursor
+        if cursor > len(items) or (cursor and items[cursor - 1] is not self._cursor_item):
+            cursor = 0
+            self._occurrences.clear()
+        written = sum(self.record(item) for item in items[cursor:])
+        self._cursor = len(items)
+        self._cursor_item = items[-1] if items else None
+        return written
+
+    def session_log(self) -> List[str]:
+        """This session's conversation as "role: text" lines."""
+        rows = self._conn.execute(
+            "SELECT content FROM turns WHERE session = ? AND category = 'conversation' ORDER BY seq",
+            (self.session,),
+        )
+        return [content for (content,) in rows]
+
+    def pending(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM turns WHERE flushed IS NULL").fetchone()[0]
+
+    # -- flushing --------------------------------------------------------------------------
+
+    def _claim_batch(self) -> Optional[Batch]:
+        """
+        The oldest pending batch. Rows keep the batch they were first claimed in, so a retry
+        (or a replay after a crash) sends exactly the same rows under the same key.
+        """
+        with self._conn:
+            first = self._conn.execute(
+                "SELECT category, batch FROM turns WHERE flushed IS NULL ORDER BY seq LIMIT 1"
+            ).fetchone()
+            if first is None:
+                return None
+            category, key = first
+            if key is None:
+                rows = self._conn.execute(
+                    "SELECT seq, key FROM turns WHERE flushed IS NULL AND batch IS NULL AND category = ? "
+                    "ORDER BY seq LIMIT ?",
+                    (category, self.batch_size),
+                ).fetchall()
+                key = _digest(*(row_key for _, row_key in rows))
+                self._conn.executemany("UPDATE turns SET batch = ? WHERE seq = ?", [(key, seq) for seq, _ in rows])
+            rows = self._conn.execute(
+                "SELECT seq, content FROM turns WHERE batch = ? AND flushed IS NULL ORDER BY seq", (key,)
+            ).fetchall()
+        return Batch(key, category, [seq for seq, _ in rows], [content for _, content in rows])
+
+    async def _send(self, batch: Batch) -> bool:
+        """
+        Send one batch under its idempotency key. Exactly once with LocalMemoryClient, which
+        skips keys it already stored; at least once with hosted Mem0, which does not dedupe
+        on metadata.
+        """
+        try:
+            await self.backend.add(
+                batch.messages, user_id=self.user_id, category=batch.category,
+                metadata={"journal_batch": batch.key},
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            with self._conn:
+                self._conn.execute("UPDATE turns SET attempts = attempts + 1 WHERE batch = ?", (batch.key,))
+            logging.warning(f"Memory flush of {len(batch.seqs)} {batch.category} turns failed: {e}")
+            return False
+        with self._conn:
+            self._conn.execute("UPDATE turns SET flushed = ? WHERE batch = ?", (time.time(), batch.key))
+        self.flushed += len(batch.seqs)
+        logging.info(f"Saved {len(batch.seqs)} {batch.category} turns in memory.")
+        return True
+
+    async def flush(self) -> bool:
+        """Send every pending batch, oldest first. Returns False if the backend failed (rows stay pending)."""
+        if self.backend is None:
+            return False
+        async with self._flush_lock:
+            self._unsent = 0
+            while True:
+                batch = self._claim_batch()
+                if batch is None:
+                    return True
+                if not await self._send(batch):
+                    return False
+
+    async def _run(self) -> None:
+        while not self._closing:
+            delay = self.interval if not self.failures else min(self.max_backoff, self.interval * 2 ** self.failures)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            # wait_for can swallow a cancel that arrives as the event fires, so aclose also sets a flag
+            if self._closing:
+                return
+            self._wake.clear()
+            try:
+                self.failures = 0 if await self.flush() else self.failures + 1
+            except sqlite3.Error as e:
+                logging.warning(f"Memory journal read failed: {e}")
+                self.failures += 1
+
+    def start(self) -> None:
+        """Start the background flusher; turns left over from an earlier session are sent first."""
+        if self.backend is None:
+            logging.info("No memory backend; turns are only journaled locally until one is available.")
+            return
+        leftover = self._conn.execute(
+            "SELECT COUNT(*) FROM turns WHERE flushed IS NULL AND session != ?", (self.session,)
+        ).fetchone()[0]
+        if leftover:
+            logging.info(f"Replaying {leftover} journaled turns from an earlier session.")
+            self._wake.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def aclose(self, timeout: float = SHUTDOWN_FLUSH_TIMEOUT) -> None:
+        """Unsubscribe, stop the flusher and flush the tail within `timeout` seconds."""
+        if self._session is not None:
+            try:
+                self._session.off("conversation_item_added", self._on_item_added)
+            except Exception:
+                pass
+            self._session = None
+        self._closing = True
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+        try:
+            await asyncio.wait_for(self.flush(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logging.warning(f"Memory flush did not finish within {timeout:.0f}s.")
+        except sqlite3.Error as e:
+            logging.warning(f"Memory journal read failed: {e}")
+        left = self.pending()
+        if left:
+            logging.info(f"{left} turns stay in the memory journal for the next start.")
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
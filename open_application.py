@@ -1,27 +1,50 @@
 import time
 import subprocess
-<<<<<<< HEAD
 import os
 from typing import Optional
-import pyautogui
 from livekit.agents import function_tool
-=======
 import asyncio
-from typing import Optional
-import pyautogui
-from livekit.agents import function_tool
-import os
-import psutil
->>>>>>> master
+import logging
+import sqlite3
+import webbrowser
+from typing import List
+from app_discovery import get_app_index, launch_argv
+from app_launcher import LaunchResult, launch_and_verify, running_pids, wait_for_new_process
+from app_matcher import AppCandidate, AppMatch, AppMatcher
+from app_registry import get_app_registry, normalize_app_name
+from process_snapshot import get_process_snapshot
+from app_closer import CloseReport, close_process_trees
 
 # Helper: Basic app name normalization
+# Spoken variants only need one entry each: spacing, case, "+"/"plus" and filler words
+# ("app", "browser", ...) are normalized away by the matcher, and typos are matched fuzzily.
 COMMON_ALIASES = {
     "chrome": "Google Chrome",
     "google chrome": "Google Chrome",
     "edge": "Microsoft Edge",
     "microsoft edge": "Microsoft Edge",
     "calc": "Calculator",
+    "calculator": "Calculator",
+    "notepad": "Notepad",
     "notepad++": "Notepad++",
+    "word": "Word",
+    "microsoft word": "Word",
+    "ms word": "Word",
+    "excel": "Excel",
+    "microsoft excel": "Excel",
+    "ms excel": "Excel",
+    "powerpoint": "PowerPoint",
+    "microsoft powerpoint": "PowerPoint",
+    "paint": "Paint",
+    "ms paint": "Paint",
+    "vscode": "Visual Studio Code",
+    "vs code": "Visual Studio Code",
+    "visual studio code": "Visual Studio Code",
+    "telegram": "Telegram",
+    "spotify": "Spotify",
+    "discord": "Discord",
+    "file explorer": "File Explorer",
+    "explorer": "File Explorer",
 }
 
 # Optional fallback commands for popular apps
@@ -36,7 +59,6 @@ FALLBACK_CMDS = {
     "excel": ["cmd", "/c", "start", "", "excel"],
     "powerpoint": ["cmd", "/c", "start", "", "powerpnt"],
     "paint": ["cmd", "/c", "start", "", "mspaint"],
-<<<<<<< HEAD
     "telegram": ["cmd", "/c", "start", "", "telegram"],
 }
 
@@ -61,14 +83,84 @@ APP_PROCESS_NAMES = {
     "file explorer": "explorer.exe",
     "explorer": "explorer.exe",
     "telegram": "Telegram.exe",
-=======
->>>>>>> master
 }
 
+# Other process names an app may run as, tried when closing by its main process name closed nothing
+ALT_PROCESS_NAMES = {
+    "calculator": ["Calculator.exe", "CalculatorApp.exe", "win32calc.exe"],
+    "calc": ["Calculator.exe", "CalculatorApp.exe", "win32calc.exe"],
+}
+
+# Friendly names reported by list_running_applications, by (lowercased) process name
+RUNNING_APP_NAMES = {
+    "chrome.exe": "Google Chrome",
+    "msedge.exe": "Microsoft Edge",
+    "notepad.exe": "Notepad",
+    "notepad++.exe": "Notepad++",
+    "calculatorapp.exe": "Calculator",
+    "calculator.exe": "Calculator",
+    "winword.exe": "Microsoft Word",
+    "excel.exe": "Microsoft Excel",
+    "powerpnt.exe": "Microsoft PowerPoint",
+    "mspaint.exe": "Paint",
+    "spotify.exe": "Spotify",
+    "discord.exe": "Discord",
+    "code.exe": "Visual Studio Code",
+    "telegram.exe": "Telegram",
+}
+
+
+_matcher: Optional[AppMatcher] = None
+_matcher_version = None
+
+
+def _app_matcher() -> AppMatcher:
+    """
+    Fuzzy index over the app registry, COMMON_ALIASES, FALLBACK_CMDS and the installed-app
+    launchers, rebuilt when the registry or the installed-app index changes.
+    """
+    global _matcher, _matcher_version
+    try:
+        registry = get_app_registry()
+        entries = registry.entries()
+        reloads = registry.reloads
+    except sqlite3.Error as e:
+        logging.warning(f"App registry unavailable for matching: {e}")
+        entries, reloads = [], 0
+    index = get_app_index()
+    installed = index.apps("desktop")
+    version = (reloads, index.version)
+    if _matcher is not None and version == _matcher_version:
+        return _matcher
+
+    matcher = AppMatcher()
+    # Registry entries first: a name the user saved wins over a built-in spelling
+    for entry in entries:
+        matcher.add(entry.name, AppCandidate(entry.name, normalize_app_name(entry.name), "registry"))
+    for alias, display in COMMON_ALIASES.items():
+        candidate = AppCandidate(display, display.lower(), "builtin")
+        matcher.add(display, candidate)
+        matcher.add(alias, candidate)
+    for key in FALLBACK_CMDS:
+        display = COMMON_ALIASES.get(key, key)
+        matcher.add(key, AppCandidate(display, display.lower(), "builtin"))
+    # Installed launchers by display name and by desktop-file ID ("code" for Visual Studio Code)
+    for app in installed:
+        candidate = AppCandidate(app.name, normalize_app_name(app.name), "installed")
+        matcher.add(app.name, candidate)
+        matcher.add(os.path.basename(app.path).rsplit(".", 1)[0].split(".")[-1], candidate)
+    _matcher, _matcher_version = matcher, version
+    return matcher
+
+
+def _match_app(name: str) -> Optional[AppMatch]:
+    """Confident match for a spoken app name, or None when only the Start Menu search can tell."""
+    return _app_matcher().best(name)
+
 
 def _normalize(name: str) -> str:
-    n = name.strip().lower()
-    return COMMON_ALIASES.get(n, name.strip())
+    match = _match_app(name)
+    return match.candidate.name if match else name.strip()
 
 
 def _speak_ack(text: str) -> str:
@@ -76,110 +168,205 @@ def _speak_ack(text: str) -> str:
     return text
 
 
-def _try_start_menu_launch(app_name: str) -> None:
+async def _try_start_menu_launch(app_name: str) -> None:
     # Focus Start menu, type the app name, press Enter
-    # Add small delays to allow UI to catch up
+    # Add small delays to allow UI to catch up; keystrokes run in a worker thread and the
+    # delays are async sleeps, so the event loop (and the voice pipeline) keeps running.
+    # pyautogui needs a desktop session, so it is only imported when the keyboard is used.
+    import pyautogui
+
     pyautogui.FAILSAFE = False
-    pyautogui.press("win")
-    time.sleep(0.35)
-    pyautogui.typewrite(app_name, interval=0.02)
-    time.sleep(0.9)
-    pyautogui.press("enter")
+    await asyncio.to_thread(pyautogui.press, "win")
+    await asyncio.sleep(0.35)
+    await asyncio.to_thread(pyautogui.typewrite, app_name, interval=0.02)
+    await asyncio.sleep(0.9)
+    await asyncio.to_thread(pyautogui.press, "enter")
 
 
-def _fallback_known_apps(app_name: str) -> bool:
+def _expected_process_names(norm: str, match: Optional[AppMatch]) -> List[str]:
+    """Best guess at the process an app runs as, used to confirm a launch by its new PID."""
+    key = match.candidate.key if match else norm.strip().lower()
+    if key in FALLBACK_CMDS:
+        return [FALLBACK_CMDS[key][-1]]
+    app = get_app_index().lookup(norm)
+    if app is not None:
+        argv = launch_argv(app)
+        return [argv[0]] if argv else []
+    return [norm.replace(" ", "")]
+
+
+async def _launch_registry_app(name: str) -> Optional[LaunchResult]:
+    # The lookup may reload the registry from SQLite
+    entry = await asyncio.to_thread(get_app_registry().lookup, name)
+    if entry is None:
+        return None
+    if entry.kind == "web":
+        started = time.perf_counter()
+        opened = await asyncio.to_thread(webbrowser.open, entry.target)
+        return LaunchResult(opened, None, time.perf_counter() - started, "opened in browser" if opened else "no browser")
+    if not await asyncio.to_thread(os.path.exists, entry.target):
+        return None
+    return await launch_and_verify([entry.target], [entry.target])
+
+
+async def _launch_installed_app(name: str) -> Optional[LaunchResult]:
+    """Start an app found by name or command in the installed-app index, without touching the keyboard."""
+    # The lookup may have to (re)scan the installed-app directories
+    app = await asyncio.to_thread(get_app_index().lookup, name)
+    if app is None:
+        return None
+    argv = launch_argv(app)
+    return await launch_and_verify(argv, argv[:1])
+
+
+async def _fallback_known_apps(app_name: str) -> Optional[LaunchResult]:
     key = app_name.strip().lower()
     if key in FALLBACK_CMDS:
-        try:
-            subprocess.Popen(FALLBACK_CMDS[key], shell=False)
-            return True
-        except Exception:
-            return False
-    return False
+        return await launch_and_verify(FALLBACK_CMDS[key], FALLBACK_CMDS[key][-1:])
+    return None
+
+
+async def _launch_direct(norm: str, match: Optional[AppMatch]) -> Optional[LaunchResult]:
+    """Launch without the keyboard: registry entry, then installed app, then the fallback command."""
+    if match is None:
+        return await _launch_installed_app(norm)
+    result = None
+    if match.candidate.source == "registry":
+        result = await _launch_registry_app(match.candidate.name)
+    if result is None or not result.ok:
+        result = await _launch_installed_app(match.candidate.name) or result
+    if result is None or not result.ok:
+        result = await _fallback_known_apps(match.candidate.key) or result
+    return result
+
+
+def _close_process_name(norm: str) -> str:
+    """Process name to close an app by: the known one, an installed app's executable, or "<name>.exe"."""
+    key = norm.strip().lower()
+    if key in APP_PROCESS_NAMES:
+        return APP_PROCESS_NAMES[key]
+    app = get_app_index().lookup(norm)
+    if app is not None:
+        argv = launch_argv(app)
+        if argv:
+            return os.path.basename(argv[0])
+    return f"{norm}.exe"
+
+
+async def _close_processes(process_names: List[str]) -> CloseReport:
+    """Close every running process with one of these names, child processes included, off the event loop."""
+    def close() -> CloseReport:
+        snapshot = get_process_snapshot()
+        report = close_process_trees(sorted(snapshot.pids_for(process_names)))
+        snapshot.invalidate()
+        return report
+
+    report = await asyncio.to_thread(close)
+    logging.info(f"Closing {', '.join(process_names)}: {report.summary()} in {report.elapsed:.2f}s")
+    for outcome in report.outcomes:
+        logging.info(f"  pid {outcome.pid} ({outcome.name}): {outcome.outcome}")
+    return report
+
+
+def _closed_ack(norm: str, report: CloseReport) -> Optional[str]:
+    if not report.closed:
+        return None
+    if report.failed:
+        return _speak_ack(f"Closed most of {norm}, but {len(report.failed)} of its processes could not be closed.")
+    return _speak_ack(f"Closed {norm}.")
+
+
+def _launched_ack(norm: str, result: LaunchResult) -> str:
+    logging.info(f"Launched {norm}: {result.detail}, pid {result.pid}, {result.latency * 1000:.0f} ms")
+    return _speak_ack(f"Opened {norm} (ready in {result.latency:.1f} seconds).")
 
 
 @function_tool()
 async def open_application(app_name: str) -> str:
     """
-    Opens a Windows application using the Start Menu typing approach.
+    Opens an application. Names that confidently match the app registry, an installed app
+    (.desktop launcher or $PATH command) or a known app are launched directly; anything else
+    goes through the Start Menu typing approach. The launch is confirmed by watching for the
+    app's process (up to APP_LAUNCH_DEADLINE seconds) and the measured latency is reported.
     If the app can't be opened, returns an apologetic verbal message.
     """
     if not app_name or not app_name.strip():
         return _speak_ack("Please specify an app to open.")
 
-    norm = _normalize(app_name)
-    print(f"[Assistant]: Trying to open {norm}")
+    # Matching may have to (re)scan the installed-app directories
+    match = await asyncio.to_thread(_match_app, app_name)
+    norm = match.candidate.name if match else app_name.strip()
+    print(f"[Assistant]: Trying to open {norm}" + (f" (matched '{match.variant}', {match.score:.2f})" if match else ""))
+
+    result = await _launch_direct(norm, match)
+    if result is not None and result.ok:
+        return _launched_ack(norm, result)
+    if result is not None:
+        print(f"[Assistant]: Direct launch of {norm} failed: {result.detail}")
 
     try:
         # Verbal acknowledgement first
         ack = _speak_ack(f"Opening {norm}...")
+        names = await asyncio.to_thread(_expected_process_names, norm, match)
+        before = await asyncio.to_thread(running_pids, names)
+        started = time.perf_counter()
         # Attempt Start Menu flow
-        _try_start_menu_launch(norm)
-        # Small buffer; if it fails silently we provide a fallback
-<<<<<<< HEAD
-        time.sleep(0.6)
-=======
-        await asyncio.sleep(0.6)
->>>>>>> master
+        await _try_start_menu_launch(norm)
+        # Instead of a fixed buffer, wait (up to the deadline) for the app's process to show up
+        result = await wait_for_new_process(names, before, started)
+        if result.ok:
+            return _launched_ack(norm, result)
         return ack
     except Exception:
         # Fallback to known subprocess starts for common apps
-        if _fallback_known_apps(norm):
-            return _speak_ack(f"Opening {norm}...")
+        result = await _fallback_known_apps(norm)
+        if result is not None and result.ok:
+            return _launched_ack(norm, result)
         # Final verbal failure
         return _speak_ack(f"Sorry, I couldn't find {norm} on this system.")
 
 
 @function_tool()
-<<<<<<< HEAD
 async def close_application(app_name: str) -> str:
     """
-    Closes a Windows application by terminating its process.
+    Closes an application by terminating its process trees (taskkill as a last resort on Windows).
     Returns a verbal confirmation or error message.
     """
     if not app_name or not app_name.strip():
         return _speak_ack("Please specify an app to close.")
 
-    norm = _normalize(app_name)
+    # Matching and the installed-app lookup may have to (re)scan the installed-app directories
+    norm = await asyncio.to_thread(_normalize, app_name)
     key = norm.strip().lower()
-    
-    # Get the process name for the app
-    process_name = APP_PROCESS_NAMES.get(key)
-    
-    if not process_name:
-        # Try using the normalized name with .exe extension
-        process_name = f"{norm}.exe"
-    
+    process_name = await asyncio.to_thread(_close_process_name, norm)
     print(f"[Assistant]: Trying to close {norm} (process: {process_name})")
-    
+
     try:
-        # First check if the process is running
-        check_cmd = f'tasklist /FI "IMAGENAME eq {process_name}" 2>NUL | find /I /N "{process_name}"'
-        check_result = subprocess.run(check_cmd, shell=True, capture_output=True, text=True)
-        
-        if process_name.lower() not in check_result.stdout.lower():
+        # First check if the process is running (shared process snapshot instead of a tasklist call)
+        alternatives = ALT_PROCESS_NAMES.get(key, [])
+        if not await asyncio.to_thread(_is_application_running, process_name, *alternatives):
             return _speak_ack(f"{norm} is not currently running.")
-        
-        # Use taskkill command to close the application
-        kill_cmd = ["taskkill", "/F", "/IM", process_name]
-        result = subprocess.run(kill_cmd, capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            return _speak_ack(f"Closed {norm}.")
-        else:
-            # Try alternative process names for some apps
-            if key in ["calculator", "calc"]:
-                # Try both Calculator.exe and CalculatorApp.exe
-                for alt_name in ["Calculator.exe", "CalculatorApp.exe", "win32calc.exe"]:
-                    try:
-                        alt_result = subprocess.run(["taskkill", "/F", "/IM", alt_name], 
-                                                   capture_output=True, text=True)
-                        if alt_result.returncode == 0:
-                            return _speak_ack(f"Closed {norm}.")
-                    except Exception:
-                        continue
-            
-            return _speak_ack(f"Could not close {norm}. It may not be running.")
+
+        # Close every instance and its child processes at once, with one shared deadline
+        report = await _close_processes([process_name])
+        ack = _closed_ack(norm, report)
+        if ack:
+            return ack
+        # Try alternative process names for some apps
+        if alternatives:
+            ack = _closed_ack(norm, await _close_processes(alternatives))
+            if ack:
+                return ack
+
+        # taskkill as the last resort on Windows
+        if os.name == "nt":
+            result = await asyncio.to_thread(
+                subprocess.run, ["taskkill", "/f", "/im", process_name], capture_output=True, text=True
+            )
+            get_process_snapshot().invalidate()
+            if result.returncode == 0:
+                return _speak_ack(f"Closed {norm}.")
+        return _speak_ack(f"Could not close {norm}. It may not be running.")
     except Exception as e:
         print(f"[Error closing {norm}]: {str(e)}")
         return _speak_ack(f"Failed to close {norm}.")
@@ -189,19 +376,13 @@ async def close_application(app_name: str) -> str:
 async def assistant_open_command(command: str) -> str:
     """
     Detects phrases like "open <app>" or "close <app>" and triggers the appropriate function.
-=======
-async def assistant_open_command(command: str) -> str:
-    """
-    Detects phrases like "open <app>" and triggers open_application.
->>>>>>> master
     Returns a user-facing verbal response string.
     """
     if not command:
         return ""
     text = command.strip()
     lower = text.lower()
-<<<<<<< HEAD
-    
+
     # Check for close command
     if "close" in lower:
         try:
@@ -211,13 +392,10 @@ async def assistant_open_command(command: str) -> str:
                 return await close_application(candidate)
         except Exception:
             pass
-    
+
     # Check for open command
-    if "open" in lower:
-=======
     if "open" in lower:
         # extract best-effort app name after the first occurrence of 'open'
->>>>>>> master
         try:
             idx = lower.index("open")
             candidate = text[idx + len("open"):].strip().strip('"\' ')
@@ -225,98 +403,9 @@ async def assistant_open_command(command: str) -> str:
                 return await open_application(candidate)
         except Exception:
             pass
-<<<<<<< HEAD
-    
-    return ""
-=======
     return ""
 
 
-@function_tool()
-async def close_application(app_name: str) -> str:
-    """
-    Closes a Windows application using taskkill command or psutil.
-    Returns a user-facing verbal response string.
-    """
-    if not app_name or not app_name.strip():
-        return _speak_ack("Please specify an app to close.")
-
-    norm = _normalize(app_name)
-    print(f"[Assistant]: Trying to close {norm}")
-
-    try:
-        # Map common app names to their process names
-        process_map = {
-            "Google Chrome": "chrome.exe",
-            "Microsoft Edge": "msedge.exe",
-            "Calculator": "calculator.exe",
-            "Notepad++": "notepad++.exe",
-            "Notepad": "notepad.exe",
-            "Word": "winword.exe",
-            "Excel": "excel.exe",
-            "PowerPoint": "powerpnt.exe",
-            "Paint": "mspaint.exe",
-        }
-        
-        # Get the process name for the app
-        process_name = process_map.get(norm, norm.lower() + ".exe")
-        
-        # Check if the application is running first
-        if not _is_application_running(process_name):
-            return _speak_ack(f"Sorry, {norm} doesn't appear to be running.")
-        
-        # First try using taskkill command as it's more reliable on Windows
-        try:
-            result = subprocess.run(
-                ["taskkill", "/f", "/im", process_name], 
-                capture_output=True, 
-                text=True, 
-                shell=True
-            )
-            
-            if result.returncode == 0:
-                return _speak_ack(f"Closed {norm}.")
-        except Exception:
-            pass
-        
-        # Fallback to psutil if taskkill fails
-        closed = False
-        for proc in psutil.process_iter(['pid', 'name']):
-            try:
-                if proc.info['name'].lower() == process_name.lower():
-                    try:
-                        proc.terminate()
-                        proc.wait(timeout=3)  # Wait up to 3 seconds for graceful termination
-                        closed = True
-                    except psutil.TimeoutExpired:
-                        # If graceful termination fails, try force kill
-                        proc.kill()
-                        closed = True
-                    except psutil.NoSuchProcess:
-                        closed = True
-                    except psutil.AccessDenied:
-                        # Try taskkill by PID as last resort
-                        try:
-                            subprocess.run(["taskkill", "/f", "/pid", str(proc.info['pid'])], 
-                                         capture_output=True, shell=True)
-                            closed = True
-                        except:
-                            pass
-                    if closed:
-                        break
-            except (psutil.NoSuchProcess, psutil.AccessDenied, Exception):
-                continue
-        
-        if closed:
-            return _speak_ack(f"Closed {norm}.")
-        else:
-            return _speak_ack(f"Sorry, I couldn't close {norm}.")
-                
-    except Exception as e:
-        print(f"Error closing application: {e}")
-        return _speak_ack(f"Sorry, I encountered an error while trying to close {norm}.")
-
-
 @function_tool()
 async def list_running_applications() -> str:
     """
@@ -324,36 +413,18 @@ async def list_running_applications() -> str:
     Returns a user-facing verbal response string.
     """
     try:
-        # Map process names to user-friendly names
-        process_map = {
-            "chrome.exe": "Google Chrome",
-            "msedge.exe": "Microsoft Edge",
-            "notepad.exe": "Notepad",
-            "notepad++.exe": "Notepad++",
-            "calculator.exe": "Calculator",
-            "winword.exe": "Microsoft Word",
-            "excel.exe": "Microsoft Excel",
-            "powerpnt.exe": "Microsoft PowerPoint",
-            "mspaint.exe": "Paint",
-        }
-        
         running_apps = []
-        for proc in psutil.process_iter(['name']):
-            try:
-                proc_name = proc.info['name'].lower()
-                if proc_name in process_map:
-                    friendly_name = process_map[proc_name]
-                    if friendly_name not in running_apps:
-                        running_apps.append(friendly_name)
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
-        
+        running = await asyncio.to_thread(get_process_snapshot().names)
+        for proc_name, friendly_name in RUNNING_APP_NAMES.items():
+            if proc_name in running and friendly_name not in running_apps:
+                running_apps.append(friendly_name)
+
         if running_apps:
             app_list = ", ".join(running_apps)
             return f"The following applications are currently running: {app_list}."
         else:
             return "No common applications are currently running."
-                
+
     except Exception as e:
         print(f"Error listing applications: {e}")
         return "Sorry, I encountered an error while trying to list running applications."
@@ -374,36 +445,13 @@ async def assistant_list_command(command: str) -> str:
     return ""
 
 
-def _is_application_running(process_name: str) -> bool:
+def _is_application_running(*process_names: str) -> bool:
     """
-    Check if an application with the given process name is currently running.
+    Check if an application with one of the given process names is currently running.
+    Answered from the shared process snapshot, which rescans at most once per TTL.
     """
     try:
-        for proc in psutil.process_iter(['name']):
-            try:
-                if proc.info['name'].lower() == process_name.lower():
-                    return True
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
-        return False
-    except Exception:
-        return False
-
-
-def _close_by_window_title(app_name: str) -> bool:
-    """
-    Attempts to close an application by finding its window and sending Alt+F4.
-    Returns True if successful, False otherwise.
-    """
-    try:
-        # Use pyautogui to find window and close it
-        pyautogui.FAILSAFE = False
-        
-        # Try to find the window by title (this is a simplified approach)
-        # In a real implementation, you might want to use a more robust window management library
-        
-        # For now, we'll just return False to indicate this method isn't fully implemented
-        return False
+        snapshot = get_process_snapshot()
+        return any(snapshot.is_running(name) for name in process_names)
     except Exception:
         return False
->>>>>>> master
@@ -0,0 +1,199 @@
+import re
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+# (verb pattern, fact verb, polarity) — verbs that state a preference after "I"
+PREFERENCE_VERBS: List[Tuple[str, str, int]] = [
+    (r"lov(?:e|es|ed)", "loves", 1),
+    (r"ador(?:e|es|ed)", "loves", 1),
+    (r"lik(?:e|es|ed)", "likes", 1),
+    (r"enjoy(?:s|ed)?", "enjoys", 1),
+    (r"prefer(?:s|red)?", "prefers", 1),
+    (r"dislik(?:e|es|ed)", "dislikes", -1),
+    (r"hat(?:e|es|ed)", "hates", -1),
+    (r"detest(?:s|ed)?", "hates", -1),
+    (r"despis(?:e|es|ed)", "hates", -1),
+    (r"loath(?:e|es|ed)", "hates", -1),
+    (r"(?:can'?t|cannot) stand", "can't stand", -1),
+    (r"(?:could\s?n'?t|could not) stand", "couldn't stand", -1),
+]
+# Past-tense forms of the fact verbs: "I liked the old UI" is kept as "User liked the old UI"
+PAST_VERBS = {"loves": "loved", "likes": "liked", "enjoys": "enjoyed", "prefers": "preferred",
+              "dislikes": "disliked", "hates": "hated"}
+# First-person words in an object, rewritten so the memory reads in the third person
+THIRD_PERSON = {"my": "their", "me": "them", "mine": "theirs", "myself": "themselves", "i": "they",
+                "i'm": "they're", "i've": "they've", "i'd": "they'd", "i'll": "they'll"}
+# Phrases that state a preference after "I'm" / "I am" (and may be negated with "not")
+BE_PHRASES: List[Tuple[str, str, int]] = [
+    (r"(?:a\s+)?(?:big\s+|huge\s+|massive\s+)?fan of", "likes", 1),
+    (r"(?:really\s+|very\s+)?into", "likes", 1),
+    (r"(?:really\s+|very\s+)?fond of", "likes", 1),
+    (r"crazy about|obsessed with|passionate about", "loves", 1),
+    (r"(?:sick|tired) of", "dislikes", -1),
+]
+
+_ADVERBS = r"(?:\s+(?:really|truly|absolutely|totally|just|also|kind of|kinda|sort of|honestly|actually|still|" \
+           r"definitely|generally|usually|always|so|very much|quite|pretty much|much))*"
+_NEGATION = r"(?P<neg>\s+(?:don'?t|do not|never|didn'?t|did not|no longer|not|ain'?t))?"
+_PAST_NEGATION = re.compile(r"didn'?t|did not", re.IGNORECASE)
+_FIRST_PERSON = re.compile(r"\b(?:" + "|".join(sorted(THIRD_PERSON, key=len, reverse=True)) + r")\b(?!')", re.IGNORECASE)
+# Objects end at a clause boundary: punctuation or a word that starts a new clause. Items are matched
+# lazily up to it, so a second statement in the same sentence ("... and I hate X") is left for the
+# next match. A comma list ending in "and"/"or" ("pizza, pasta and sushi") is taken whole and split
+# into one fact per item; otherwise a comma ends the object ("tea over coffee, thanks") and a bare
+# pair stays one object ("rock and roll").
+_CLAUSE_WORDS = r"but|because|cause|since|though|although|when|while|whenever|if|unless|and then|so that|and i|or i"
+_ITEM = rf"(?:(?!\s+(?:{_CLAUSE_WORDS})\b)[^.!?;,\n])+?"
+_LIST = rf"{_ITEM}(?:\s*,\s*{_ITEM})+(?:,?\s+(?:and|or)\s+(?!i\b){_ITEM}|(?=,?\s+(?:and|or)\s+i\b))"
+_OBJECT = rf"\s+(?P<obj>{_LIST}|{_ITEM})(?=\s+(?:{_CLAUSE_WORDS})\b|\s*[.!?;,\n]|\s*$)"
+_LIST_SEPARATOR = re.compile(r"\s*,\s*(?:(?:and|or)\s+)?|\s+(?:and|or)\s+", re.IGNORECASE)
+_TRAILING = re.compile(
+    r"\s+(?:a lot|so much|very much|too|as well|a bit|lately|these days|right now|now|anymore|any more|"
+    r"at all|the most|most|more|a little)$",
+    re.IGNORECASE,
+)
+# A preference whose object is only a pronoun says nothing on its own ("I love it", "I like that"),
+# nor does one about a question word or an infinitive ("I love how ...", "I hate to interrupt")
+_EMPTY_OBJECTS = re.compile(
+    r"^(?:(?:it|that|this|these|those|them|him|her|you|one|some|everything|nothing|anything|something)$|"
+    r"(?:what|how|when|the way|to (?:interrupt|bother|say|ask|admit|break))\b)",
+    re.IGNORECASE,
+)
+MAX_OBJECT_WORDS = 8
+
+
+class PreferenceFact(NamedTuple):
+    verb: str  # normalized verb: "loves", "liked", "prefers", "dislikes", "hates", "favorite band is", ...
+    obj: str  # what the preference is about, in the third person: "Linkin Park", "their coffee black"
+    polarity: int  # 1 for a liking, -1 for a dislike
+    source: str  # the sentence it was found in
+
+    @property
+    def memory(self) -> str:
+        """Compact memory text, e.g. "User loves Linkin Park"."""
+        if self.verb.startswith("favorite"):
+            return f"User's {self.verb} {self.obj}"
+        return f"User {self.verb} {self.obj}"
+
+
+def _alternation(rules) -> str:
+    return "|".join(f"(?P<v{i}>{pattern})" for i, (pattern, _, _) in enumerate(rules))
+
+
+class PreferenceExtractor:
+    """
+    Extracts structured preference facts from user turns with a few regexes compiled once.
+
+    Matches first-person statements at word boundaries: "I (really) love X", "I don't like X",
+    "I'm a big fan of X", "I'm not into X", "I can't stand X", "my favorite band is X". A
+    negated liking becomes a dislike; a negated dislike ("I don't hate X") carries no fact.
+    Past tense is kept ("I liked X" becomes "User liked X"). The object runs to the end of the
+    clause, minus trailing fillers, with first-person words put in the third person ("my"
+    becomes "their"); a list ("pizza, pasta and sushi") gives one fact per item. Objects that
+    are just a pronoun, or overly long ones, are dropped, so "it looks like rain",
+    "I'd like to open Chrome" or "do you like it?" produce nothing. Questions are skipped.
+    """
+
+    def __init__(self):
+        self._verb_rules = PREFERENCE_VERBS
+        self._be_rules = BE_PHRASES
+        self._verb_re = re.compile(
+            rf"\bi{_ADVERBS}{_NEGATION}{_ADVERBS}\s+(?:{_alternation(PREFERENCE_VERBS)}){_OBJECT}",
+            re.IGNORECASE,
+        )
+        self._be_re = re.compile(
+            rf"\bi(?:'m|\s+am){_ADVERBS}{_NEGATION}{_ADVERBS}\s+(?:{_alternation(BE_PHRASES)}){_OBJECT}",
+            re.IGNORECASE,
+        )
+        self._favorite_re = re.compile(
+            r"\bmy\s+(?:all[- ]time\s+)?(?:favou?rite|fav)\s+(?P<kind>[a-z]+(?:\s+[a-z]+)?)\s+(?:is|are)" + _OBJECT,
+            re.IGNORECASE,
+        )
+        self._sentence_re = re.compile(r"[^.!?\n]+[.!?]?")
+
+    def _objects(self, raw: str) -> List[str]:
+        """The items of a captured object; a comma list yields one object per item."""
+        if "," not in raw:
+            return [obj for obj in [self._object(raw)] if obj]
+        return [obj for obj in map(self._object, _LIST_SEPARATOR.split(raw)) if obj]
+
+    def _object(self, raw: str) -> Optional[str]:
+        obj = raw.strip()
+        while True:
+            trimmed = _TRAILING.sub("", obj)
+            if trimmed == obj:
+                break
+            obj = trimmed
+        obj = obj.strip(" '\"")
+        if not obj or _EMPTY_OBJECTS.match(obj) or len(obj.split()) > MAX_OBJECT_WORDS:
+            return None
+        return _FIRST_PERSON.sub(lambda m: THIRD_PERSON[m.group(0).lower()], obj)
+
+    def _match(self, match, rules) -> Optional[Tuple[str, int]]:
+        for i, (_, verb, polarity) in enumerate(rules):
+            spoken = match.group(f"v{i}")
+            if spoken:
+                negation = match.group("neg")
+                if negation:
+                    # "I don't like X" is a dislike; "I don't hate X" states nothing useful
+                    if polarity < 0:
+                        return None
+                    verb, polarity = "dislikes", -1
+                # The tense is kept: "I liked X" / "I didn't like X" may no longer hold
+                if spoken.lower().endswith("ed") or (negation and _PAST_NEGATION.search(negation)):
+                    verb = PAST_VERBS.get(verb, verb)
+                return verb, polarity
+        return None
+
+    def extract(self, text: str) -> List[PreferenceFact]:
+        """Preference facts stated in one user turn, in order, without repeats."""
+        facts: List[PreferenceFact] = []
+        seen = set()
+        text = text.replace("’", "'")
+        for sentence in self._sentence_re.findall(text):
+            sentence = sentence.strip()
+            if not sentence or sentence.endswith("?"):
+                continue
+            found = []
+            for regex, rules in ((self._verb_re, self._verb_rules), (self._be_re, self._be_rules)):
+                for match in regex.finditer(sentence):
+                    decided = self._match(match, rules)
+                    if decided is None:
+                        continue
+                    verb, polarity = decided
+                    for obj in self._objects(match.group("obj")):
+                        found.append((match.start(), PreferenceFact(verb, obj, polarity, sentence)))
+            for match in self._favorite_re.finditer(sentence):
+                kind = match.group("kind").lower()
+                for obj in self._objects(match.group("obj")):
+                    found.append((match.start(), PreferenceFact(f"favorite {kind} is", obj, 1, sentence)))
+            for _, fact in sorted(found, key=lambda f: f[0]):
+                key = fact.memory.lower()
+                if key not in seen:
+                    seen.add(key)
+                    facts.append(fact)
+        return facts
+
+    def extract_many(self, texts: Iterable[str]) -> List[PreferenceFact]:
+        """Facts from several user turns, without repeats across them."""
+        facts: List[PreferenceFact] = []
+        seen = set()
+        for text in texts:
+            for fact in self.extract(text):
+                if fact.memory.lower() not in seen:
+                    seen.add(fact.memory.lower())
+                    facts.append(fact)
+        return facts
+
+
+_extractor: Optional[PreferenceExtractor] = None
+
+
+def get_preference_extractor() -> PreferenceExtractor:
+    global _extractor
+    if _extractor is None:
+        _extractor = PreferenceExtractor()
+    return _extractor
+
+
+def extract_preferences(text: str) -> List[PreferenceFact]:
+    return get_preference_extractor().extract(text)
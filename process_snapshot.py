@@ -0,0 +1,147 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+import psutil
+
+# How long one process scan answers "is X running?" before the next lookup refreshes it
+PROCESS_SNAPSHOT_TTL = float(os.getenv("PROCESS_SNAPSHOT_TTL", "1.0"))
+# Incremental refreshes only name new PIDs; a full rescan now and then catches reused PIDs
+FULL_SCAN_INTERVAL = 30.0
+
+
+def process_key(name: str) -> str:
+    """Comparable process name: "Code.exe", "code" and "/usr/bin/code" all become "code"."""
+    name = os.path.basename(name).lower()
+    return name[:-4] if name.endswith(".exe") else name
+
+
+class ProcessSnapshot:
+    """
+    The process table indexed by process name, shared by the app tools.
+
+    One scan answers every lookup for `ttl` seconds. Refreshes are incremental: psutil.pids()
+    (a directory listing) is diffed against the previous scan, exited PIDs are dropped and
+    only new ones are looked up, with a full rescan every FULL_SCAN_INTERVAL seconds.
+    `start()` keeps the snapshot refreshed from a background thread, so lookups never scan.
+    """
+
+    def __init__(self, ttl: float = PROCESS_SNAPSHOT_TTL, full_scan_interval: float = FULL_SCAN_INTERVAL):
+        self.ttl = ttl
+        self.full_scan_interval = full_scan_interval
+        self._names: Dict[int, str] = {}  # pid -> process name as reported
+        self._by_key: Dict[str, Set[int]] = {}  # process_key(name) -> pids
+        # PIDs first seen by the last refresh; one caught between fork and exec still has its parent's name
+        self._young: Set[int] = set()
+        self._taken = 0.0
+        self._full_scan_at = 0.0
+        self._lock = threading.Lock()
+        self._stop: Optional[threading.Event] = None
+        self.scans = 0
+        self.full_scans = 0
+
+    def _add(self, pid: int, name: str) -> None:
+        self._names[pid] = name
+        self._by_key.setdefault(process_key(name), set()).add(pid)
+
+    def _remove(self, pid: int) -> None:
+        name = self._names.pop(pid)
+        key = process_key(name)
+        pids = self._by_key.get(key)
+        if pids is not None:
+            pids.discard(pid)
+            if not pids:
+                del self._by_key[key]
+
+    def refresh(self, full: bool = False) -> "ProcessSnapshot":
+        with self._lock:
+            now = time.monotonic()
+            if full or not self._names or now - self._full_scan_at >= self.full_scan_interval:
+                self._names, self._by_key = {}, {}
+                for proc in psutil.process_iter(["name"]):
+                    if proc.info.get("name"):
+                        self._add(proc.pid, proc.info["name"])
+                self._full_scan_at = now
+                self._young = set()
+                self.full_scans += 1
+            else:
+                pids = set(psutil.pids())
+                for pid in self._names.keys() - pids:
+                    self._remove(pid)
+                new = pids - self._names.keys()
+                for pid in (self._young & pids) | new:
+                    try:
+                        name = psutil.Process(pid).name()
+                    except psutil.Error:
+                        continue
+                    if name and name != self._names.get(pid):
+                        if pid in self._names:
+                            self._remove(pid)
+                        self._add(pid, name)
+                self._young = new
+            self._taken = time.monotonic()
+            self.scans += 1
+        return self
+
+    def _fresh(self) -> None:
+        if time.monotonic() - self._taken >= self.ttl:
+            self.refresh()
+
+    def invalidate(self) -> None:
+        """Make the next lookup rescan (call after starting or killing processes)."""
+        self._taken = 0.0
+
+    def pids(self, name: str) -> List[int]:
+        self._fresh()
+        with self._lock:
+            return sorted(self._by_key.get(process_key(name), ()))
+
+    def pids_for(self, names: Iterable[str]) -> Set[int]:
+        self._fresh()
+        with self._lock:
+            return {pid for name in names for pid in self._by_key.get(process_key(name), ())}
+
+    def is_running(self, name: str) -> bool:
+        self._fresh()
+        return process_key(name) in self._by_key
+
+    def names(self) -> Set[str]:
+        """Lowercase names of all running processes."""
+        self._fresh()
+        with self._lock:
+            return {name.lower() for name in self._names.values()}
+
+    def start(self, interval: Optional[float] = None) -> None:
+        """Refresh every `interval` seconds (default: half the TTL) in a daemon thread."""
+        if self._stop is not None:
+            return
+        self._stop = threading.Event()
+        interval = interval or self.ttl / 2
+        stop = self._stop
+
+        def run():
+            while not stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logging.warning(f"Process snapshot refresh failed: {e}")
+
+        self.refresh()
+        threading.Thread(target=run, name="process-snapshot", daemon=True).start()
+
+    def stop(self) -> None:
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+
+
+_snapshot: Optional[ProcessSnapshot] = None
+
+
+def get_process_snapshot() -> ProcessSnapshot:
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = ProcessSnapshot()
+    return _snapshot
@@ -1,40 +1,221 @@
+import asyncio
 import json
-import socket
-from typing import Literal
+import time
+from typing import Dict, List, Optional, Tuple
 from livekit.agents import function_tool
+from expression_classifier import normalize_expression
 
 _ADDR = ("127.0.0.1", 8765)
+# A command not acknowledged within this many seconds means the avatar is not running
+_ACK_TIMEOUT = 2.0
+_MAX_STEPS = 8
 
 
 def _normalize(expr: str) -> str:
-    e = expr.strip().lower()
     # Map common phrases to canonical expressions used by desktop_avatar.py
-    if any(k in e for k in ["wink", "winking", "😉", "winky"]):
-        return "wink"
-    if any(k in e for k in ["smile open", "open mouth smile", "big smile", "😀", "😃", "open smile"]):
-        return "smile_open"
-    if any(k in e for k in ["cool", "sunglasses", "😎", "shades"]):
-        return "cool"
-    if any(k in e for k in ["happy", "joy", "joyful", "😊", "😄", "excited", "tears of joy", "awesome"]):
-        return "happy"
-    if any(k in e for k in ["sad", "crying", "😢", "😭", "unhappy", "down"]):
-        return "sad"
-    if any(k in e for k in ["surprised", "shock", "😲", "😮", "amazed", "wow"]):
-        return "surprised"
-    if any(k in e for k in ["angry", "mad", "😠", "😡", "furious", "annoyed"]):
-        return "angry"
-    if any(k in e for k in ["sleepy", "tired", "😴", "yawn", "drowsy"]):
-        return "sleepy"
-    if any(k in e for k in ["thinking", "hmm", "🤔", "pondering", "wondering"]):
-        return "thinking"
-    if any(k in e for k in ["love", "heart", "😍", "❤️", "💕", "adore"]):
-        return "love"
-    if e in {"neutral", "reset", "rest"}:
-        return "neutral"
-    # Fallback: pass through if it matches known ones
-    if e in {"wink", "smile_open", "neutral", "cool", "happy", "sad", "surprised", "angry", "sleepy", "thinking", "love"}:
-        return e
-    return "neutral"
+    return normalize_expression(expr)
+
+
+def encode_sequence(seq: int, steps: "List[Tuple[str, float]]") -> bytes:
+    """
+    Encode a timed expression sequence as one datagram.
+    Wire format (compact JSON): {"s": <seq>, "q": [["happy", 0.5], ["wink", 0.3], ["neutral", 0]]}
+    The avatar plays the steps in order and replies {"ack": <seq>}.
+    """
+    return json.dumps(
+        {"s": seq, "q": [[expr, round(float(dur), 3)] for expr, dur in steps]},
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def parse_sequence(text: str) -> "List[Tuple[str, float]]":
+    """Parse "happy 0.5, wink 0.3 -> neutral" into [(expr, duration), ...]."""
+    steps = []
+    for part in text.replace("→", ",").replace("->", ",").replace(";", ",").split(","):
+        words = part.split()
+        if not words:
+            continue
+        dur = 1.2
+        try:
+            dur = float(words[-1].rstrip("s"))
+            words = words[:-1]
+        except ValueError:
+            pass
+        if words:
+            steps.append((_normalize(" ".join(words)), max(0.0, dur)))
+    return steps[:_MAX_STEPS]
+
+
+class _AvatarProtocol(asyncio.DatagramProtocol):
+    def __init__(self, channel: "AvatarChannel"):
+        self._channel = channel
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        self._channel._on_reply(data)
+
+    def error_received(self, exc: Exception) -> None:
+        # ICMP port unreachable shows up here when nothing listens on the avatar port
+        self._channel._on_refused()
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self._channel._transport = None
+
+
+class AvatarChannel:
+    """
+    Persistent, non-blocking UDP control channel to the desktop avatar.
+
+    The datagram endpoint is created lazily on first use and reused for every command.
+    Each command carries a sequence number that the avatar acknowledges, which lets the
+    agent notice a dead or hung avatar process: liveness is judged by the oldest command
+    still unacknowledged, however long ago it was sent. Until the avatar has acknowledged
+    something, senders can wait briefly for the ack instead of assuming success.
+    """
+
+    def __init__(self, addr: Tuple[str, int] = _ADDR):
+        self._addr = addr
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._seq = 0
+        self._pending: Dict[int, float] = {}
+        self._unacked_since: Optional[float] = None
+        self._waiters: Dict[int, asyncio.Future] = {}
+        self._last_ack = 0.0
+        self._refused_at = 0.0
+        self.rtt: Optional[float] = None
+
+    async def _ensure_transport(self) -> asyncio.DatagramTransport:
+        if self._transport is not None and not self._transport.is_closing():
+            return self._transport
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._transport is None or self._transport.is_closing():
+                loop = asyncio.get_running_loop()
+                self._transport, _ = await loop.create_datagram_endpoint(
+                    lambda: _AvatarProtocol(self), remote_addr=self._addr
+                )
+        return self._transport
+
+    def _next_seq(self) -> int:
+        self._seq = (self._seq + 1) % 65536
+        now = time.monotonic()
+        # Forget commands that will never be acknowledged; _unacked_since still remembers
+        # when the oldest of them was sent
+        for seq, sent_at in list(self._pending.items()):
+            if now - sent_at > _ACK_TIMEOUT * 4:
+                del self._pending[seq]
+        self._pending[self._seq] = now
+        if self._unacked_since is None:
+            self._unacked_since = now
+        return self._seq
+
+    async def _await_reply(self, seq: int, waiter: asyncio.Future, timeout: float):
+        try:
+            return await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self._waiters.pop(seq, None)
+
+    async def send_sequence(self, steps: "List[Tuple[str, float]]", wait: float = 0.0) -> int:
+        """
+        Send a timed expression sequence in one datagram and return its sequence number.
+        With `wait`, also wait up to that many seconds for the avatar to acknowledge it.
+        """
+        transport = await self._ensure_transport()
+        seq = self._next_seq()
+        if wait > 0:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters[seq] = waiter
+        transport.sendto(encode_sequence(seq, steps))
+        if wait > 0:
+            await self._await_reply(seq, waiter, wait)
+        return seq
+
+    async def request_stats(self, timeout: float = 0.5) -> Optional[dict]:
+        """
+        Ask the avatar for its frame counters and CPU usage since the previous request.
+        Returns None if the avatar does not answer within `timeout` seconds.
+        """
+        transport = await self._ensure_transport()
+        seq = self._next_seq()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[seq] = waiter
+        transport.sendto(json.dumps({"s": seq, "cmd": "stats"}, separators=(",", ":")).encode("utf-8"))
+        return await self._await_reply(seq, waiter, timeout)
+
+    async def send_raw(self, message: dict) -> None:
+        """Send an unsequenced message (no acknowledgement expected)."""
+        transport = await self._ensure_transport()
+        transport.sendto(json.dumps(message, separators=(",", ":")).encode("utf-8"))
+
+    def _on_reply(self, data: bytes) -> None:
+        try:
+            reply = json.loads(data.decode("utf-8", errors="ignore"))
+            seq = int(reply["ack"])
+        except Exception:
+            return
+        waiter = self._waiters.get(seq)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(reply.get("stats"))
+        sent_at = self._pending.pop(seq, None)
+        self._last_ack = time.monotonic()
+        self._refused_at = 0.0
+        if sent_at is not None:
+            self.rtt = self._last_ack - sent_at
+            # Anything sent before this command was lost (e.g. while the avatar restarted)
+            self._pending = {s: t for s, t in self._pending.items() if t > sent_at}
+        self._unacked_since = min(self._pending.values(), default=None)
+
+    def _on_refused(self) -> None:
+        self._refused_at = time.monotonic()
+        # Nobody will acknowledge: wake up anyone waiting for a reply
+        for waiter in self._waiters.values():
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def is_alive(self) -> bool:
+        """False if the avatar refused a datagram or left a command unacknowledged for too long."""
+        if self._refused_at and self._refused_at > self._last_ack:
+            return False
+        return self._unacked_since is None or time.monotonic() - self._unacked_since <= _ACK_TIMEOUT
+
+    def is_acknowledged(self, seq: int) -> bool:
+        """True once the avatar has acknowledged command `seq` (or a later one)."""
+        return seq not in self._pending
+
+    def is_confirmed(self) -> bool:
+        """True if the avatar has acknowledged a command and is still alive."""
+        return self._last_ack > 0 and self.is_alive()
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+
+_channel: Optional[AvatarChannel] = None
+
+
+def get_avatar_channel() -> AvatarChannel:
+    global _channel
+    if _channel is None:
+        _channel = AvatarChannel()
+    return _channel
+
+
+async def _send(steps: "List[Tuple[str, float]]") -> Optional[str]:
+    channel = get_avatar_channel()
+    # An avatar that has not answered yet (first contact, or overdue) must acknowledge this one
+    wait = 0.0 if channel.is_confirmed() else _ACK_TIMEOUT
+    try:
+        seq = await channel.send_sequence(steps, wait=wait)
+    except Exception as e:
+        return f"failed: {e}"
+    if not channel.is_alive() or (wait and not channel.is_acknowledged(seq)):
+        return "failed: avatar is not responding"
+    return None
 
 
 @function_tool()
@@ -45,10 +226,22 @@ async def set_avatar_expression(expr: str, duration: float = 1.2) -> str:
     The avatar app must be running: python -m avatar.desktop_avatar
     """
     canon = _normalize(expr)
-    payload = json.dumps({"expr": canon, "duration": float(duration)}).encode("utf-8")
-    try:
-        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
-            s.sendto(payload, _ADDR)
-    except Exception as e:
-        return f"failed: {e}"
+    error = await _send([(canon, float(duration))])
+    if error:
+        return error
     return f"ok: {canon} for {duration:.2f}s"
+
+
+@function_tool()
+async def set_avatar_expression_sequence(sequence: str) -> str:
+    """
+    Play several expressions on the desktop avatar one after another.
+    sequence: comma separated "expression seconds" steps, e.g. "happy 0.5, wink 0.3, neutral"
+    """
+    steps = parse_sequence(sequence)
+    if not steps:
+        return "failed: no expressions given"
+    error = await _send(steps)
+    if error:
+        return error
+    return "ok: " + " -> ".join(f"{expr} {dur:.1f}s" for expr, dur in steps)
@@ -0,0 +1,90 @@
+"""
+Test close_process_trees on trees of dummy Python processes: every process of every tree is
+closed, a process that ignores SIGTERM is killed once the shared deadline passes, and the
+whole close takes one deadline rather than one per process.
+Run: python test_app_closer.py   (or: python -m pytest test_app_closer.py)
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import psutil
+
+from app_closer import close_process_trees
+
+# Each process starts `depth` levels of children below it (two per level), then sleeps
+TREE = """
+import subprocess, sys, time
+depth = int(sys.argv[1])
+kids = [subprocess.Popen([sys.executable, __file__, str(depth - 1)]) for _ in range(2 if depth else 0)]
+time.sleep(60)
+"""
+STUBBORN = "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); time.sleep(60)"
+
+
+def _alive(pid):
+    try:
+        return psutil.Process(pid).status() != psutil.STATUS_ZOMBIE
+    except psutil.NoSuchProcess:
+        return False
+
+
+def test_closes_whole_trees_with_one_deadline():
+    folder = tempfile.mkdtemp()
+    script = os.path.join(folder, "tree.py")
+    with open(script, "w") as f:
+        f.write(TREE)
+    app = os.path.join(folder, "ramx-tree-app")
+    os.symlink(sys.executable, app)
+
+    roots = [subprocess.Popen([app, script, "2"]) for _ in range(2)]
+    stubborn = subprocess.Popen([sys.executable, "-c", STUBBORN])
+    expected = 2 * (1 + 2 + 4) + 1
+    try:
+        deadline = time.time() + 20
+        while sum(len(psutil.Process(r.pid).children(recursive=True)) for r in roots) < 12:
+            assert time.time() < deadline, "dummy process trees did not start"
+            time.sleep(0.05)
+        time.sleep(0.3)  # let the stubborn process install its handler
+        pids = [r.pid for r in roots] + [stubborn.pid]
+        tree_pids = set(pids)
+        for r in roots:
+            tree_pids.update(c.pid for c in psutil.Process(r.pid).children(recursive=True))
+
+        report = close_process_trees(pids, timeout=1.0, kill_timeout=1.0)
+        print(f"{report.summary()} in {report.elapsed:.2f}s")
+        for outcome in report.outcomes:
+            print(f"  {outcome}")
+
+        assert {o.pid for o in report.outcomes} == tree_pids and len(tree_pids) == expected
+        by_pid = {o.pid: o.outcome for o in report.outcomes}
+        assert by_pid[stubborn.pid] == "killed"
+        assert all(by_pid[pid] == "terminated" for pid in tree_pids - {stubborn.pid})
+        assert not report.failed and len(report.closed) == expected
+        # One shared grace period plus the kill wait, not a wait per process
+        assert 1.0 <= report.elapsed < 3.0
+        assert not any(_alive(pid) for pid in tree_pids)
+    finally:
+        for proc in roots + [stubborn]:
+            proc.kill()
+            proc.wait()
+
+
+def test_missing_pid_is_reported():
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    report = close_process_trees([proc.pid], timeout=0.5)
+    assert [o.outcome for o in report.outcomes] == ["already gone"]
+    assert report.summary() == "1 already gone"
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("APP CLOSER TEST")
+    print("=" * 60)
+    test_closes_whole_trees_with_one_deadline()
+    print("✅ test_closes_whole_trees_with_one_deadline")
+    test_missing_pid_is_reported()
+    print("✅ test_missing_pid_is_reported")
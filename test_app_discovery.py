@@ -0,0 +1,133 @@
+"""
+Test AppIndex on throwaway XDG and $PATH directories: .desktop launchers and executables are
+indexed with name, Exec line and icon, the index persists across instances, refreshes only
+rescan changed directories, and launch_argv turns the Exec line into a command that
+launch_and_verify starts without a shell or keyboard.
+Run: python test_app_discovery.py   (or: python -m pytest test_app_discovery.py)
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import app_discovery
+from app_discovery import AppIndex, command_key, exec_argv, launch_argv, parse_desktop_file
+from app_launcher import launch_and_verify
+
+
+def _write(path, text, mode=0o644):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+    os.chmod(path, mode)
+
+
+def _desktop(name, exec_line, icon="", extra=""):
+    return f"[Desktop Entry]\nType=Application\nName={name}\nExec={exec_line}\nIcon={icon}\n{extra}\n" \
+           f"[Desktop Action new-window]\nName=New Window\nExec=ignored\n"
+
+
+def _tree():
+    root = tempfile.mkdtemp()
+    user_apps = os.path.join(root, "home", "applications")
+    system_apps = os.path.join(root, "usr", "applications")
+    bin_dir = os.path.join(root, "bin")
+    _write(os.path.join(system_apps, "code.desktop"), _desktop("Visual Studio Code", "/usr/share/code/code %F", "vscode"))
+    _write(os.path.join(system_apps, "firefox.desktop"), _desktop("Firefox", "firefox %u", "firefox"))
+    _write(os.path.join(system_apps, "htop.desktop"), _desktop("Htop", "htop", extra="Terminal=true"))
+    _write(os.path.join(system_apps, "kde4", "kcalc.desktop"), _desktop("KCalc", "kcalc"))
+    # The user's copy of firefox.desktop overrides the system one
+    _write(os.path.join(user_apps, "firefox.desktop"), _desktop("Firefox (custom)", "firefox --private-window %u"))
+    _write(os.path.join(bin_dir, "telegram-desktop"), "#!/bin/sh\n", 0o755)
+    _write(os.path.join(bin_dir, "README"), "not executable\n")
+    index = AppIndex(os.path.join(root, "index.json"), [user_apps, system_apps], [bin_dir], check_interval=0)
+    return root, index
+
+
+def test_parsing_helpers():
+    root, _ = _tree()
+    app = parse_desktop_file(os.path.join(root, "usr", "applications", "code.desktop"))
+    assert (app.name, app.exec, app.icon, app.kind) == ("Visual Studio Code", "/usr/share/code/code %F", "vscode", "desktop")
+    assert parse_desktop_file(os.path.join(root, "usr", "applications", "htop.desktop")) is None
+    assert exec_argv('env FOO="a b" /opt/app --flag %U 100%%') == ["env", "FOO=a b", "/opt/app", "--flag", "100%"]
+
+
+def test_index_lookup_and_precedence():
+    _, index = _tree()
+    assert index.lookup("visual studio code").icon == "vscode"
+    assert index.lookup("code").name == "Visual Studio Code"
+    assert index.lookup("kcalc").name == "KCalc"
+    assert index.lookup("firefox").name == "Firefox (custom)"
+    assert index.lookup("telegram-desktop").kind == "path"
+    assert index.lookup("readme") is None and index.lookup("htop") is None
+    assert sorted(a.name for a in index.apps("desktop")) == ["Firefox (custom)", "KCalc", "Visual Studio Code"]
+
+
+def test_windows_executables_by_bare_name():
+    assert command_key("Notepad.EXE", [".exe", ".cmd"]) == "notepad"
+    assert command_key("notepad.exe", []) == "notepad.exe"  # no PATHEXT outside Windows
+    # As on Windows: PATHEXT suffixes are left out of the keys, so "notepad" finds Notepad.exe
+    root = tempfile.mkdtemp()
+    bin_dir = os.path.join(root, "bin")
+    for name in ("Notepad.exe", "build.CMD", "tool.py"):
+        _write(os.path.join(bin_dir, name), "", 0o755)
+    saved = app_discovery._pathext
+    app_discovery._pathext = lambda: [".exe", ".bat", ".cmd"]
+    try:
+        index = AppIndex(os.path.join(root, "index.json"), [], [bin_dir], check_interval=0)
+        assert index.lookup("notepad").name == "Notepad.exe"
+        assert index.lookup("NOTEPAD.exe").name == "Notepad.exe"
+        assert index.lookup("build").name == "build.CMD"
+        assert index.lookup("tool.py").name == "tool.py" and index.lookup("tool") is None
+    finally:
+        app_discovery._pathext = saved
+
+
+def test_persistent_and_incremental():
+    root, index = _tree()
+    index.apps()
+    first_scan = index.rescanned_dirs
+    assert first_scan == 4  # user apps, system apps, kde4, bin
+
+    # A new instance reads the saved index instead of parsing everything again
+    again = AppIndex(index.index_path, index.app_dirs, index.bin_dirs, check_interval=0)
+    assert again.lookup("kcalc").name == "KCalc"
+    assert again.rescanned_dirs == 0
+
+    # Installing an app only rescans the directory it landed in
+    time.sleep(0.01)
+    _write(os.path.join(root, "usr", "applications", "gimp.desktop"), _desktop("GNU Image Manipulation Program", "gimp-2.10 %U"))
+    version = again.version
+    assert again.lookup("gimp-2.10").name == "GNU Image Manipulation Program"
+    assert again.rescanned_dirs == 1
+    assert again.version == version + 1
+
+    os.remove(os.path.join(root, "bin", "telegram-desktop"))
+    assert again.lookup("telegram-desktop") is None
+    assert again.rescanned_dirs == 2
+
+
+def test_launch_app():
+    root, index = _tree()
+    marker = os.path.join(root, "launched")
+    script = os.path.join(root, "bin", "make-marker")
+    _write(script, f"#!{sys.executable}\nopen({marker!r}, 'w').write('ok')\n", 0o755)
+    _write(os.path.join(root, "usr", "applications", "marker.desktop"), _desktop("Marker", f"{script} %f"))
+    argv = launch_argv(index.lookup("marker"))
+    assert argv == [script]  # field codes dropped
+    # The script writes the marker and exits 0, like a launcher handing off to the real app
+    result = asyncio.run(launch_and_verify(argv, settle=10))
+    assert result.ok and result.detail == "handed off"
+    with open(marker) as f:
+        assert f.read() == "ok"
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("APP DISCOVERY TEST")
+    print("=" * 60)
+    for test in (test_parsing_helpers, test_index_lookup_and_precedence, test_windows_executables_by_bare_name,
+                 test_persistent_and_incremental, test_launch_app):
+        test()
+        print(f"✅ {test.__name__}")
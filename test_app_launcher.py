@@ -0,0 +1,96 @@
+"""
+Test launch_and_verify with dummy Python "apps": a long-running process is confirmed after
+the settle time, a failing one is reported with its exit code, a launcher that hands off to
+another process is confirmed by the new PID, and the event loop keeps ticking throughout.
+Run: python test_app_launcher.py   (or: python -m pytest test_app_launcher.py)
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import psutil
+
+import app_launcher
+from app_launcher import SETTLE_TIME, launch_and_verify
+
+
+async def _max_loop_lag(coro):
+    """Run `coro` while measuring the longest gap between 10 ms ticks of the event loop."""
+    lag = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal lag
+        while not done:
+            before = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lag = max(lag, time.perf_counter() - before - 0.01)
+
+    tick = asyncio.create_task(ticker())
+    try:
+        return await coro, lag
+    finally:
+        done = True
+        await tick
+
+
+def _kill(pid):
+    try:
+        psutil.Process(pid).kill()
+    except psutil.Error:
+        pass
+
+
+def test_running_and_failing_apps():
+    async def scenario():
+        running, lag = await _max_loop_lag(
+            launch_and_verify([sys.executable, "-c", "import time; time.sleep(30)"]))
+        failed = await launch_and_verify([sys.executable, "-c", "raise SystemExit(3)"])
+        missing = await launch_and_verify(["/nonexistent/ramx-app"])
+        assert len(app_launcher._reapers) == 1  # the running app's reaper is held until it exits
+        _kill(running.pid)
+        await asyncio.sleep(0.2)  # let the launcher reap it
+        assert not app_launcher._reapers
+        return running, lag, failed, missing
+
+    running, lag, failed, missing = asyncio.run(scenario())
+    print(f"running: {running}, loop lag {lag * 1000:.1f} ms")
+    assert running.ok and running.detail == "running" and running.pid
+    assert SETTLE_TIME <= running.latency < SETTLE_TIME + 1.0
+    assert lag < 0.1
+    assert not failed.ok and failed.detail == "exited with code 3"
+    assert not missing.ok and missing.detail.startswith("failed to start")
+
+
+def test_handed_off_launch_is_confirmed_by_new_pid():
+    # A symlink gives the dummy app its own process name
+    app = os.path.join(tempfile.mkdtemp(), "ramx-dummy-app")
+    os.symlink(sys.executable, app)
+    launcher = (f"import subprocess, time; time.sleep(0.05); "
+                f"subprocess.Popen([{app!r}, '-c', 'import time; time.sleep(30)'], start_new_session=True)")
+
+    async def scenario():
+        handed_off = await launch_and_verify([sys.executable, "-c", launcher], ["ramx-dummy-app"])
+        again = await launch_and_verify([sys.executable, "-c", "pass"], ["ramx-dummy-app"])
+        missing = await launch_and_verify([sys.executable, "-c", "pass"], ["ramx-never-started"], deadline=0.3)
+        return handed_off, again, missing
+
+    handed_off, again, missing = asyncio.run(scenario())
+    print(f"handed off: {handed_off}")
+    assert handed_off.ok and handed_off.detail == "running"
+    assert psutil.Process(handed_off.pid).name() == "ramx-dummy-app"
+    assert again.ok and again.detail == "already running" and again.pid == handed_off.pid
+    _kill(handed_off.pid)
+    assert not missing.ok and 0.3 <= missing.latency < 1.0
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("APP LAUNCHER TEST")
+    print("=" * 60)
+    test_running_and_failing_apps()
+    print("✅ test_running_and_failing_apps")
+    test_handed_off_launch_is_confirmed_by_new_pid()
+    print("✅ test_handed_off_launch_is_confirmed_by_new_pid")
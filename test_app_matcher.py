@@ -0,0 +1,70 @@
+"""
+Test AppMatcher: spoken variants resolve to the right app, unknown or ambiguous names stay
+below the confidence threshold, and the bit-parallel edit distance agrees with the plain DP.
+Run: python test_app_matcher.py   (or: python -m pytest test_app_matcher.py)
+"""
+import random
+
+from app_matcher import AppCandidate, AppMatcher, edit_distance, name_tokens
+
+
+def _matcher() -> AppMatcher:
+    matcher = AppMatcher()
+    for name in ("VLC Media Player", "Web Whatsapp"):
+        matcher.add(name, AppCandidate(name, name.lower(), "registry"))
+    for alias, display in (("chrome", "Google Chrome"), ("notepad++", "Notepad++"), ("notepad", "Notepad"),
+                           ("vs code", "Visual Studio Code"), ("microsoft word", "Word"),
+                           ("microsoft edge", "Microsoft Edge")):
+        candidate = AppCandidate(display, display.lower(), "builtin")
+        matcher.add(display, candidate)
+        matcher.add(alias, candidate)
+    return matcher
+
+
+def test_spoken_variants():
+    matcher = _matcher()
+    assert name_tokens("the Notepad++ app") == ["notepad", "plus", "plus"]
+    for spoken, expected in (("Chrome browser", "Google Chrome"), ("google crome", "Google Chrome"),
+                             ("note pad", "Notepad"), ("notepad plus plus", "Notepad++"),
+                             ("vscode", "Visual Studio Code"), ("word", "Word"), ("vlc", "VLC Media Player"),
+                             ("whatsapp web", "Web Whatsapp")):
+        match = matcher.best(spoken)
+        assert match is not None and match.candidate.name == expected, (spoken, match)
+    assert matcher.best("note pad").score == 1.0
+    assert matcher.best("google crome").score < 1.0
+
+
+def test_low_confidence_names_are_not_matched():
+    matcher = _matcher()
+    for spoken in ("photoshop", "blender", "microsoft", "x"):
+        assert matcher.best(spoken) is None, spoken
+    ranked = matcher.match("notepad plus", limit=3)
+    assert {m.candidate.name for m in ranked[:2]} == {"Notepad", "Notepad++"}
+
+
+def test_edit_distance_matches_reference():
+    def reference(a, b):
+        previous = list(range(len(b) + 1))
+        for i, ca in enumerate(a, 1):
+            current = [i]
+            for j, cb in enumerate(b, 1):
+                current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+            previous = current
+        return previous[-1]
+
+    rnd = random.Random(5)
+    for _ in range(5000):
+        a = "".join(rnd.choice("abcd") for _ in range(rnd.randint(0, 12)))
+        b = "".join(rnd.choice("abcd") for _ in range(rnd.randint(0, 12)))
+        limit = rnd.randint(0, 12)
+        expected = reference(a, b)
+        assert edit_distance(a, b, limit) == (expected if expected <= limit else limit + 1)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("APP MATCHER TEST")
+    print("=" * 60)
+    for test in (test_spoken_variants, test_low_confidence_names_are_not_matched, test_edit_distance_matches_reference):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,113 @@
+"""
+Test AppRegistry on a throwaway copy of the old Ramx.db layout: legacy *_commmand tables are
+migrated, names are unique after normalization, lookups come from memory, and writes by
+other connections (or a replaced database file) are picked up.
+Run: python test_app_registry.py   (or: python -m pytest test_app_registry.py)
+"""
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from app_registry import AppRegistry
+
+
+def _legacy_db() -> str:
+    path = os.path.join(tempfile.mkdtemp(), "Ramx.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE sys_commmand(id INTEGER PRIMARY KEY, name varchar(255),path varchar(255))")
+    conn.execute("CREATE TABLE web_commmand(id INTEGER PRIMARY KEY, name varchar(255),url Varchar(255))")
+    conn.execute("INSERT INTO sys_commmand VALUES (null, 'Canva', 'C:\\Canva\\Canva.exe')")
+    conn.execute("INSERT INTO sys_commmand VALUES (null, 'Chrome', 'C:\\Chrome\\chrome.exe')")
+    conn.execute("INSERT INTO web_commmand VALUES (null, 'Web Whatsapp', 'https://web.whatsapp.com/')")
+    conn.execute("INSERT INTO web_commmand VALUES (null, 'Web Whatsapp', 'https://web.whatsapp.com/')")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_migration_and_lookup():
+    path = _legacy_db()
+    registry = AppRegistry(path)
+    assert registry.lookup("  web   WHATSAPP ").target == "https://web.whatsapp.com/"
+    assert registry.lookup("chrome").kind == "sys"
+    assert registry.lookup("paint") is None
+    assert len(registry.entries()) == 3
+
+    conn = sqlite3.connect(path)
+    tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert tables == {"sys_command", "web_command"}
+    try:
+        conn.execute("INSERT INTO sys_command(name, path, key) VALUES ('CHROME', 'x', 'chrome')")
+    except sqlite3.IntegrityError:
+        pass
+    else:
+        raise AssertionError("duplicate normalized name was accepted")
+    conn.close()
+    registry.close()
+
+
+def test_rows_without_names_are_skipped():
+    path = os.path.join(tempfile.mkdtemp(), "Ramx.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE sys_commmand(id INTEGER PRIMARY KEY, name varchar(255),path varchar(255))")
+    conn.execute("INSERT INTO sys_commmand VALUES (null, null, 'C:\\orphan.exe')")
+    conn.execute("INSERT INTO sys_commmand VALUES (null, 'Paint', null)")
+    conn.execute("INSERT INTO sys_commmand VALUES (null, 7, 'C:\\seven.exe')")
+    conn.execute("INSERT INTO sys_commmand VALUES (null, 'Notepad', 'C:\\notepad.exe')")
+    # A web_command table made before the NOT NULL constraint existed
+    conn.execute("CREATE TABLE web_command(id INTEGER PRIMARY KEY, name varchar(255), url varchar(255))")
+    conn.execute("INSERT INTO web_command VALUES (null, null, 'https://nameless.example/')")
+    conn.execute("INSERT INTO web_command VALUES (null, 'Gmail', 'https://mail.google.com/')")
+    conn.commit()
+    conn.close()
+
+    registry = AppRegistry(path)
+    assert sorted(e.name for e in registry.entries()) == ["7", "Gmail", "Notepad"]
+    assert registry.lookup("notepad").target == "C:\\notepad.exe"
+    assert registry.lookup("paint") is None
+    registry.close()
+
+
+def test_lookups_are_served_from_memory():
+    registry = AppRegistry(_legacy_db(), check_interval=60)
+    registry.lookup("canva")
+    registry._conn.close()  # any database access now raises
+    for _ in range(1000):
+        assert registry.lookup("Canva").name == "Canva"
+    assert registry.reloads == 1
+
+
+def test_external_changes_are_picked_up():
+    path = _legacy_db()
+    registry = AppRegistry(path, check_interval=0)
+    assert registry.lookup("spotify") is None
+
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO sys_command(name, path, key) VALUES (?, ?, ?)", ("Spotify", "C:\\Spotify.exe", "spotify"))
+    conn.commit()
+    conn.close()
+    assert registry.lookup("Spotify").target == "C:\\Spotify.exe"
+
+    # Replace the whole file, as restoring a backup would
+    other = _legacy_db()
+    AppRegistry(other).add("Notion", "https://notion.so", kind="web")
+    shutil.copy(other, path + ".new")
+    os.replace(path + ".new", path)
+    assert registry.lookup("notion").target == "https://notion.so"
+    assert registry.lookup("spotify") is None
+
+    registry.add("Spotify", "C:\\Spotify.exe")
+    assert registry.remove("spotify")
+    assert registry.lookup("spotify") is None
+    registry.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("APP REGISTRY TEST")
+    print("=" * 60)
+    for test in (test_migration_and_lookup, test_rows_without_names_are_skipped, test_lookups_are_served_from_memory,
+                 test_external_changes_are_picked_up):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,166 @@
+"""
+Test the avatar's lip-sync level sources headless: WavReplayLevelSource replays a WAV file's
+peak envelope in real time, PushedLevelSource plays queued levels out against the wall clock,
+make_audio_source picks a source from its spec, and LipSyncAudioOutput passes TTS frames on
+while batching their levels onto the avatar channel.
+Run: python test_avatar_audio.py   (or: python -m pytest test_avatar_audio.py)
+"""
+import asyncio
+import os
+import tempfile
+import time
+import wave
+
+import numpy as np
+from livekit import rtc
+from livekit.agents.voice import io
+
+from avatar import desktop_avatar
+from avatar.desktop_avatar import PushedLevelSource, WavReplayLevelSource, make_audio_source
+from avatar_lipsync import _LEVELS_PER_PACKET, LipSyncAudioOutput
+
+RATE = 16000
+
+
+def _wav(samples, rate=RATE):
+    path = os.path.join(tempfile.mkdtemp(), "voice.wav")
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(np.asarray(samples, dtype="<i2").tobytes())
+    return path
+
+
+def test_wav_replay_level_source():
+    # 0.5 s of silence, then 0.5 s at half scale, in 0.25 s windows
+    path = _wav(np.concatenate([np.zeros(RATE // 2), np.full(RATE // 2, 16384)]))
+    source = WavReplayLevelSource(path, window=0.25)
+    assert source.available and source.polled and not source.shaped
+    assert source.busy()  # not started yet
+    assert source.get_peak() == 0.0
+    time.sleep(0.6)
+    assert source.get_peak() == 0.5
+    time.sleep(0.6)
+    assert source.get_peak() == 0.0 and not source.busy()
+
+    looped = WavReplayLevelSource(path, window=0.25, loop=True)
+    looped.get_peak()
+    time.sleep(1.1)
+    assert looped.busy() and looped.get_peak() == 0.0  # back at the silent start
+
+    with wave.open(path, "rb") as src, wave.open(path + ".8bit", "wb") as dst:
+        dst.setparams(src.getparams()._replace(sampwidth=1))
+        dst.writeframes(b"\x80" * 10)
+    try:
+        WavReplayLevelSource(path + ".8bit")
+        raise AssertionError("8-bit WAV files should be rejected")
+    except ValueError:
+        pass
+
+
+def test_pushed_level_source():
+    source = PushedLevelSource()
+    assert source.available and not source.polled and not source.busy()
+    assert source.get_peak() == 0.0
+    source.push([0.2, 1.5, -1], duration=0.2, shaped=True)
+    assert source.busy() and source.shaped
+    assert source.get_peak() == 0.2
+    assert source.get_peak() == 0.2  # each level lasts its duration, not one call
+    time.sleep(0.3)
+    assert source.get_peak() == 1.0  # clamped
+    time.sleep(0.4)
+    assert source.get_peak() == 0.0 and not source.busy()
+
+    # New speech is queued behind the level still playing (the clamped 0.0), then cleared midway
+    source.push([0.7] * 10, duration=0.05)
+    time.sleep(0.25)
+    assert source.get_peak() == 0.7 and source.busy()
+    source.clear()
+    assert source.get_peak() == 0.0 and not source.busy()
+
+
+def test_make_audio_source():
+    path = _wav(np.zeros(RATE // 10))
+    assert isinstance(make_audio_source("push"), PushedLevelSource)
+    assert isinstance(make_audio_source(f"wav:{path}"), WavReplayLevelSource)
+    saved = os.environ.pop("RAMX_AVATAR_AUDIO", None), desktop_avatar.AudioUtilities
+    try:
+        desktop_avatar.AudioUtilities = None  # pycaw missing, as off Windows
+        assert isinstance(make_audio_source(), PushedLevelSource)
+        os.environ["RAMX_AVATAR_AUDIO"] = f"wav:{path}"
+        assert isinstance(make_audio_source(), WavReplayLevelSource)
+    finally:
+        os.environ.pop("RAMX_AVATAR_AUDIO", None)
+        if saved[0] is not None:
+            os.environ["RAMX_AVATAR_AUDIO"] = saved[0]
+        desktop_avatar.AudioUtilities = saved[1]
+
+
+class RecordingSink(io.AudioOutput):
+    def __init__(self):
+        super().__init__(label="sink", capabilities=io.AudioOutputCapabilities(pause=True), sample_rate=RATE)
+        self.frames = []
+        self.flushes = 0
+        self.cleared = 0
+
+    async def capture_frame(self, frame):
+        await super().capture_frame(frame)
+        self.frames.append(frame)
+
+    def flush(self):
+        super().flush()
+        self.flushes += 1
+
+    def clear_buffer(self):
+        self.cleared += 1
+
+
+class RecordingChannel:
+    def __init__(self):
+        self.messages = []
+
+    async def send_raw(self, message):
+        self.messages.append(message)
+
+
+def _frame(level, ms=10):
+    samples = RATE * ms // 1000
+    return rtc.AudioFrame(np.full(samples, int(level * 32767), dtype=np.int16).tobytes(), RATE, 1, samples)
+
+
+def test_lipsync_output_batches_levels():
+    async def scenario():
+        sink, channel = RecordingSink(), RecordingChannel()
+        output = LipSyncAudioOutput(sink, channel)
+        frames = [_frame(0.5) for _ in range(20)]  # 200 ms of speech = 12 windows of 16 ms
+        for frame in frames:
+            await output.capture_frame(frame)
+        assert sink.frames == frames  # every frame still reaches the room
+        assert len(channel.messages) == 2
+        for message in channel.messages:
+            assert message["d"] == 0.016 and len(message["lx"]) == 2 * _LEVELS_PER_PACKET
+        levels = [b / 255 for m in channel.messages for b in bytes.fromhex(m["lx"])]
+        assert levels == sorted(levels) and levels[-1] > 0.5  # the envelope rises toward the peak
+
+        # The tail goes out on flush; an interruption tells the avatar to drop queued levels
+        await output.capture_frame(_frame(0.5, ms=40))
+        output.flush()
+        await asyncio.sleep(0.01)
+        assert sink.flushes == 1 and len(channel.messages) == 3
+        assert 0 < len(channel.messages[2]["lx"]) < 2 * _LEVELS_PER_PACKET
+        output.clear_buffer()
+        await asyncio.sleep(0.01)
+        assert sink.cleared == 1 and channel.messages[-1] == {"cmd": "clear_levels"}
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("AVATAR AUDIO TEST")
+    print("=" * 60)
+    for test in (test_wav_replay_level_source, test_pushed_level_source, test_make_audio_source,
+                 test_lipsync_output_batches_levels):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,199 @@
+"""
+Test the agent <-> desktop avatar UDP protocol without a window: sequences survive
+encode_sequence -> decode_command, parse_sequence reads spoken step lists, and AvatarChannel
+tracks acknowledgements, liveness and stats replies against a local UDP "avatar" that answers
+the way AvatarWidget._on_udp does.
+Run: python test_avatar_channel.py   (or: python -m pytest test_avatar_channel.py)
+"""
+import asyncio
+import json
+import socket
+import time
+
+import set_avatar_expression
+from avatar.desktop_avatar import decode_command
+from set_avatar_expression import AvatarChannel, encode_sequence, parse_sequence
+
+STATS = {"ticks": 10, "frames": 4, "fps": 4.0, "cpu_percent": 0.5, "interval_ms": 0, "window_s": 1.0}
+
+
+class FakeAvatar(asyncio.DatagramProtocol):
+    """Decodes commands like the avatar and acknowledges sequenced ones (unless `silent`)."""
+
+    def __init__(self, silent=False):
+        self.silent = silent
+        self.commands = []
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        seq, steps, cmd = decode_command(json.loads(data.decode("utf-8")))
+        self.commands.append((seq, steps, cmd))
+        if seq is not None and not self.silent:
+            reply = {"ack": seq}
+            if cmd == "stats":
+                reply["stats"] = STATS
+            self.transport.sendto(json.dumps(reply).encode("utf-8"), addr)
+
+
+async def _start_avatar(silent=False):
+    transport, avatar = await asyncio.get_running_loop().create_datagram_endpoint(
+        lambda: FakeAvatar(silent), local_addr=("127.0.0.1", 0))
+    return transport, avatar, transport.get_extra_info("sockname")
+
+
+async def _settle():
+    for _ in range(20):
+        await asyncio.sleep(0.01)
+
+
+def test_encode_decode_round_trip():
+    steps = parse_sequence("happy 0.5, wink 0.3s -> neutral")
+    assert steps == [("happy", 0.5), ("wink", 0.3), ("neutral", 1.2)]
+    assert decode_command(json.loads(encode_sequence(7, steps))) == (7, steps, None)
+    assert len(parse_sequence(", ".join(["sad 0.1"] * 20))) == 8
+    assert parse_sequence(" , ,") == []
+
+    # Unknown expressions are dropped; legacy and command datagrams still decode
+    assert decode_command({"s": 1, "q": [["dance", 1], ["SAD", 0.2]]}) == (1, [("sad", 0.2)], None)
+    assert decode_command({"expr": "happy", "duration": 2}) == (None, [("happy", 2.0)], None)
+    assert decode_command({"s": 3, "cmd": "stats"}) == (3, [], "stats")
+
+
+def test_acks_and_stats():
+    async def scenario():
+        transport, avatar, addr = await _start_avatar()
+        channel = AvatarChannel(addr)
+        try:
+            seq = await channel.send_sequence([("happy", 0.5), ("neutral", 0)])
+            await _settle()
+            assert avatar.commands == [(seq, [("happy", 0.5), ("neutral", 0.0)], None)]
+            assert channel.is_alive() and not channel._pending and channel.rtt is not None
+
+            assert await channel.request_stats(timeout=1.0) == STATS
+            # Unsequenced messages (lip-sync levels) are not acknowledged and do not count as pending
+            await channel.send_raw({"lx": "00ff", "d": 0.016})
+            await _settle()
+            assert avatar.commands[-1] == (None, [], None) and channel.is_alive()
+        finally:
+            channel.close()
+            transport.close()
+
+    asyncio.run(scenario())
+
+
+def test_dead_or_silent_avatar():
+    async def scenario():
+        # Nothing listens on this port: the refusal marks the avatar as not alive
+        probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+        probe.close()
+        channel = AvatarChannel(("127.0.0.1", port))
+        await channel.send_sequence([("sad", 1.0)])
+        await _settle()
+        assert not channel.is_alive()
+        channel.close()
+
+        # A listener that never acknowledges is dead once the ack timeout passes
+        transport, avatar, addr = await _start_avatar(silent=True)
+        channel = AvatarChannel(addr)
+        timeout = set_avatar_expression._ACK_TIMEOUT
+        set_avatar_expression._ACK_TIMEOUT = 0.05
+        try:
+            await channel.send_sequence([("wink", 0.3)])
+            assert channel.is_alive()  # not overdue yet
+            assert await channel.request_stats(timeout=0.1) is None
+            assert len(avatar.commands) == 2 and not channel.is_alive()
+
+            # An acknowledgement of a later command clears the older, lost ones
+            avatar.silent = False
+            await channel.send_sequence([("happy", 0.2)])
+            await _settle()
+            assert channel.is_alive() and not channel._pending
+        finally:
+            set_avatar_expression._ACK_TIMEOUT = timeout
+            channel.close()
+            transport.close()
+
+    asyncio.run(scenario())
+
+
+class FakeClock:
+    """Stands in for the `time` module in set_avatar_expression, so minutes pass instantly."""
+
+    def __init__(self):
+        self.now = time.monotonic()
+
+    def monotonic(self):
+        return self.now
+
+
+def test_hung_avatar_between_sparse_commands():
+    async def scenario():
+        transport, avatar, addr = await _start_avatar()
+        channel = AvatarChannel(addr)
+        clock = FakeClock()
+        saved = set_avatar_expression.time, set_avatar_expression._ACK_TIMEOUT, set_avatar_expression._channel
+        set_avatar_expression.time = clock
+        set_avatar_expression._ACK_TIMEOUT = 0.2
+        set_avatar_expression._channel = channel
+        try:
+            assert await set_avatar_expression._send([("happy", 0.5)]) is None  # first contact is acknowledged
+            assert channel.is_confirmed()
+
+            # The avatar hangs; tool calls come 10 s apart, longer than the pending entries are kept
+            avatar.silent = True
+            clock.now += 10
+            assert await set_avatar_expression._send([("wink", 0.3)]) is None  # not overdue yet
+            clock.now += 10
+            assert await set_avatar_expression._send([("sad", 1.0)]) == "failed: avatar is not responding"
+            assert not channel.is_alive()
+
+            # Once it answers again, the next command succeeds
+            avatar.silent = False
+            clock.now += 10
+            assert await set_avatar_expression._send([("happy", 0.5)]) is None
+            assert channel.is_alive() and channel.is_confirmed()
+        finally:
+            set_avatar_expression.time, set_avatar_expression._ACK_TIMEOUT, set_avatar_expression._channel = saved
+            channel.close()
+            transport.close()
+
+    asyncio.run(scenario())
+
+
+def test_first_send_to_silent_avatar_fails():
+    async def scenario():
+        transport, avatar, addr = await _start_avatar(silent=True)
+        channel = AvatarChannel(addr)
+        saved = set_avatar_expression._ACK_TIMEOUT, set_avatar_expression._channel
+        set_avatar_expression._ACK_TIMEOUT = 0.1
+        set_avatar_expression._channel = channel
+        try:
+            assert await set_avatar_expression._send([("sad", 1.0)]) == "failed: avatar is not responding"
+            assert len(avatar.commands) == 1
+        finally:
+            set_avatar_expression._ACK_TIMEOUT, set_avatar_expression._channel = saved
+            channel.close()
+            transport.close()
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("AVATAR CHANNEL TEST")
+    print("=" * 60)
+    test_encode_decode_round_trip()
+    print("✅ test_encode_decode_round_trip")
+    test_acks_and_stats()
+    print("✅ test_acks_and_stats")
+    test_dead_or_silent_avatar()
+    print("✅ test_dead_or_silent_avatar")
+    test_hung_avatar_between_sparse_commands()
+    print("✅ test_hung_avatar_between_sparse_commands")
+    test_first_send_to_silent_avatar_fails()
+    print("✅ test_first_send_to_silent_avatar_fails")
@@ -0,0 +1,134 @@
+"""
+Test the desktop avatar's adaptive frame scheduling offscreen (no display needed): the timer
+stops when nothing can change, polls slowly with an idle polled meter, and wakes to full rate
+on set_expression or on lip-sync levels pushed over UDP. Also checks _visual_state and the
+cached _static_layer pixmaps.
+Run: python test_avatar_scheduler.py   (or: python -m pytest test_avatar_scheduler.py)
+"""
+import json
+import os
+import socket
+import tempfile
+import time
+import wave
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtNetwork import QHostAddress
+from PySide6.QtWidgets import QApplication
+
+from avatar.desktop_avatar import (ACTIVE_INTERVAL_MS, IDLE_INTERVAL_MS, LEVEL_STEPS, AvatarWidget,
+                                   PushedLevelSource, WavReplayLevelSource)
+
+
+def _app():
+    return QApplication.instance() or QApplication([])
+
+
+def _widget(source):
+    widget = AvatarWidget(source)
+    # Listen on a free port, so the test does not clash with a running avatar
+    widget._udp.close()
+    widget._udp.bind(QHostAddress.LocalHost, 0)
+    return widget
+
+
+def _timer(widget):
+    return widget._timer.interval() if widget._timer.isActive() else 0
+
+
+def _send(widget, message):
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.sendto(json.dumps(message).encode("utf-8"), ("127.0.0.1", widget._udp.localPort()))
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline:
+        _app().processEvents()
+        if not widget._udp.hasPendingDatagrams() and _timer(widget):
+            return
+        time.sleep(0.01)
+
+
+def test_timer_stops_when_idle_and_wakes():
+    _app()
+    source = PushedLevelSource()
+    widget = _widget(source)
+    assert _timer(widget) == ACTIVE_INTERVAL_MS
+    widget._on_tick()
+    assert _timer(widget) == 0  # push-only source, neutral face: nothing to render until a command
+
+    widget.set_expression("happy", 5)
+    assert _timer(widget) == ACTIVE_INTERVAL_MS
+    widget._on_tick()
+    assert _timer(widget) == ACTIVE_INTERVAL_MS and widget._expr == "happy"
+    widget._expr_until = time.time() - 1  # the expression ran out
+    widget._on_tick()
+    assert widget._expr == "neutral" and _timer(widget) == 0
+
+    # Levels pushed by the agent wake the timer and keep it at full rate while they play
+    _send(widget, {"lx": "80ff80", "d": 0.2})
+    assert source.busy() and _timer(widget) == ACTIVE_INTERVAL_MS
+    widget._on_tick()
+    assert _timer(widget) == ACTIVE_INTERVAL_MS and widget._level > 0
+    source.clear()
+    widget._smoothed = 0.0
+    widget._on_tick()
+    assert _timer(widget) == 0
+
+    # A sequenced expression command over UDP wakes it as well
+    _send(widget, {"s": 1, "q": [["wink", 0.5], ["neutral", 0]]})
+    assert widget._expr == "wink" and _timer(widget) == ACTIVE_INTERVAL_MS
+    widget.close()
+
+
+def test_polled_meter_keeps_slow_polling():
+    _app()
+    path = os.path.join(tempfile.mkdtemp(), "silence.wav")
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(b"\0\0" * 160)
+    source = WavReplayLevelSource(path)
+    source.get_peak()
+    time.sleep(0.05)  # the 10 ms file has played out
+    widget = _widget(source)
+    widget._on_tick()
+    assert not source.busy() and _timer(widget) == IDLE_INTERVAL_MS
+    widget.set_expression("sad", 1)
+    assert _timer(widget) == ACTIVE_INTERVAL_MS
+    widget.close()
+
+
+def test_visual_state_and_static_layers():
+    _app()
+    widget = _widget(PushedLevelSource())
+    widget._timer.stop()
+    widget._level = 0.5
+    assert widget._visual_state() == ("neutral", LEVEL_STEPS // 2)
+    widget._expr = "happy"
+    assert widget._visual_state() == ("happy",)  # fixed mouth: the level does not matter
+    widget._level = 0.9
+    assert widget._visual_state() == ("happy",)
+
+    layer = widget._static_layer("happy")
+    assert widget._static_layer("happy") is layer  # rendered once per expression and size
+    assert widget._static_layer("neutral") is not layer and len(widget._layers) == 2
+    dpr = widget.devicePixelRatioF()
+    assert (layer.width(), layer.height()) == (round(widget.width() * dpr), round(widget.height() * dpr))
+
+    widget.show()
+    widget.resize(300, 300)
+    _app().processEvents()
+    assert all(key[1:3] == (300, 300) for key in widget._layers)
+    assert widget._static_layer("happy").width() == round(300 * dpr)
+    widget.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("AVATAR SCHEDULER TEST")
+    print("=" * 60)
+    for test in (test_timer_stops_when_idle_and_wakes, test_polled_meter_keeps_slow_polling,
+                 test_visual_state_and_static_layers):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,46 @@
+"""
+Test JsonDiskCache: entries survive a reload from the JSON file, expired entries are misses,
+and once full the least recently used entry is evicted (a hit counts as a use).
+Run: python test_disk_cache.py   (or: python -m pytest test_disk_cache.py)
+"""
+import os
+import tempfile
+
+from disk_cache import JsonDiskCache
+
+
+def _path():
+    return os.path.join(tempfile.mkdtemp(), "tracks.json")
+
+
+def test_persists_and_expires():
+    path = _path()
+    cache = JsonDiskCache(path)
+    cache.set("numb", {"uri": "spotify:track:1"})
+    assert JsonDiskCache(path).get("numb") == {"uri": "spotify:track:1"}
+    expired = JsonDiskCache(path, max_age=-1)
+    assert expired.get("numb") is None and expired.misses == 1
+
+
+def test_evicts_least_recently_used():
+    path = _path()
+    cache = JsonDiskCache(path, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" is now the most recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+    # The use order is written out with the change, so a reload evicts the same way
+    reloaded = JsonDiskCache(path, maxsize=2)
+    reloaded.set("d", 4)
+    assert reloaded.get("a") is None and reloaded.get("c") == 3 and reloaded.get("d") == 4
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("DISK CACHE TEST")
+    print("=" * 60)
+    test_persists_and_expires()
+    print("✅ test_persists_and_expires")
+    test_evicts_least_recently_used()
+    print("✅ test_evicts_least_recently_used")
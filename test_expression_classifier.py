@@ -0,0 +1,52 @@
+"""
+Test that the compiled ExpressionClassifier answers exactly like the if/elif keyword ladders it
+replaced (kept verbatim in bench_expression_classifier): every keyword alone, in a sentence, in
+other case, and every pair of keywords, so ties between rules are decided by the same priority.
+Run: python test_expression_classifier.py   (or: python -m pytest test_expression_classifier.py)
+"""
+from itertools import permutations
+
+from bench_expression_classifier import FILLER, ladder_message, ladder_normalize
+from expression_classifier import ALIAS_KEYWORDS, EXPRESSION_RULES, EXPRESSIONS, classify_message, normalize_expression
+
+KEYWORDS = sorted({kw for _, _, keywords in EXPRESSION_RULES for kw in keywords})
+NAMES = sorted(set(KEYWORDS) | {kw for aliases in ALIAS_KEYWORDS.values() for kw in aliases}
+               | set(EXPRESSIONS) | {"reset", "rest", "unknown", ""})
+
+
+def _texts(keywords):
+    for kw in keywords:
+        yield kw
+        yield kw.upper()
+        yield f"{FILLER[:80]} {kw}! {FILLER[80:160]}"
+    for first, second in permutations(keywords, 2):
+        yield f"{first} and then {second}"
+    yield FILLER
+    yield ""
+
+
+def test_classify_message_matches_ladder():
+    for text in _texts(KEYWORDS):
+        assert classify_message(text) == ladder_message(text), text
+    # Ties: a lower-priority keyword first in the text still loses to a higher-priority one
+    assert classify_message("so sad, but wow") == ("sad", 2.0)
+    assert classify_message("I love how happy you are 😉") == ("wink", 1.2)
+    assert classify_message("unhappy") == ("happy", 1.5)  # "happy" is found inside it first
+
+
+def test_normalize_expression_matches_ladder():
+    for name in NAMES:
+        for spoken in (name, name.upper(), f"  {name}  "):
+            assert normalize_expression(spoken) == ladder_normalize(spoken), spoken
+    for first, second in permutations(NAMES, 2):
+        assert normalize_expression(f"{first} {second}") == ladder_normalize(f"{first} {second}"), (first, second)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("EXPRESSION CLASSIFIER TEST")
+    print("=" * 60)
+    test_classify_message_matches_ladder()
+    print("✅ test_classify_message_matches_ladder")
+    test_normalize_expression_matches_ladder()
+    print("✅ test_normalize_expression_matches_ladder")
@@ -0,0 +1,104 @@
+"""
+Test ExpressionPipeline against the fake session from bench_expression_pipeline: only assistant
+messages are classified and dispatched, a full queue drops its oldest message, and aclose()
+unsubscribes from the session after dispatching what was already queued.
+Run: python test_expression_pipeline.py   (or: python -m pytest test_expression_pipeline.py)
+"""
+import asyncio
+
+from bench_expression_pipeline import FakeItem, FakeSession
+from expression_classifier import classify_message
+from expression_pipeline import ExpressionPipeline
+
+HAPPY = "Awesome! That is tears of joy worthy!"
+SAD = "Oh no, that is so sad."
+SURPRISED = "Wow, really?"
+
+
+class RecordingDispatch:
+    def __init__(self, delay: float = 0.0):
+        self.calls = []
+        self.delay = delay
+
+    async def __call__(self, expr: str, duration: float) -> str:
+        await asyncio.sleep(self.delay)
+        self.calls.append((expr, duration))
+        return "ok"
+
+
+async def _settle():
+    for _ in range(10):
+        await asyncio.sleep(0.01)
+
+
+def test_dispatches_assistant_messages_through_classifier():
+    async def scenario():
+        session, dispatch = FakeSession(), RecordingDispatch()
+        pipeline = ExpressionPipeline(dispatch=dispatch)
+        pipeline.attach(session)
+        pipeline.start()
+        session.add(FakeItem("user", HAPPY))  # user turns are never watched
+        session.add(FakeItem("assistant", "The weather is 20 degrees."))  # no expression in it
+        session.add(FakeItem("assistant", "   "))
+        session.add(FakeItem("assistant", SAD))
+        await _settle()
+        assert dispatch.calls == [classify_message(SAD)] == [("sad", 2.0)]
+        await pipeline.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_drops_oldest():
+    async def scenario():
+        session, dispatch = FakeSession(), RecordingDispatch()
+        pipeline = ExpressionPipeline(dispatch=dispatch, maxsize=2)
+        pipeline.attach(session)
+        # Not started yet: everything waits in the queue
+        for text in (HAPPY, SAD, SURPRISED):
+            session.add(FakeItem("assistant", text))
+        pipeline.start()
+        await _settle()
+        assert [expr for expr, _ in dispatch.calls] == ["sad", "surprised"]
+        await pipeline.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_aclose_unsubscribes_and_drains():
+    async def scenario():
+        session, dispatch = FakeSession(), RecordingDispatch(delay=0.05)
+        pipeline = ExpressionPipeline(dispatch=dispatch)
+        pipeline.attach(session)
+        pipeline.start()
+        session.add(FakeItem("assistant", HAPPY))
+        session.add(FakeItem("assistant", SAD))
+        await pipeline.aclose()
+        assert [expr for expr, _ in dispatch.calls] == ["happy", "sad"]  # queued messages still shown
+        assert session._handlers["conversation_item_added"] == []
+        assert pipeline._task.done() and pipeline._queue.empty()
+
+        session.add(FakeItem("assistant", SURPRISED))  # no longer watched
+        await _settle()
+        assert len(dispatch.calls) == 2
+
+        # A dispatch that hangs does not hold up shutdown past the timeout
+        stuck = ExpressionPipeline(dispatch=RecordingDispatch(delay=60))
+        stuck.attach(FakeSession())
+        stuck.start()
+        stuck.submit(FakeItem("assistant", HAPPY))
+        await asyncio.wait_for(stuck.aclose(timeout=0.1), 2)
+        assert stuck._task.done()
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("EXPRESSION PIPELINE TEST")
+    print("=" * 60)
+    test_dispatches_assistant_messages_through_classifier()
+    print("✅ test_dispatches_assistant_messages_through_classifier")
+    test_full_queue_drops_oldest()
+    print("✅ test_full_queue_drops_oldest")
+    test_aclose_unsubscribes_and_drains()
+    print("✅ test_aclose_unsubscribes_and_drains")
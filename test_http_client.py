@@ -0,0 +1,111 @@
+"""
+Test the shared async HTTP client against a local, deliberately slow HTTP server.
+Checks that the event loop keeps running (as the realtime audio needs) while requests
+are in flight, that requests run concurrently, and that connections are reused.
+Run: python test_http_client.py   (or: python -m pytest test_http_client.py)
+"""
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from http_client import aclose_http_client, get_http_client, http_get
+
+DELAY = 0.5
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    peers = set()
+
+    def do_GET(self):
+        SlowHandler.peers.add(self.client_address)
+        time.sleep(DELAY)
+        body = b"Delhi: +31C"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def _max_loop_lag(stop: asyncio.Event) -> float:
+    """Largest delay between 10 ms ticks of the event loop while `stop` is unset."""
+    worst = 0.0
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(0.01)
+        worst = max(worst, time.perf_counter() - t0 - 0.01)
+    return worst
+
+
+async def _slow_requests(url: str):
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_max_loop_lag(stop))
+    start = time.perf_counter()
+    responses = await asyncio.gather(*(http_get(url) for _ in range(4)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    lag = await ticker
+    return responses, elapsed, lag
+
+
+def test_event_loop_stays_responsive():
+    server = _start_server()
+    url = f"http://127.0.0.1:{server.server_address[1]}/Delhi"
+
+    async def run():
+        try:
+            return await _slow_requests(url)
+        finally:
+            await aclose_http_client()
+
+    try:
+        responses, elapsed, lag = asyncio.run(run())
+    finally:
+        server.shutdown()
+    print(f"4 slow requests: {elapsed:.2f}s total, worst event loop stall {lag * 1000:.1f} ms")
+    assert all(r.status_code == 200 and r.text == "Delhi: +31C" for r in responses)
+    # The requests overlap instead of running one after another
+    assert elapsed < DELAY * 2
+    # The loop kept ticking while the server was slow
+    assert lag < 0.1
+
+
+def test_connections_are_reused():
+    SlowHandler.peers.clear()
+    server = _start_server()
+    url = f"http://127.0.0.1:{server.server_address[1]}/Delhi"
+
+    async def run():
+        try:
+            for _ in range(3):
+                await http_get(url)
+            return get_http_client()
+        finally:
+            await aclose_http_client()
+
+    try:
+        client = asyncio.run(run())
+    finally:
+        server.shutdown()
+    print(f"3 sequential requests used {len(SlowHandler.peers)} connection(s)")
+    assert len(SlowHandler.peers) == 1
+    assert client.is_closed
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("SHARED HTTP CLIENT TEST")
+    print("=" * 60)
+    test_event_loop_stays_responsive()
+    test_connections_are_reused()
+    print("✅ All checks passed")
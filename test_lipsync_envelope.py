@@ -0,0 +1,76 @@
+"""
+Test LevelEnvelope: windows are carried over across frames of any size, silence decays the
+level to 0, and RMS reads below peak on the same audio with the same shaping.
+Run: python test_lipsync_envelope.py   (or: python -m pytest test_lipsync_envelope.py)
+"""
+import numpy as np
+
+from avatar_lipsync import LevelEnvelope
+
+RATE = 16000
+STEP = int(RATE * 0.016)  # samples per window
+
+
+def _tone(amplitude, windows):
+    t = np.arange(STEP * windows) / RATE
+    return (amplitude * np.sin(2 * np.pi * 250 * t)).astype(np.int16)  # 4 full periods per window
+
+
+def test_remainder_carries_over_frames():
+    audio = (_tone(12000, 10) * np.linspace(0, 1, STEP * 10)).astype(np.int16)
+    whole = LevelEnvelope().process(audio, RATE)
+    assert len(whole) == 10
+
+    envelope = LevelEnvelope()
+    split = []
+    for chunk in np.array_split(audio, [STEP // 3, STEP // 3 + 7, STEP * 4 - 1, STEP * 4 + 1]):
+        split.extend(envelope.process(chunk, RATE))
+    assert np.allclose(split, whole)
+
+    # A frame shorter than a window yields nothing until the window completes
+    envelope = LevelEnvelope()
+    assert envelope.process(audio[: STEP - 1], RATE) == []
+    assert np.allclose(envelope.process(audio[STEP - 1: STEP], RATE), whole[:1])
+    # Interleaved stereo windows hold twice the samples
+    stereo = np.repeat(audio, 2)
+    assert np.allclose(LevelEnvelope().process(stereo, RATE, num_channels=2), whole)
+
+
+def test_silence_decays_to_zero():
+    envelope = LevelEnvelope()
+    loud = envelope.process(_tone(16000, 5), RATE)
+    assert loud == sorted(loud) and loud[-1] > 0.9  # attack rises toward the open mouth
+    quiet = envelope.process(np.zeros(STEP * 60, dtype=np.int16), RATE)
+    assert all(b < a for a, b in zip([loud[-1]] + quiet, quiet))
+    assert quiet[-1] < 1e-4
+    envelope.reset()
+    assert envelope.process(np.zeros(STEP, dtype=np.int16), RATE) == [0.0]
+
+
+def test_rms_and_peak_measures():
+    # attack=1 shows each window's shaped level without smoothing
+    tone = _tone(8000, 3)
+    peak = LevelEnvelope(measure="peak", attack=1.0).process(tone, RATE)
+    rms = LevelEnvelope(measure="rms", attack=1.0).process(tone, RATE)
+    level = 8000 / 32768
+    assert np.allclose(peak, min(1.0, level * 2.5) ** 0.7, atol=1e-3)
+    assert np.allclose(rms, min(1.0, level / np.sqrt(2) * 2.5) ** 0.7, atol=1e-3)
+
+    # A square wave has the same RMS as peak; below the noise floor the level is not shaped
+    square = np.full(STEP, 4000, dtype=np.int16)
+    assert np.allclose(LevelEnvelope(measure="rms", attack=1.0).process(square, RATE),
+                       LevelEnvelope(measure="peak", attack=1.0).process(square, RATE))
+    faint = np.full(STEP, 200, dtype=np.int16)
+    assert np.allclose(LevelEnvelope(attack=1.0).process(faint, RATE), 200 / 32768)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("LIP-SYNC ENVELOPE TEST")
+    print("=" * 60)
+    test_remainder_carries_over_frames()
+    print("✅ test_remainder_carries_over_frames")
+    test_silence_decays_to_zero()
+    print("✅ test_silence_decays_to_zero")
+    test_rms_and_peak_measures()
+    print("✅ test_rms_and_peak_measures")
@@ -0,0 +1,155 @@
+"""
+Test LocalMemoryClient: add / get_all / search with user and category filters, cosine top-k
+recall, idempotent journal batches, hit counts and update times for repeated memories (also
+on a store created before they were tracked), persistence across instances and re-embedding
+when the embedding function changes.
+Run: python test_local_memory.py   (or: python -m pytest test_local_memory.py)
+"""
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+
+import numpy as np
+
+from local_memory import LocalMemoryClient, hashing_embedding
+
+PREFERENCES = [
+    "I love jazz music in the evening",
+    "I prefer short answers",
+    "I hate horror movies",
+    "I like my coffee black without sugar",
+    "I enjoy hiking in the mountains on weekends",
+]
+
+
+def _path():
+    return os.path.join(tempfile.mkdtemp(), "memory.db")
+
+
+def test_add_get_all_and_search():
+    async def scenario():
+        path = _path()
+        client = LocalMemoryClient(path)
+        result = await client.add(PREFERENCES, user_id="RamX", category="preferences")
+        assert [r["memory"] for r in result["results"]] == PREFERENCES
+        await client.add(["user: play some jazz", {"role": "assistant", "content": "Playing jazz."}],
+                         user_id="RamX", category="conversation")
+        await client.add("I love metal", user_id="someone else", category="preferences")
+        # Exact repeats are not stored twice
+        assert (await client.add(PREFERENCES[:2], user_id="RamX", category="preferences"))["results"] == []
+
+        stored = await client.get_all(user_id="RamX", category="preferences")
+        assert [m["memory"] for m in stored] == PREFERENCES
+        assert stored[0]["categories"] == ["preferences"] and stored[0]["user_id"] == "RamX"
+        assert len(await client.get_all(user_id="RamX")) == 7
+        assert await client.get_all(user_id="nobody") == []
+
+        hits = await client.search("what coffee does the user drink", user_id="RamX", category="preferences", limit=2)
+        assert hits[0]["memory"] == "I like my coffee black without sugar"
+        assert len(hits) == 2 and hits[0]["score"] >= hits[1]["score"]
+        hits = await client.search("mountain hikes", user_id="RamX", limit=1)
+        assert [h["memory"] for h in hits] == ["I enjoy hiking in the mountains on weekends"]
+        assert (await client.search("jazz", user_id="RamX", category="conversation", limit=5))[0]["memory"] in (
+            "user: play some jazz", "assistant: Playing jazz.")
+        client.close()
+
+        # Everything is back after a restart, without re-embedding
+        reopened = LocalMemoryClient(path)
+        assert [m["memory"] for m in await reopened.get_all(user_id="RamX", category="preferences")] == PREFERENCES
+        hits = await reopened.search("horror films", user_id="RamX", limit=1)
+        assert hits[0]["memory"] == "I hate horror movies"
+        reopened.close()
+
+    asyncio.run(scenario())
+
+
+def test_journal_batch_is_stored_once():
+    async def scenario():
+        client = LocalMemoryClient(_path())
+        metadata = {"journal_batch": "abc"}
+        first = await client.add(["user: hi", "assistant: hello"], user_id="RamX", category="conversation",
+                                 metadata=metadata)
+        again = await client.add(["user: hi", "assistant: hello"], user_id="RamX", category="conversation",
+                                 metadata=metadata)
+        assert len(first["results"]) == 2 and again["results"] == []
+        stored = await client.get_all(user_id="RamX")
+        assert len(stored) == 2 and stored[0]["metadata"] == metadata
+        client.close()
+
+    asyncio.run(scenario())
+
+
+def test_repeats_count_as_hits():
+    async def scenario():
+        path = _path()
+        client = LocalMemoryClient(path)
+        await client.add(PREFERENCES[:2], user_id="RamX", category="preferences")
+        first = {m["memory"]: m for m in await client.get_all(user_id="RamX")}
+        time.sleep(0.01)
+        await client.add(PREFERENCES[:1], user_id="RamX", category="preferences")
+        await client.add(PREFERENCES[:1], user_id="RamX", category="preferences", metadata={"journal_batch": "b"})
+        # A retried journal batch is not one more hit
+        await client.add(PREFERENCES[:1], user_id="RamX", category="preferences", metadata={"journal_batch": "b"})
+        stored = {m["memory"]: m for m in await client.get_all(user_id="RamX")}
+        assert [stored[p]["hits"] for p in PREFERENCES[:2]] == [3, 1]
+        assert stored[PREFERENCES[0]]["updated_at"] > first[PREFERENCES[0]]["updated_at"]
+        assert stored[PREFERENCES[1]]["updated_at"] == first[PREFERENCES[1]]["updated_at"]
+        client.close()
+
+        # A store written before hits / updated existed gets the columns on open
+        old = _path()
+        conn = sqlite3.connect(old)
+        conn.execute("CREATE TABLE memories(id INTEGER PRIMARY KEY, user_id TEXT NOT NULL, category TEXT NOT NULL, "
+                     "memory TEXT NOT NULL, metadata TEXT NOT NULL DEFAULT '{}', created REAL NOT NULL, "
+                     "embedding BLOB, UNIQUE (user_id, category, memory))")
+        conn.execute("INSERT INTO memories(user_id, category, memory, created) VALUES ('RamX', 'preferences', ?, 0)",
+                     (PREFERENCES[0],))
+        conn.commit()
+        conn.close()
+        migrated = LocalMemoryClient(old)
+        await migrated.add(PREFERENCES[:1], user_id="RamX", category="preferences")
+        [memory] = await migrated.get_all(user_id="RamX")
+        assert memory["hits"] == 2 and memory["created_at"] < memory["updated_at"]
+        migrated.close()
+
+    asyncio.run(scenario())
+
+
+def test_pluggable_embedding_reembeds_on_change():
+    async def scenario():
+        path = _path()
+        client = LocalMemoryClient(path)
+        await client.add(PREFERENCES, user_id="RamX", category="preferences")
+        client.close()
+
+        calls = []
+
+        def small(texts):
+            calls.append(len(texts))
+            return hashing_embedding(texts, dim=64)
+
+        reopened = LocalMemoryClient(path, embed=small)
+        hits = await reopened.search("black coffee", user_id="RamX", limit=1)
+        assert hits[0]["memory"] == "I like my coffee black without sugar"
+        assert len(PREFERENCES) in calls  # the stored rows were re-embedded once
+        assert reopened._matrix.shape == (len(PREFERENCES), 64)
+        assert np.allclose(np.linalg.norm(reopened._matrix, axis=1), 1.0)
+        reopened.close()
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("LOCAL MEMORY TEST")
+    print("=" * 60)
+    test_add_get_all_and_search()
+    print("✅ test_add_get_all_and_search")
+    test_journal_batch_is_stored_once()
+    print("✅ test_journal_batch_is_stored_once")
+    test_repeats_count_as_hits()
+    print("✅ test_repeats_count_as_hits")
+    test_pluggable_embedding_reembeds_on_change()
+    print("✅ test_pluggable_embedding_reembeds_on_change")
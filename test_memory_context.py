@@ -0,0 +1,95 @@
+"""
+Test build_memory_context: near-identical memories are merged, memories are ranked by recency,
+frequency and relevance to the last topic, and the packed block stays within the token budget
+with the dropped counts reported.
+Run: python test_memory_context.py   (or: python -m pytest test_memory_context.py)
+"""
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from memory_context import build_memory_context, estimate_tokens, memory_texts
+from memory_journal import MemoryJournal, last_topic
+
+NOW = datetime(2026, 3, 1, 15, 0, tzinfo=timezone.utc)
+
+
+def _memory(text, days_ago, hits=None):
+    memory = {"memory": text, "updated_at": (NOW - timedelta(days=days_ago)).isoformat()}
+    if hits is not None:
+        memory["hits"] = hits
+    return memory
+
+
+def test_dedupes_ranks_and_packs():
+    results = [
+        _memory("I prefer short answers", 200),
+        _memory("I prefer short answers.", 100),
+        _memory("i prefer  SHORT answers", 90),
+        _memory("I love jazz music", 1),
+        _memory("I like my coffee black", 300),
+        _memory("I enjoy hiking on weekends", 400),
+    ]
+    context = build_memory_context(results, now=NOW, budget=1000)
+    assert context.dropped_duplicates == 2 and context.dropped_over_budget == 0
+    # The freshest memory ranks first, the repeated one beats the old single ones
+    assert context.memories[:2] == ["I love jazz music", "i prefer SHORT answers"]
+    assert context.text.splitlines()[0] == "- I love jazz music"
+    assert context.tokens == sum(estimate_tokens(f"- {m}\n") for m in context.memories)
+
+    # Relevance to the last topic lifts an old memory over the others of its age
+    context = build_memory_context(results, topic="make me a coffee", now=NOW, budget=1000)
+    assert context.memories.index("I like my coffee black") < context.memories.index("I enjoy hiking on weekends")
+
+
+def test_ranks_on_stored_hits_and_update_time():
+    # As LocalMemoryClient returns them: one row per fact, repeats counted in "hits"
+    results = [
+        _memory("I love jazz music", 20, hits=1),
+        _memory("I prefer short answers", 20, hits=12),
+        _memory("I like my coffee black", 2, hits=1),
+    ]
+    context = build_memory_context(results, now=NOW, budget=1000)
+    assert context.memories == ["I prefer short answers", "I like my coffee black", "I love jazz music"]
+    # Hits add up when near-identical memories are merged
+    results.append(_memory("I love jazz music.", 20, hits=30))
+    assert build_memory_context(results, now=NOW, budget=1000).memories[0] == "I love jazz music"
+
+
+def test_token_budget_and_dropped_counts():
+    results = {"results": [_memory(f"I like topic number {i} very much indeed", i) for i in range(200)]}
+    results["results"].append({"memory": "   "})
+    budget = 60
+    context = build_memory_context(results, now=NOW, budget=budget)
+    assert 0 < context.tokens <= budget
+    assert len(context.memories) + context.dropped_over_budget + context.dropped_duplicates == 200
+    assert context.dropped_tokens > 0 and context.dropped_over_budget > 150
+    assert context.memories[0] == "I like topic number 0 very much indeed"
+    assert len(memory_texts(results)) == 200
+    assert build_memory_context([], now=NOW).text == ""
+
+
+def test_last_topic_from_journal():
+    path = os.path.join(tempfile.mkdtemp(), "journal.db")
+    assert last_topic(path) == ""
+    journal = MemoryJournal(None, path=path)
+    for i, text in enumerate(["play some jazz", "something calmer", "thanks", "turn on the lights"]):
+        journal.record(SimpleNamespace(role="user", content=text))
+        journal.record(SimpleNamespace(role="assistant", content=f"reply {i}"))
+    journal.close()
+    assert last_topic(path) == "something calmer thanks turn on the lights"
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("MEMORY CONTEXT TEST")
+    print("=" * 60)
+    test_dedupes_ranks_and_packs()
+    print("✅ test_dedupes_ranks_and_packs")
+    test_ranks_on_stored_hits_and_update_time()
+    print("✅ test_ranks_on_stored_hits_and_update_time")
+    test_token_budget_and_dropped_counts()
+    print("✅ test_token_budget_and_dropped_counts")
+    test_last_topic_from_journal()
+    print("✅ test_last_topic_from_journal")
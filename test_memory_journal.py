@@ -0,0 +1,190 @@
+"""
+Test MemoryJournal with a fake memory backend: turns are journaled as they are added and sent
+in per-category batches, a failing backend is retried with the same idempotency key, and turns
+left behind by a crashed session are replayed by the next one.
+Run: python test_memory_journal.py   (or: python -m pytest test_memory_journal.py)
+"""
+import asyncio
+import os
+import tempfile
+from types import SimpleNamespace
+
+from memory_journal import MemoryJournal
+
+
+class FakeBackend:
+    """Stores batches by journal_batch key; the first `fail` calls fail (after storing, if `lost_ack`)."""
+
+    def __init__(self, fail=0, lost_ack=False):
+        self.fail = fail
+        self.lost_ack = lost_ack
+        self.calls = []
+        self.stored = {}
+
+    async def add(self, messages, user_id=None, category=None, metadata=None):
+        key = metadata["journal_batch"]
+        self.calls.append((category, key, list(messages)))
+        if self.fail and not self.lost_ack:
+            self.fail -= 1
+            raise ConnectionError("backend down")
+        self.stored[key] = (category, list(messages))
+        if self.fail:
+            self.fail -= 1
+            raise TimeoutError("response lost")
+
+
+class FakeSession:
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def off(self, event, handler):
+        self.handlers.pop(event, None)
+
+    def add(self, role, content, item_id=None):
+        item = SimpleNamespace(role=role, content=content, id=item_id)
+        self.handlers["conversation_item_added"](SimpleNamespace(item=item))
+        return item
+
+
+def _journal_path():
+    return os.path.join(tempfile.mkdtemp(), "journal.db")
+
+
+def test_records_live_and_flushes_tail():
+    async def scenario():
+        backend = FakeBackend()
+        facts = SimpleNamespace(role="assistant", content=["Here are known facts about the user"])
+        journal = MemoryJournal(backend, path=_journal_path(), known=[facts], interval=60, batch_size=3)
+        session = FakeSession()
+        journal.attach(session)
+        journal.start()
+        items = [
+            session.add("user", "I love jazz in the evening", "i1"),
+            session.add("assistant", ["Noted, ", "jazz it is."], "i2"),
+            session.add("system", "ignored", "i3"),
+            session.add("assistant", "Here are known facts about the user", "i4"),
+            session.add("user", "play something", "i5"),
+        ]
+        await asyncio.sleep(0.05)
+        # Three conversation rows reached the batch size, so the flusher ran without waiting 60s
+        assert backend.calls[0][:1] == ("conversation",)
+        assert backend.calls[0][2] == ["user: I love jazz in the evening", "assistant: Noted, jazz it is.",
+                                       "user: play something"]
+        assert backend.calls[1][0] == "preferences" and backend.calls[1][2] == ["User loves jazz in the evening"]
+
+        session.add("user", "I prefer short answers", "i6")
+        session.add("user", "It looks like rain. I prefer short answers!", "i7")  # no new fact
+        assert journal.record_new(items) == 0  # backfilling from the chat context adds nothing twice
+        assert journal.pending() == 3
+        assert journal.session_log()[-2] == "user: I prefer short answers"
+        await journal.aclose()
+        assert len(backend.calls) == 4 and [c[0] for c in backend.calls[2:]] == ["conversation", "preferences"]
+        assert backend.calls[3][2] == ["User prefers short answers"]
+        assert "conversation_item_added" not in session.handlers
+
+    asyncio.run(scenario())
+
+
+def test_record_new_only_walks_new_items():
+    journal = MemoryJournal(None, path=_journal_path())
+    items = [SimpleNamespace(role="user", content=f"turn {i}") for i in range(5)]
+    assert journal.record_new(items) == 5
+    assert journal.record_new(items) == 0
+
+    class Exploding:
+        role = "user"
+
+        @property
+        def content(self):
+            raise AssertionError("an already journaled item was read again")
+
+    # Items behind the cursor are not even looked at
+    items[2] = Exploding()
+    items.append(SimpleNamespace(role="assistant", content="turn 5"))
+    assert journal.record_new(items) == 1
+
+    # A truncated context is walked again, and its id-less turns still map to the journaled ones
+    items = [SimpleNamespace(role="user", content=f"turn {i}") for i in range(3)]
+    items.append(SimpleNamespace(role="user", content="turn 0"))  # a second, identical turn is new
+    assert journal.record_new(items) == 1
+    assert journal.pending() == 7
+    journal.close()
+
+
+def test_retry_keeps_idempotency_key():
+    async def scenario():
+        backend = FakeBackend(fail=2, lost_ack=True)
+        journal = MemoryJournal(backend, path=_journal_path(), interval=0.01, max_backoff=0.02)
+        journal.record(SimpleNamespace(role="user", content="hello"))
+        journal.record(SimpleNamespace(role="user", content="hello"))  # a second, identical turn
+        journal.start()
+        for _ in range(100):
+            if not journal.pending():
+                break
+            await asyncio.sleep(0.01)
+        assert journal.pending() == 0
+        # Sent three times under one key; the backend ended up with a single copy of the batch
+        assert len(backend.calls) == 3 and len({key for _, key, _ in backend.calls}) == 1
+        assert list(backend.stored.values()) == [("conversation", ["user: hello", "user: hello"])]
+        await journal.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_crashed_session_is_replayed():
+    path = _journal_path()
+
+    async def crashed():
+        journal = MemoryJournal(FakeBackend(fail=100), path=path, interval=60)
+        journal.start()
+        journal.record(SimpleNamespace(role="user", content="I like tea", id="a"))
+        journal.record(SimpleNamespace(role="assistant", content="Tea noted.", id="b"))
+        assert not await journal.flush()
+        journal.close()  # the process dies; nothing reached the backend
+
+    async def next_start():
+        backend = FakeBackend()
+        journal = MemoryJournal(backend, path=path, interval=60)
+        assert journal.pending() == 3 and journal.session_log() == []
+        journal.start()
+        await asyncio.sleep(0.05)
+        assert journal.pending() == 0
+        assert [c[0] for c in backend.calls] == ["conversation", "preferences"]
+        assert backend.calls[0][2] == ["user: I like tea", "assistant: Tea noted."]
+        await journal.aclose()
+
+    asyncio.run(crashed())
+    asyncio.run(next_start())
+
+
+def test_without_backend_turns_stay_local():
+    async def scenario():
+        path = _journal_path()
+        journal = MemoryJournal(None, path=path)
+        journal.start()
+        journal.record(SimpleNamespace(role="user", content="remember this"))
+        await journal.aclose(timeout=0.1)
+        reopened = MemoryJournal(None, path=path)
+        assert reopened.pending() == 1
+        reopened.close()
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("MEMORY JOURNAL TEST")
+    print("=" * 60)
+    test_records_live_and_flushes_tail()
+    print("✅ test_records_live_and_flushes_tail")
+    test_record_new_only_walks_new_items()
+    print("✅ test_record_new_only_walks_new_items")
+    test_retry_keeps_idempotency_key()
+    print("✅ test_retry_keeps_idempotency_key")
+    test_crashed_session_is_replayed()
+    print("✅ test_crashed_session_is_replayed")
+    test_without_backend_turns_stay_local()
+    print("✅ test_without_backend_turns_stay_local")
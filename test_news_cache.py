@@ -0,0 +1,118 @@
+"""
+Test the fetch_news cache against a local stand-in for NewsAPI: one upstream request per
+topic serves several num_articles sizes, prefetched topics are answered from memory, and
+HTTP 429 responses back off for the Retry-After period.
+Run: python test_news_cache.py   (or: python -m pytest test_news_cache.py)
+"""
+import asyncio
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+os.environ.setdefault("NEWS_API_KEY", "test-key")
+
+import get_news
+from get_news import fetch_news, news_cache_info, news_topics_from_preferences, prefetch_news
+from http_client import aclose_http_client
+
+
+class FakeNewsAPI(BaseHTTPRequestHandler):
+    requests = []
+    rate_limited = False
+
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query)
+        FakeNewsAPI.requests.append(query)
+        if FakeNewsAPI.rate_limited:
+            self.send_response(429)
+            self.send_header("Retry-After", "120")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        size = int(query["pageSize"][0])
+        topic = query["q"][0]
+        body = json.dumps({
+            "status": "ok",
+            "articles": [{"title": f"{topic} story {i}", "source": {"name": "Local"}} for i in range(size)],
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _run(coro_fn):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeNewsAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    get_news.NEWS_API_URL = f"http://127.0.0.1:{server.server_address[1]}/v2/everything"
+    get_news.news_cache.clear()
+    get_news._rate_limited_until = 0.0
+    FakeNewsAPI.requests = []
+    FakeNewsAPI.rate_limited = False
+
+    async def run():
+        try:
+            return await coro_fn()
+        finally:
+            await aclose_http_client()
+
+    try:
+        return asyncio.run(run())
+    finally:
+        server.shutdown()
+
+
+def test_smaller_pages_served_from_one_request():
+    async def scenario():
+        three = await fetch_news(None, "Cricket", 3)
+        five = await fetch_news(None, "cricket ", 5)
+        return three, five
+
+    three, five = _run(scenario)
+    assert three.count("\n") == 3 and five.count("\n") == 5
+    assert len(FakeNewsAPI.requests) == 1
+    assert FakeNewsAPI.requests[0]["pageSize"] == [str(get_news.FETCH_PAGE_SIZE)]
+
+
+def test_prefetch_answers_from_cache():
+    async def scenario():
+        await prefetch_news(news_topics_from_preferences(["I like cricket news", "loves tech news"]))
+        before = len(FakeNewsAPI.requests)
+        answer = await fetch_news(None, "tech", 3)
+        return before, answer
+
+    before, answer = _run(scenario)
+    assert before == 2
+    assert len(FakeNewsAPI.requests) == 2
+    assert "tech story 0" in answer
+
+
+def test_rate_limit_backoff():
+    async def scenario():
+        FakeNewsAPI.rate_limited = True
+        first = await fetch_news(None, "markets", 3)
+        second = await fetch_news(None, "markets", 3)
+        return first, second, news_cache_info()
+
+    first, second, info = _run(scenario)
+    assert "try again in 120 seconds" in first
+    assert "try again in" in second
+    # The second call waited out the backoff locally instead of hitting the API again
+    assert len(FakeNewsAPI.requests) == 1
+    assert info["rate_limited_for"] > 100
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("NEWS CACHE TEST")
+    print("=" * 60)
+    for test in (test_smaller_pages_served_from_one_request, test_prefetch_answers_from_cache,
+                 test_rate_limit_backoff):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,88 @@
+"""
+Test the open_application / close_application tools end to end on a throwaway installed app:
+the spoken name is fuzzily matched, the app is launched from the installed-app index and
+confirmed by its new process, and closing terminates that process tree.
+Run: python test_open_application.py   (or: python -m pytest test_open_application.py)
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+import app_discovery
+import app_registry
+import open_application
+from app_closer import close_process_trees
+from app_discovery import AppIndex
+from app_registry import AppRegistry
+from process_snapshot import get_process_snapshot
+
+
+def _write(path, text, mode=0o644):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+    os.chmod(path, mode)
+
+
+def _install_dummy_app():
+    """An installed-app index holding one app, "Ramx Dummy Player", that just sleeps."""
+    root = tempfile.mkdtemp()
+    apps = os.path.join(root, "applications")
+    script = os.path.join(root, "bin", "ramxdummy")
+    _write(script, f"#!{sys.executable}\nimport time\ntime.sleep(60)\n", 0o755)
+    _write(os.path.join(apps, "ramxdummy.desktop"),
+           f"[Desktop Entry]\nType=Application\nName=Ramx Dummy Player\nExec={script} %U\n")
+    app_discovery._index = AppIndex(os.path.join(root, "index.json"), [apps], [], check_interval=0)
+    app_registry._registry = AppRegistry(os.path.join(root, "Ramx.db"))
+    open_application._matcher = None
+    return script
+
+
+def test_open_and_close_installed_app():
+    script = _install_dummy_app()
+
+    async def scenario():
+        match = open_application._match_app("ramx dummy plyer")
+        assert match.candidate.name == "Ramx Dummy Player" and match.candidate.source == "installed"
+        launched = await open_application._launch_installed_app("Ramx Dummy Player")
+        assert launched.ok and launched.pid
+        report = await open_application._close_processes([os.path.basename(script)])
+        assert [o.pid for o in report.closed] == [launched.pid]
+
+        # The same, through the tools the agent calls
+        opened = await open_application.open_application("ramx dummy player")
+        assert opened.startswith("Opened Ramx Dummy Player"), opened
+        assert get_process_snapshot().refresh().is_running(os.path.basename(script))
+        assert await open_application.close_application("Ramx Dummy Player") == "Closed Ramx Dummy Player."
+        assert not get_process_snapshot().refresh().is_running(os.path.basename(script))
+        assert await open_application.close_application("ramx dummy player") == \
+            "Ramx Dummy Player is not currently running."
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        close_process_trees(get_process_snapshot().refresh().pids_for([os.path.basename(script)]))
+
+
+def test_commands_route_to_tools():
+    _install_dummy_app()
+
+    async def scenario():
+        assert await open_application.assistant_open_command("please close ramx dummy player") == \
+            "Ramx Dummy Player is not currently running."
+        assert await open_application.assistant_open_command("what time is it") == ""
+        assert await open_application.assistant_list_command("set a timer") == ""
+        assert (await open_application.assistant_list_command("list running apps")).endswith(".")
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("OPEN APPLICATION TEST")
+    print("=" * 60)
+    test_open_and_close_installed_app()
+    print("✅ test_open_and_close_installed_app")
+    test_commands_route_to_tools()
+    print("✅ test_commands_route_to_tools")
@@ -0,0 +1,75 @@
+"""
+Test PreferenceExtractor: first-person likes and dislikes become structured facts with their
+object, lists give one fact per item, negations flip or cancel them, and messages that merely
+contain "like" produce nothing.
+Run: python test_preference_extractor.py   (or: python -m pytest test_preference_extractor.py)
+"""
+from preference_extractor import PreferenceFact, extract_preferences, get_preference_extractor
+
+CASES = [
+    ("I love Linkin Park", ["User loves Linkin Park"]),
+    ("I really don't like horror movies.", ["User dislikes horror movies"]),
+    ("I'm a big fan of the Beatles and I hate rap", ["User likes the Beatles", "User hates rap"]),
+    ("I'm not into country music these days", ["User dislikes country music"]),
+    ("I can't stand loud alarms", ["User can't stand loud alarms"]),
+    ("I never liked pineapple on pizza", ["User disliked pineapple on pizza"]),
+    ("I prefer tea over coffee, thanks", ["User prefers tea over coffee"]),
+    ("My favorite band is Radiohead!", ["User's favorite band is Radiohead"]),
+    ("i’m really into sci-fi novels", ["User likes sci-fi novels"]),
+    ("I enjoy hiking but not in the rain", ["User enjoys hiking"]),
+    ("I liked the old UI", ["User liked the old UI"]),
+    ("I didn't like the ending", ["User disliked the ending"]),
+    ("I couldn't stand my old job", ["User couldn't stand their old job"]),
+    ("I like my coffee black", ["User likes their coffee black"]),
+    ("I love the songs my dad played for me", ["User loves the songs their dad played for them"]),
+    ("I'm into teaching myself Spanish", ["User likes teaching themselves Spanish"]),
+    ("I prefer your playlist over mine", ["User prefers your playlist over theirs"]),
+    ("I love jazz and I hate techno", ["User loves jazz", "User hates techno"]),
+    ("I hate Mondays and I love Fridays", ["User hates Mondays", "User loves Fridays"]),
+    ("I like tea but I don't like coffee", ["User likes tea", "User dislikes coffee"]),
+    ("I like pizza, pasta and sushi", ["User likes pizza", "User likes pasta", "User likes sushi"]),
+    ("I don't like tea, coffee, or milk.", ["User dislikes tea", "User dislikes coffee", "User dislikes milk"]),
+    ("I love pizza, pasta and I hate sushi", ["User loves pizza", "User loves pasta", "User hates sushi"]),
+    ("I like rock and roll", ["User likes rock and roll"]),
+    ("I like that song", ["User likes that song"]),
+    ("I really love this album a lot", ["User loves this album"]),
+    ("I'm a fan of those old Nokia phones", ["User likes those old Nokia phones"]),
+    ("I LOVE Linkin Park. I also enjoy Metallica a lot! I love Linkin Park", ["User loves Linkin Park",
+                                                                             "User enjoys Metallica"]),
+    # No preference stated
+    ("It looks like rain today", []),
+    ("I'd like to open Chrome", []),
+    ("I would love a coffee right now", []),
+    ("Do you like jazz?", []),
+    ("I like it", []),
+    ("I like that", []),
+    ("I love this, that and those", []),
+    ("I love it when you sing", []),
+    ("I don't hate jazz", []),
+    ("play something like Coldplay", []),
+    ("I feel like watching a movie", []),
+    ("I hate to interrupt, but what time is it", []),
+    ("Unlike yesterday, the likelihood of rain is low", []),
+]
+
+
+def test_extracts_structured_facts():
+    for text, expected in CASES:
+        assert [f.memory for f in extract_preferences(text)] == expected, text
+    fact = extract_preferences("Honestly, I hate Mondays.")[0]
+    assert fact == PreferenceFact("hates", "Mondays", -1, "Honestly, I hate Mondays.")
+
+
+def test_extract_many_dedupes_across_turns():
+    facts = get_preference_extractor().extract_many(["I love jazz", "I LOVE jazz!", "I dislike country"])
+    assert [(f.verb, f.obj, f.polarity) for f in facts] == [("loves", "jazz", 1), ("dislikes", "country", -1)]
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("PREFERENCE EXTRACTOR TEST")
+    print("=" * 60)
+    test_extracts_structured_facts()
+    print("✅ test_extracts_structured_facts")
+    test_extract_many_dedupes_across_turns()
+    print("✅ test_extract_many_dedupes_across_turns")
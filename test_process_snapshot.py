@@ -0,0 +1,77 @@
+"""
+Test ProcessSnapshot with dummy processes: lookups within the TTL reuse one scan, incremental
+refreshes pick up started and exited processes, and names are matched with or without ".exe".
+Run: python test_process_snapshot.py   (or: python -m pytest test_process_snapshot.py)
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from process_snapshot import ProcessSnapshot, process_key
+
+
+def _dummy(name):
+    path = os.path.join(tempfile.mkdtemp(), name)
+    os.symlink(sys.executable, path)
+    return subprocess.Popen([path, "-c", "import time; time.sleep(30)"])
+
+
+def test_ttl_and_incremental_refresh():
+    assert process_key("C:\\Apps\\Code.EXE".replace("\\", os.sep)) == "code"
+    snapshot = ProcessSnapshot(ttl=60, full_scan_interval=3600)
+    assert not snapshot.is_running("ramx-snap-a")
+    for _ in range(100):
+        snapshot.is_running("ramx-snap-a")
+        snapshot.names()
+    assert snapshot.scans == 1
+
+    first = _dummy("ramx-snap-a")
+    second = _dummy("ramx-snap-a")
+    try:
+        time.sleep(0.2)
+        assert not snapshot.is_running("ramx-snap-a")  # still within the TTL
+        snapshot.invalidate()
+        assert snapshot.pids("ramx-snap-a.exe") == sorted([first.pid, second.pid])
+        assert "ramx-snap-a" in snapshot.names()
+        assert snapshot.full_scans == 1  # picked up by the incremental refresh
+
+        first.kill()
+        first.wait()
+        snapshot.invalidate()
+        assert snapshot.pids("ramx-snap-a") == [second.pid]
+        assert snapshot.pids_for(["ramx-snap-a", "ramx-snap-missing"]) == {second.pid}
+    finally:
+        for proc in (first, second):
+            proc.kill()
+            proc.wait()
+    snapshot.invalidate()
+    assert not snapshot.is_running("ramx-snap-a")
+
+
+def test_background_refresh():
+    snapshot = ProcessSnapshot(ttl=0.2)
+    snapshot.start(interval=0.05)
+    try:
+        scans = snapshot.scans
+        proc = _dummy("ramx-snap-b")
+        try:
+            time.sleep(0.4)
+            assert snapshot.scans >= scans + 3  # refreshed without any lookup
+            assert snapshot.pids("ramx-snap-b") == [proc.pid]
+        finally:
+            proc.kill()
+            proc.wait()
+    finally:
+        snapshot.stop()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("PROCESS SNAPSHOT TEST")
+    print("=" * 60)
+    test_ttl_and_incremental_refresh()
+    print("✅ test_ttl_and_incremental_refresh")
+    test_background_refresh()
+    print("✅ test_background_refresh")
@@ -0,0 +1,194 @@
+"""
+Test spotify_control against a local fake of the Spotify Web API and token endpoint:
+the device lookup is cached, the token file is read once, tokens close to expiry are
+refreshed in the background, and play_queue resolves tracks concurrently (then from the
+persistent cache) before starting playback once.
+Run: python test_spotify_controller.py   (or: python -m pytest test_spotify_controller.py)
+"""
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from spotipy.oauth2 import SpotifyOAuth
+
+import get_spotify
+from disk_cache import JsonDiskCache
+from get_spotify import MemoryFirstTokenCache, SpotifyController, set_spotify_controller, spotify_control
+
+SEARCH_DELAY = 0.2
+
+
+class FakeSpotify(BaseHTTPRequestHandler):
+    calls = []
+    bodies = []
+
+    def _reply(self, status, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self):
+        url = urlsplit(self.path)
+        path = url.path
+        FakeSpotify.calls.append((self.command, path))
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            FakeSpotify.bodies.append(self.rfile.read(length))
+        if path == "/api/token":
+            return self._reply(200, {"access_token": "fresh", "token_type": "Bearer",
+                                     "expires_in": 3600, "scope": "user-modify-playback-state"})
+        if path == "/v1/me/player/devices":
+            return self._reply(200, {"devices": [{"id": "desk", "is_active": True, "name": "Desktop"}]})
+        if path == "/v1/search":
+            time.sleep(SEARCH_DELAY)
+            query = parse_qs(url.query)["q"][0]
+            if query == "no such song":
+                return self._reply(200, {"tracks": {"items": []}})
+            track_id = query.replace(" ", "-")
+            return self._reply(200, {"tracks": {"items": [{
+                "uri": f"spotify:track:{track_id}", "name": query.title(), "artists": [{"name": "Arijit Singh"}],
+                "external_urls": {"spotify": f"https://open.spotify.com/track/{track_id}"},
+            }]}})
+        if path.startswith("/v1/me/player/"):
+            return self._reply(204)
+        return self._reply(404, {"error": {"status": 404, "message": "not found"}})
+
+    do_GET = do_PUT = do_POST = _handle
+
+    def log_message(self, *args):
+        pass
+
+
+class CountingTokenFile(MemoryFirstTokenCache):
+    def __init__(self, path):
+        super().__init__(path)
+        self.file_reads = 0
+        self.read_on_main_thread = False
+        read = self._file.get_cached_token
+
+        def counted():
+            self.file_reads += 1
+            self.read_on_main_thread |= threading.current_thread() is threading.main_thread()
+            return read()
+        self._file.get_cached_token = counted
+
+
+def _controller(server, expires_in):
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    token_path = os.path.join(tempfile.mkdtemp(), ".cache")
+    with open(token_path, "w") as f:
+        json.dump({"access_token": "old", "token_type": "Bearer", "expires_in": expires_in,
+                   "refresh_token": "refresh-me", "scope": "user-modify-playback-state",
+                   "expires_at": int(time.time()) + expires_in}, f)
+    tokens = CountingTokenFile(token_path)
+    auth = SpotifyOAuth(client_id="id", client_secret="secret", redirect_uri="http://127.0.0.1:8888/callback",
+                        scope="user-modify-playback-state", cache_handler=tokens, open_browser=False)
+    auth.OAUTH_TOKEN_URL = f"{base}/api/token"
+    ctl = SpotifyController(auth_manager=auth, api_prefix=f"{base}/v1/")
+    get_spotify.track_uri_cache = JsonDiskCache(os.path.join(os.path.dirname(token_path), "tracks.json"))
+    return ctl, tokens, token_path
+
+
+def _with_server(fn):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeSpotify)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    FakeSpotify.calls = []
+    FakeSpotify.bodies = []
+    # _controller points the track cache at a throwaway directory; put the real one back after
+    track_uri_cache = get_spotify.track_uri_cache
+    try:
+        return fn(server)
+    finally:
+        set_spotify_controller(None)
+        get_spotify.track_uri_cache = track_uri_cache
+        server.shutdown()
+
+
+def test_device_and_token_reuse():
+    def run(server):
+        ctl, tokens, _ = _controller(server, expires_in=3600)
+        set_spotify_controller(ctl)
+
+        async def scenario():
+            return [await spotify_control(None, action) for action in ("pause", "resume", "next", "pause")]
+
+        return asyncio.run(scenario()), tokens
+
+    results, tokens = _with_server(run)
+    assert results == ["⏸️ Music paused.", "▶️ Music resumed.", "⏭️ Skipped to the next track.", "⏸️ Music paused."]
+    assert FakeSpotify.calls.count(("GET", "/v1/me/player/devices")) == 1
+    assert len(FakeSpotify.calls) == 5
+    assert tokens.file_reads == 1 and not tokens.read_on_main_thread  # never blocks the event loop
+
+
+def test_token_refreshed_ahead_of_expiry():
+    def run(server):
+        ctl, tokens, token_path = _controller(server, expires_in=120)
+        set_spotify_controller(ctl)
+
+        async def scenario():
+            result = await spotify_control(None, "play", "kesariya")
+            await ctl._refresh_task
+            return result
+
+        result = asyncio.run(scenario())
+        with open(token_path) as f:
+            return result, tokens.get_cached_token(), json.load(f)
+
+    result, token, saved = _with_server(run)
+    assert result == "🎶 Playing 'Kesariya' by Arijit Singh on Spotify Premium."
+    assert ("POST", "/api/token") in FakeSpotify.calls
+    assert token["access_token"] == "fresh" and saved["access_token"] == "fresh"
+    assert token["refresh_token"] == "refresh-me"
+
+
+def test_play_queue_resolves_concurrently_and_caches():
+    names = "kesariya, tum hi ho, no such song, apna bana le"
+
+    def run(server):
+        ctl, _, _ = _controller(server, expires_in=3600)
+        set_spotify_controller(ctl)
+
+        async def scenario():
+            start = time.perf_counter()
+            first = await spotify_control(None, "play_queue", track_names=names)
+            elapsed = time.perf_counter() - start
+            searches = FakeSpotify.calls.count(("GET", "/v1/search"))
+            again = await spotify_control(None, "play_queue", track_names=names)
+            return first, elapsed, searches, again
+
+        return asyncio.run(scenario())
+
+    first, elapsed, searches, again = _with_server(run)
+    print(f"4 lookups took {elapsed:.2f}s ({SEARCH_DELAY}s each)")
+    assert first.startswith("🎶 Playing on Spotify Premium: 'Kesariya'")
+    assert "Couldn't find: no such song" in first
+    assert searches == 4
+    # Lookups overlap instead of running back to back
+    assert elapsed < SEARCH_DELAY * 3
+    # The second request only searches for the song that was not found
+    assert FakeSpotify.calls.count(("GET", "/v1/search")) == 5
+    assert again == first
+    plays = [json.loads(b) for b in FakeSpotify.bodies if b.startswith(b'{"uris"')]
+    assert plays[0]["uris"] == ["spotify:track:kesariya", "spotify:track:tum-hi-ho", "spotify:track:apna-bana-le"]
+    assert FakeSpotify.calls.count(("PUT", "/v1/me/player/play")) == 2
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("SPOTIFY CONTROLLER TEST")
+    print("=" * 60)
+    test_device_and_token_reuse()
+    print("✅ test_device_and_token_reuse")
+    test_token_refreshed_ahead_of_expiry()
+    print("✅ test_token_refreshed_ahead_of_expiry")
+    test_play_queue_resolves_concurrently_and_caches()
+    print("✅ test_play_queue_resolves_concurrently_and_caches")
@@ -0,0 +1,117 @@
+"""
+Test AsyncTTLCache: fresh hits, stale-while-revalidate, single flight, LRU bound and errors.
+A fake clock drives expiry, so the test runs instantly and needs no network.
+Run: python test_ttl_cache.py   (or: python -m pytest test_ttl_cache.py)
+"""
+import asyncio
+
+from ttl_cache import AsyncTTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingFetch:
+    def __init__(self, delay: float = 0.0):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return f"Delhi: +3{self.calls}C"
+
+
+def test_fresh_hits_and_expiry():
+    async def run():
+        clock = FakeClock()
+        cache = AsyncTTLCache(ttl=600, stale_ttl=0, clock=clock)
+        fetch = CountingFetch()
+        assert await cache.get("delhi", fetch) == "Delhi: +31C"
+        assert await cache.get("delhi", fetch) == "Delhi: +31C"
+        assert fetch.calls == 1
+        clock.now = 601
+        assert await cache.get("delhi", fetch) == "Delhi: +32C"
+        return cache.stats()
+
+    stats = asyncio.run(run())
+    assert stats["hits"] == 1 and stats["misses"] == 2
+
+
+def test_stale_while_revalidate():
+    async def run():
+        clock = FakeClock()
+        cache = AsyncTTLCache(ttl=600, stale_ttl=600, clock=clock)
+        fetch = CountingFetch(delay=0.05)
+        await cache.get("delhi", fetch)
+        clock.now = 700
+        # Stale value comes back at once, the refresh runs in the background
+        assert await cache.get("delhi", fetch) == "Delhi: +31C"
+        assert await cache.get("delhi", fetch) == "Delhi: +31C"
+        await asyncio.sleep(0.1)
+        assert await cache.get("delhi", fetch) == "Delhi: +32C"
+        assert fetch.calls == 2
+        return cache.stats()
+
+    stats = asyncio.run(run())
+    assert stats["stale_hits"] == 2 and stats["refreshes"] == 1
+
+
+def test_single_flight():
+    async def run():
+        cache = AsyncTTLCache(ttl=600)
+        fetch = CountingFetch(delay=0.05)
+        results = await asyncio.gather(*(cache.get("delhi", fetch) for _ in range(10)))
+        return results, fetch.calls
+
+    results, calls = asyncio.run(run())
+    assert calls == 1
+    assert set(results) == {"Delhi: +31C"}
+
+
+def test_lru_bound():
+    async def run():
+        cache = AsyncTTLCache(ttl=600, maxsize=2)
+        for city in ("delhi", "mumbai"):
+            await cache.get(city, CountingFetch())
+        await cache.get("delhi", CountingFetch())  # delhi becomes most recently used
+        await cache.get("pune", CountingFetch())
+        return cache
+
+    cache = asyncio.run(run())
+    assert len(cache) == 2
+    assert cache.peek("mumbai") is None and cache.peek("delhi") is not None
+
+
+def test_errors_are_not_cached():
+    async def failing():
+        raise RuntimeError("HTTP 503")
+
+    async def run():
+        cache = AsyncTTLCache(ttl=600)
+        try:
+            await cache.get("delhi", failing)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("error was swallowed")
+        return await cache.get("delhi", CountingFetch()), cache.stats()
+
+    value, stats = asyncio.run(run())
+    assert value == "Delhi: +31C"
+    assert stats["errors"] == 1
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TTL CACHE TEST")
+    print("=" * 60)
+    for test in (test_fresh_hits_and_expiry, test_stale_while_revalidate, test_single_flight,
+                 test_lru_bound, test_errors_are_not_cached):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,89 @@
+"""
+Test web_search with a local stub backend swapped in through set_search_backend():
+queries run off the event loop, normalized repeats come from the cache and concurrent
+identical queries share one backend call.
+Run: python test_web_search.py   (or: python -m pytest test_web_search.py)
+"""
+import asyncio
+import time
+
+from get_web_search import SearchBackend, ThreadedSearchBackend, search_cache, set_search_backend, web_search
+
+LATENCY = 0.3
+
+
+class StubSearchBackend(ThreadedSearchBackend):
+    """Blocking fake search service, like DuckDuckGoSearchRun but local."""
+
+    name = "stub"
+
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.queries = []
+
+    def _run(self, query: str) -> str:
+        self.queries.append(query)
+        time.sleep(LATENCY)
+        return f"Top result for {query.strip().lower()}"
+
+
+async def _max_loop_lag(stop: asyncio.Event) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(0.01)
+        worst = max(worst, time.perf_counter() - t0 - 0.01)
+    return worst
+
+
+def test_search_runs_off_the_event_loop():
+    backend = StubSearchBackend()
+    set_search_backend(backend)
+
+    async def run():
+        stop = asyncio.Event()
+        ticker = asyncio.create_task(_max_loop_lag(stop))
+        result = await web_search("LiveKit agents")
+        stop.set()
+        return result, await ticker
+
+    result, lag = asyncio.run(run())
+    print(f"search took {LATENCY}s, worst event loop stall {lag * 1000:.1f} ms")
+    assert result == "Top result for livekit agents"
+    assert lag < 0.1
+
+
+def test_cache_and_single_flight():
+    backend = StubSearchBackend()
+    set_search_backend(backend)
+
+    async def run():
+        first = await asyncio.gather(*(web_search("python asyncio") for _ in range(5)))
+        again = await web_search("  Python   AsyncIO ")
+        return first, again
+
+    first, again = asyncio.run(run())
+    assert set(first) == {"Top result for python asyncio"}
+    assert again == "Top result for python asyncio"
+    assert len(backend.queries) == 1
+    # set_search_backend() cleared the cache and its counters, so this holds in any test order
+    assert search_cache.stats()["hits"] == 1
+
+
+def test_backends_are_abstract():
+    for cls in (SearchBackend, ThreadedSearchBackend):
+        try:
+            cls()
+            raise AssertionError(f"{cls.__name__} should not be instantiable")
+        except TypeError:
+            pass
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("WEB SEARCH BACKEND TEST")
+    print("=" * 60)
+    test_search_runs_off_the_event_loop()
+    test_cache_and_single_flight()
+    test_backends_are_abstract()
+    print("✅ All checks passed")
@@ -0,0 +1,88 @@
+"""
+Test the streamed YouTube resolver: first_video_id finds an id split across two chunks, stops
+reading at the first match, and reports (None, bytes read) when there is none; resolve_video_id
+answers a repeated track from the JsonDiskCache without another HTTP request.
+Run: python test_youtube_resolver.py   (or: python -m pytest test_youtube_resolver.py)
+"""
+import asyncio
+import contextlib
+import os
+import tempfile
+
+import youtube_music_control as ytm
+from disk_cache import JsonDiskCache
+
+PAGE = b"<html>" + b"x" * 5000 + b'"url":"/watch?v=dQw4w9WgXcQ"' + b"y" * 50000 + b"/watch?v=AAAAAAAAAAA</html>"
+
+
+async def _chunks(data, size):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def test_split_match_and_early_stop():
+    async def scenario():
+        start = PAGE.index(b"watch?v=")
+        # The id is cut after every possible byte of "watch?v=<id>"
+        for cut in range(start + 1, start + len(b"watch?v=dQw4w9WgXcQ")):
+            chunks = [PAGE[:cut], PAGE[cut:]]
+
+            async def two():
+                for chunk in chunks:
+                    yield chunk
+            assert (await ytm.first_video_id(two()))[0] == "dQw4w9WgXcQ", cut
+
+        video_id, read = await ytm.first_video_id(_chunks(PAGE, 1024))
+        assert video_id == "dQw4w9WgXcQ" and read < len(PAGE) // 2  # the rest of the page is never read
+
+    asyncio.run(scenario())
+
+
+def test_no_match():
+    async def scenario():
+        page = b"<html>watch?v=tooshort\"" + b"z" * 3000 + b"</html>"
+        assert await ytm.first_video_id(_chunks(page, 512)) == (None, len(page))
+        assert await ytm.first_video_id(_chunks(b"", 512)) == (None, 0)
+
+    asyncio.run(scenario())
+
+
+class FakeResponse:
+    status_code = 200
+
+    def aiter_bytes(self):
+        return _chunks(PAGE, 4096)
+
+
+def test_repeat_resolves_from_disk_cache():
+    requests = []
+
+    @contextlib.asynccontextmanager
+    async def fake_stream(method, url, **kwargs):
+        requests.append((method, url, kwargs["params"]))
+        yield FakeResponse()
+
+    saved = ytm.track_cache, ytm.http_stream
+    ytm.track_cache = JsonDiskCache(os.path.join(tempfile.mkdtemp(), "youtube_tracks.json"))
+    ytm.http_stream = fake_stream
+    try:
+        assert asyncio.run(ytm.resolve_video_id("Never Gonna  Give You Up")) == "dQw4w9WgXcQ"
+        assert asyncio.run(ytm.resolve_video_id("never gonna give you up ")) == "dQw4w9WgXcQ"
+        assert requests == [("GET", ytm.YOUTUBE_SEARCH_URL, {"search_query": "Never Gonna  Give You Up"})]
+        assert ytm.track_cache.hits == 1
+        # The cache is on disk, so a fresh process would not search either
+        assert JsonDiskCache(ytm.track_cache.path).get("never gonna give you up") == "dQw4w9WgXcQ"
+    finally:
+        ytm.track_cache, ytm.http_stream = saved
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("YOUTUBE RESOLVER TEST")
+    print("=" * 60)
+    test_split_match_and_early_stop()
+    print("✅ test_split_match_and_early_stop")
+    test_no_match()
+    print("✅ test_no_match")
+    test_repeat_resolves_from_disk_cache()
+    print("✅ test_repeat_resolves_from_disk_cache")
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class AsyncTTLCache(Generic[V]):
+    """
+    Async cache for tool responses.
+
+    - Entries are fresh for `ttl` seconds and served straight from memory.
+    - For another `stale_ttl` seconds a stale entry is still returned immediately while a
+      background task refreshes it (stale-while-revalidate).
+    - Concurrent lookups of the same key share one in-flight fetch (single flight).
+    - At most `maxsize` entries are kept; the least recently used one is evicted first.
+
+    Failed fetches raise to the caller and are never cached.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        maxsize: int = 128,
+        stale_ttl: Optional[float] = None,
+        name: str = "cache",
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = ttl if stale_ttl is None else stale_ttl
+        self.maxsize = maxsize
+        self.name = name
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.errors = 0
+
+    async def get(self, key: Hashable, fetch: Callable[[], Awaitable[V]]) -> V:
+        """Return the cached value for `key`, calling `fetch()` when it is missing or expired."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = self._clock() - entry[0]
+            if age < self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[1]
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                if key not in self._inflight:
+                    self.refreshes += 1
+                    self._start_fetch(key, fetch)
+                return entry[1]
+            del self._entries[key]
+
+        self.misses += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._start_fetch(key, fetch)
+        # A cancelled caller must not cancel the fetch other callers are waiting on
+        return await asyncio.shield(task)
+
+    def _start_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[V]]) -> asyncio.Task:
+        task = asyncio.ensure_future(self._fetch(key, fetch))
+        # Background refreshes have nobody awaiting them; mark their errors as handled
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._inflight[key] = task
+        return task
+
+    async def _fetch(self, key: Hashable, fetch: Callable[[], Awaitable[V]]) -> V:
+        try:
+            value = await fetch()
+        except Exception as e:
+            self.errors += 1
+            if key in self._entries:
+                # Background refresh: keep serving the stale value
+                logging.warning(f"[{self.name}] refresh of {key!r} failed: {e}")
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        self.put(key, value)
+        return value
+
+    def put(self, key: Hashable, value: V) -> None:
+        self._entries[key] = (self._clock(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def peek(self, key: Hashable) -> Optional[V]:
+        """Cached value regardless of age, without touching counters or LRU order."""
+        entry = self._entries.get(key)
+        return entry[1] if entry is not None else None
+
+    def keys(self) -> List[Hashable]:
+        """Cached keys, least recently used first."""
+        return list(self._entries.keys())
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry and reset the hit/miss counters."""
+        self._entries.clear()
+        self.hits = self.stale_hits = self.misses = self.refreshes = self.errors = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
@@ -1,4 +1,61 @@
+import asyncio
+import logging
+import re
+from typing import AsyncIterable, Optional, Tuple
 from livekit.agents import function_tool, RunContext
+from http_client import http_stream
+from disk_cache import JsonDiskCache, cache_path
+
+YOUTUBE_SEARCH_URL = "https://www.youtube.com/results"
+# Video ids are exactly 11 characters of [A-Za-z0-9_-]
+_VIDEO_ID = re.compile(rb"watch\?v=([A-Za-z0-9_-]{11})")
+# Keep this many bytes between chunks so a match split across two chunks is still found
+_OVERLAP = len(b"watch?v=") + 11 - 1
+
+# Favourite songs resolve from disk without touching the network
+track_cache = JsonDiskCache(cache_path("youtube_tracks.json"), maxsize=500, max_age=30 * 24 * 3600)
+
+
+class YouTubeSearchError(Exception):
+    pass
+
+
+async def first_video_id(chunks: AsyncIterable[bytes]) -> Tuple[Optional[str], int]:
+    """Scan streamed HTML for the first video id; returns (video_id or None, bytes read)."""
+    tail = b""
+    read = 0
+    async for chunk in chunks:
+        read += len(chunk)
+        buf = tail + chunk
+        match = _VIDEO_ID.search(buf)
+        if match:
+            return match.group(1).decode("ascii"), read
+        tail = buf[-_OVERLAP:]
+    return None, read
+
+
+def _normalize_track(track_name: str) -> str:
+    return " ".join(track_name.strip().lower().split())
+
+
+async def resolve_video_id(track_name: str) -> Optional[str]:
+    """Find the YouTube video id for a track: persistent cache first, then a streamed search."""
+    key = _normalize_track(track_name)
+    # The cache reads and rewrites a JSON file, so it is used off the event loop
+    video_id = await asyncio.to_thread(track_cache.get, key)
+    if video_id:
+        return video_id
+
+    async with http_stream("GET", YOUTUBE_SEARCH_URL, params={"search_query": track_name}) as response:
+        if response.status_code != 200:
+            raise YouTubeSearchError(f"HTTP {response.status_code}")
+        video_id, read = await first_video_id(response.aiter_bytes())
+    logging.info(f"YouTube search for '{track_name}' read {read} bytes -> {video_id}")
+
+    if video_id:
+        await asyncio.to_thread(track_cache.set, key, video_id)
+    return video_id
+
 
 @function_tool()
 async def youtube_music_control(
@@ -16,30 +73,20 @@ async def youtube_music_control(
     Returns:
     - A string indicating the result
     """
-    import requests
     import webbrowser
-    import urllib.parse
 
     if not track_name:
         return "Please provide a track name to play."
 
     try:
-        # Prepare search query
-        query = urllib.parse.quote(track_name)
-        url = f"https://www.youtube.com/results?search_query={query}"
-
-        # Fetch search results page
-        response = requests.get(url)
-        if response.status_code != 200:
+        try:
+            video_id = await resolve_video_id(track_name)
+        except YouTubeSearchError:
             return "Failed to search YouTube."
-
-        # Find the first video link
-        import re
-        video_ids = re.findall(r"watch\?v=(\S{11})", response.text)
-        if not video_ids:
+        if not video_id:
             return f"Could not find a YouTube video for '{track_name}'."
 
-        video_url = f"https://www.youtube.com/watch?v={video_ids[0]}"
+        video_url = f"https://www.youtube.com/watch?v={video_id}"
 
         # Optionally open in browser
         if open_in_browser: